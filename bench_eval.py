@@ -0,0 +1,122 @@
+import asyncio
+import functools
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+import tyro
+
+from eval_journal import EvalJournal
+from mock_llm_server import MockLLMConfig, MockLLMServer
+from satquest import CNF, create_problem, create_question
+
+
+@dataclass
+class Args:
+    server: MockLLMConfig = field(default_factory=lambda: MockLLMConfig(port=0, seed=0))
+    p_type_list: list[str] = field(default_factory=lambda: ["SATSP", "MaxSAT", "MCS", "MUS", "SATDP_SAT", "SATDP_UNSAT"])
+    q_type_list: list[str] = field(default_factory=lambda: ["math", "dimacs", "story", "dualstory"])
+    llm_model: str = "mock-model"
+    num_example: int = 10  # instances per problem type
+    num_variable: int = 8
+    concurrency: int = 16
+    stream: bool = True
+    stop_on_answer: bool = False
+    seed: int = 9527
+    output: str | None = None  # write the JSON report here as well as to stdout
+    journal_path: str | None = None  # defaults to a temporary file removed after the run
+
+
+def random_cnf(rng: random.Random, nv: int, sat: bool) -> CNF:
+    # Rejection-sample small random formulas until the requested satisfiability is met.
+    mc = nv * (2 if sat else 4)
+    while True:
+        clauses = []
+        for _ in range(mc):
+            variables = rng.sample(range(1, nv + 1), min(nv, rng.choice([2, 2, 3])))
+            clauses.append([v * rng.choice([-1, 1]) for v in variables])
+        cnf = CNF(clauses=clauses)
+        if cnf.nv == nv and cnf.is_sat == sat:
+            return cnf
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]  # noqa: E731
+    return {"mean": sum(values) / len(values), "p50": pick(0.5), "p95": pick(0.95), "max": values[-1]}
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+    server = MockLLMServer(args.server)
+    server.start()
+    # llm_inference builds its OpenAI client at import time, so point it at the mock server before eval_model
+    # imports it.
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    from eval_model import infer, score
+
+    rng = random.Random(args.seed)
+    examples = []
+    for p_type in args.p_type_list:
+        sat_flag = p_type in ["SATSP", "SATDP_SAT"]
+        cnfs = [random_cnf(rng, args.num_variable, sat_flag) for _ in range(args.num_example)]
+        for q_type in args.q_type_list:
+            for i, cnf in enumerate(cnfs):
+                problem, question = create_problem(p_type, cnf), create_question(q_type)
+                key = {"cnf_id": i, "problem_type": p_type, "question_type": q_type, "repeat_i": 0, "model": args.llm_model}
+                examples.append({"problem": problem, "problem_type": p_type, "question_type": q_type, "question_str": problem.accept(question), "example_key": key})
+
+    # eval_model.py's steps, scheduled like Weave's Evaluation: inference on client threads, scoring and the
+    # journal on the event loop.
+    async def run_examples(journal: EvalJournal) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+
+            async def run_example(example: dict) -> dict:
+                problem = example["problem"]
+                t0 = time.perf_counter()
+                output_dict = await loop.run_in_executor(
+                    executor,
+                    functools.partial(
+                        infer, problem, example["question_str"], args.llm_model, stream=args.stream, stop_on_answer=args.stop_on_answer, v=False
+                    ),
+                )
+                t1 = time.perf_counter()
+                result = await score(journal, problem, output_dict, example["example_key"])
+                t2 = time.perf_counter()
+                return {**example, **result, "inference_s": t1 - t0, "scoring_s": t2 - t1}
+
+            return await asyncio.gather(*map(run_example, examples))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal = EvalJournal(args.journal_path or os.path.join(tmp_dir, "journal.jsonl"))
+        start = time.perf_counter()
+        results = asyncio.run(run_examples(journal))
+        wall_s = time.perf_counter() - start
+    server.shutdown()
+
+    report = {
+        "config": {k: v for k, v in asdict(args).items() if k != "output"},
+        "num_example": len(results),
+        "wall_s": wall_s,
+        "examples_per_s": len(results) / wall_s,
+        "accuracy": sum(r["is_correct"] for r in results) / len(results),
+        "format_accuracy": sum(r["is_format_correct"] for r in results) / len(results),
+        "inference_s": percentiles([r["inference_s"] for r in results]),
+        "scoring_s": percentiles([r["scoring_s"] for r in results]),
+        "scoring_s_by_problem_type": {
+            pt: percentiles([r["scoring_s"] for r in results if r["problem_type"] == pt]) for pt in args.p_type_list
+        },
+        "server": dict(server.stats),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,141 @@
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+
+import tyro
+
+from satquest import CNF, create_problem, create_question
+from satquest.constants import GIT_HASH
+
+P_TYPES = ["SATDP_SAT", "SATDP_UNSAT", "SATSP", "MaxSAT", "MCS", "MUS"]
+Q_TYPES = ["math", "dimacs", "story", "dualstory"]
+
+
+@dataclass
+class Args:
+    sizes: list[int] = field(default_factory=lambda: [8, 16, 24])  # number of variables; clauses = 4 * nv
+    num_instance: int = 3  # instances per size
+    repeat: int = 5  # timing repeats per case; the fastest mean is reported
+    max_case_s: float = 10.0  # stop repeating a case once it has run this long
+    max_enumerate: int = 64  # answers drawn from solution_enumerate per instance
+    p_type_list: list[str] = field(default_factory=lambda: list(P_TYPES))
+    q_type_list: list[str] = field(default_factory=lambda: list(Q_TYPES))
+    seed: int = 9527
+    output: str | None = None  # write results as JSON
+    baseline: str | None = None  # compare against a previously saved output
+    threshold: float = 1.25  # slowdown ratio against the baseline counted as a regression
+
+
+def random_unsat_sat_pair(rng: random.Random, nv: int, mc: int) -> tuple[CNF, CNF]:
+    # Same recipe as gen_cnf_dataset.py, with the stdlib RNG so the corpus only depends on the seed.
+    while True:
+        clause_set = set()
+        while len(clause_set) < mc:
+            k = (1 if rng.random() < 0.3 else 2) + 1
+            while rng.random() > 0.7:
+                k += 1
+            variables = rng.sample(range(1, nv + 1), min(k, nv))
+            clause_set.add(tuple(sorted((v * rng.choice([-1, 1]) for v in variables), key=abs)))
+        unsat_clauses = [list(c) for c in clause_set]
+        unsat_cnf = CNF(clauses=unsat_clauses)
+        if unsat_cnf.nv == nv and not unsat_cnf.is_sat:
+            break
+    while True:
+        sat_clauses = [[-lit if rng.random() < 0.5 else lit for lit in c] for c in unsat_clauses]
+        sat_cnf = CNF(clauses=sat_clauses)
+        if sat_cnf.is_sat:
+            return unsat_cnf, sat_cnf
+
+
+def build_corpus(args: Args) -> dict[int, list[tuple[CNF, CNF]]]:
+    rng = random.Random(args.seed)
+    return {nv: [random_unsat_sat_pair(rng, nv, 4 * nv) for _ in range(args.num_instance)] for nv in args.sizes}
+
+
+def wrong_answer(problem, rng: random.Random) -> str:
+    # A well-formed answer that fails the check, found outside the timed region.
+    for _ in range(1000):
+        answer = "".join(rng.choice("01") for _ in range(problem.answer_length))
+        if not problem.check(answer):
+            return answer
+    return "0" * problem.answer_length
+
+
+def time_case(fn, inputs: list, repeat: int, max_case_s: float) -> dict:
+    means = []
+    while len(means) < repeat and sum(means) * len(inputs) < max_case_s:
+        start = time.perf_counter()
+        for x in inputs:
+            fn(x)
+        means.append((time.perf_counter() - start) / len(inputs))
+    return {"min_s": min(means), "median_s": statistics.median(means), "n": len(inputs), "repeat": len(means)}
+
+
+def run_benchmarks(args: Args) -> dict:
+    corpus = build_corpus(args)
+    rng = random.Random(args.seed)
+    results = {}
+    for nv, pairs in corpus.items():
+        for p_type in args.p_type_list:
+            cnfs = [sat if p_type in ["SATSP", "SATDP_SAT"] else unsat for unsat, sat in pairs]
+            problems = [create_problem(p_type, cnf) for cnf in cnfs]
+            solutions = [p.solution for p in problems]
+            wrong = [wrong_answer(p, rng) for p in problems]
+            prefix = f"{p_type}/nv{nv}"
+            # A fresh Problem per call so the cached solution is not reused.
+            results[f"{prefix}/solution"] = time_case(lambda c, pt=p_type: create_problem(pt, c).solution, cnfs, args.repeat, args.max_case_s)
+            results[f"{prefix}/check_correct"] = time_case(lambda i: problems[i].check(solutions[i]), range(len(problems)), args.repeat, args.max_case_s)
+            results[f"{prefix}/check_incorrect"] = time_case(lambda i: problems[i].check(wrong[i]), range(len(problems)), args.repeat, args.max_case_s)
+            results[f"{prefix}/solution_enumerate"] = time_case(
+                lambda p: sum(1 for _ in itertools.islice(p.solution_enumerate(), args.max_enumerate)), problems, args.repeat, args.max_case_s
+            )
+            for q_type in args.q_type_list:
+                question = create_question(q_type)
+                results[f"{prefix}/render_{q_type}"] = time_case(lambda p, q=question: p.accept(q), problems, args.repeat, args.max_case_s)
+    return {
+        "meta": {
+            "git_hash": GIT_HASH,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": int(time.time()),
+            "args": {k: v for k, v in asdict(args).items() if k not in ["output", "baseline", "threshold"]},
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[dict]:
+    rows = []
+    for case, result in report["results"].items():
+        base = baseline["results"].get(case)
+        if base is None or base["min_s"] <= 0:
+            continue
+        ratio = result["min_s"] / base["min_s"]
+        rows.append({"case": case, "ratio": ratio, "regression": ratio > threshold})
+    return rows
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+    report = run_benchmarks(args)
+    for case, result in report["results"].items():
+        print(f"{case:<40} {result['min_s'] * 1e3:10.3f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["args"] != report["meta"]["args"]:
+            print("warning: baseline was recorded with different arguments")
+        rows = compare(report, baseline, args.threshold)
+        regressions = [r for r in rows if r["regression"]]
+        for r in sorted(rows, key=lambda r: -r["ratio"]):
+            print(f"{r['case']:<40} {r['ratio']:6.2f}x{'  REGRESSION' if r['regression'] else ''}")
+        print(f"{len(regressions)} regression(s) over {args.threshold:.2f}x in {len(rows)} compared case(s)")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+
+JOURNAL_KEY_FIELDS = ("cnf_id", "problem_type", "question_type", "repeat_i", "model")
+
+
+def journal_key(record: dict) -> tuple:
+    return tuple(record.get(k, 0 if k == "repeat_i" else None) for k in JOURNAL_KEY_FIELDS)
+
+
+def _to_jsonable(obj):
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    return str(obj)
+
+
+class EvalJournal:
+    # Append-only JSONL journal of scored examples; one line per finished example.
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a partially written last line so new records start on a fresh line.
+                    f.write(b"\n")
+
+    def records(self) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A partially written last line from a killed run.
+                    continue
+        return records
+
+    def completed_keys(self) -> set[tuple]:
+        return {journal_key(r) for r in self.records()}
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=_to_jsonable)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
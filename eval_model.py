@@ -5,17 +5,17 @@ import time
 from dataclasses import dataclass, field
 
 import tyro
-import weave
-from datasets import load_dataset
-from weave import Evaluation
 
+from eval_journal import EvalJournal, journal_key
 from llm_inference import llm_inference
-from satquest import CNF, Problem, create_problem, create_question
+from satquest import Problem, create_problem, create_question
+from satquest.arrow import cnf_from_row
+from satquest.budget import UNKNOWN
+from satquest.rescore import checker_fingerprint
 from satquest.satquest_utils import (  # noqa
-    ANSWER_PATTERN,
     QUERY_TEMPLATE,
     SYSTEM_PROMPT,
-    re_matcher,
+    extract_final_answer,
 )
 
 
@@ -35,15 +35,72 @@ class Args:
     stream: bool = True
     cnf_shuffle: bool = False
     n_repeat: int = 1  # 16
+    stop_on_answer: bool = False  # close the stream as soon as a complete "Answer:" line arrives
+    journal_path: str | None = None  # defaults to eval_journal/{hf_dataset_name}.jsonl
+    resume: bool = True  # skip examples already recorded in the journal
+
+
+# The inference and scoring steps of an evaluation, shared with bench_eval.py.
+
+
+def infer(
+    problem: Problem,
+    question_str: str,
+    model: str,
+    temperature: float = 0.6,
+    max_tokens: int = 16384,
+    stream: bool = True,
+    stop_on_answer: bool = False,
+    v: bool = True,
+) -> dict:
+    question_w_template = QUERY_TEMPLATE.format(Question=question_str)
+    output_dict = llm_inference(
+        question_w_template,
+        system_prompt=SYSTEM_PROMPT,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        reasoning_effort="high",
+        stream=stream,
+        v=v,
+        stop_on_answer=stop_on_answer,
+        answer_length=problem.answer_length,
+    )
+    output_dict["final_answer"] = None
+    try:
+        content_output = output_dict["content_output"]
+        output_dict["final_answer"] = extract_final_answer(content_output, problem.answer_length)
+    except Exception as e:
+        print(f"Error while matching answer: {e}")
+    return output_dict
+
+
+async def score(journal: EvalJournal, problem: Problem, output: dict, example_key: dict) -> dict:
+    # Repeats share the problem, whose check_batch remembers answers it has already checked. Checking runs
+    # on a worker thread, so slow checks overlap with the LLM requests driven by the same event loop.
+    is_correct, is_format_correct = await problem.acheck_batch([output["final_answer"]])
+    result = {"is_correct": bool(is_correct[0]), "is_format_correct": is_format_correct[0]}
+    # Lets rescore.py skip records still current; a check that ran out of budget gets none, so it is retried.
+    fingerprint = None if is_correct[0] is UNKNOWN else checker_fingerprint(example_key["problem_type"])
+    journal.append({**example_key, "dimacs": problem.cnf.dimacs, **output, **result, "checker_fingerprint": fingerprint})
+    return result
 
 
 if __name__ == "__main__":
+    import weave
+    from datasets import load_dataset
+    from weave import Evaluation
+
     args = tyro.cli(Args)
     dataset_cnf = load_dataset(args.hf_dataset_name)["test"]
     num_example = min(args.num_example, len(dataset_cnf)) if args.num_example else len(dataset_cnf)
     dataset_cnf = dataset_cnf.select(range(num_example))
 
-    examples = []
+    journal_path = args.journal_path or f"eval_journal/{args.hf_dataset_name.replace('/', '_')}.jsonl"
+    journal = EvalJournal(journal_path)
+    completed_keys = journal.completed_keys() if args.resume else set()
+
+    examples, num_skipped, run_keys = [], 0, set()
     for p_type in args.p_type_list:
         assert p_type in ["SATSP", "SATDP_SAT", "SATDP_UNSAT", "MaxSAT", "MCS", "MUS"], f"Unknown problem type: {p_type}"
         sat_flag = True if p_type in ["SATSP", "SATDP_SAT"] else False
@@ -51,11 +108,22 @@ if __name__ == "__main__":
             assert q_type in ["math", "dimacs", "story", "dualstory"], f"Unknown question type: {q_type}"
 
             for i, d_item in enumerate(dataset_cnf):
-                cnf = CNF(dimacs=d_item["sat_dimacs"]) if sat_flag else CNF(dimacs=d_item["unsat_dimacs"])
+                cnf = cnf_from_row(d_item, "sat" if sat_flag else "unsat")
                 if args.cnf_shuffle:
                     cnf.shuffle()
                 _problem, _question = create_problem(p_type, cnf), create_question(q_type)
                 for r in range(args.n_repeat):
+                    _key = {
+                        "cnf_id": d_item["id"],
+                        "problem_type": p_type,
+                        "question_type": q_type,
+                        "repeat_i": r,
+                        "model": args.llm_model,
+                    }
+                    run_keys.add(journal_key(_key))
+                    if journal_key(_key) in completed_keys:
+                        num_skipped += 1
+                        continue
                     _example = {
                         "cnf_id": d_item["id"],
                         "problem": _problem,
@@ -64,38 +132,27 @@ if __name__ == "__main__":
                         "question_type": q_type,
                         "num_literal": d_item["num_literal"],
                         "question_str": _problem.accept(_question),
+                        "example_key": _key,
                     }
                     if args.n_repeat > 1:
                         _example["repeat_i"] = r
                     examples.append(_example)
 
     @weave.op()
-    def match_score(problem: Problem, output: dict) -> dict:
-        return {
-            "is_correct": problem.check(output["final_answer"]),
-            "is_format_correct": problem.format_check(output["final_answer"]),
-        }
+    async def match_score(problem: Problem, output: dict, example_key: dict) -> dict:
+        return await score(journal, problem, output, example_key)
 
     @weave.op()
     def function_to_evaluate(problem: Problem, question_str: str):
-        question_w_template = QUERY_TEMPLATE.format(Question=question_str)
-        output_dict = llm_inference(
-            question_w_template,
-            system_prompt=SYSTEM_PROMPT,
-            model=args.llm_model,
+        return infer(
+            problem,
+            question_str,
+            args.llm_model,
             temperature=args.temperature,
             max_tokens=args.max_tokens,
-            reasoning_effort="high",
-            stream=True,
-            v=True,
+            stream=args.stream,
+            stop_on_answer=args.stop_on_answer,
         )
-        output_dict["final_answer"] = None
-        try:
-            content_output = output_dict["content_output"]
-            output_dict["final_answer"] = re_matcher(re_matcher(content_output, ANSWER_PATTERN), problem.ANSWER_PATTERN)
-        except Exception as e:
-            print(f"Error while matching answer: {e}")
-        return output_dict
 
     eval_run_name = f"{args.llm_model}_{'-'.join([pt.replace('_', '') for pt in args.p_type_list])}_{'-'.join(args.q_type_list)}_ne{len(examples)}_t{int(time.time())}"
     if args.exp_name:
@@ -103,9 +160,20 @@ if __name__ == "__main__":
     if args.n_repeat > 1:
         eval_run_name = f"R{args.n_repeat}_" + eval_run_name
     print(eval_run_name)
+    print(f"journal: {journal_path} ({num_skipped} completed examples skipped, {len(examples)} to run)")
 
     evaluation = Evaluation(evaluation_name=eval_run_name, dataset=examples, scorers=[match_score])
     weave.init(
         args.wandb_project, autopatch_settings={"disable_autopatch": True}
     )  # autopatch_settings={"openai": {"enabled": False}}
-    asyncio.run(evaluation.evaluate(function_to_evaluate))
+    if examples:
+        asyncio.run(evaluation.evaluate(function_to_evaluate))
+
+    # Aggregate over the journal records of this run's examples, so resumed runs report the full picture
+    # without mixing in earlier runs with another num_example or n_repeat.
+    run_records = {key: record for record in journal.records() if (key := journal_key(record)) in run_keys}
+    for p_type in args.p_type_list:
+        for q_type in args.q_type_list:
+            scores = [r["is_correct"] for r in run_records.values() if r["problem_type"] == p_type and r["question_type"] == q_type]
+            if scores:
+                print(f"{p_type} {q_type}: {sum(scores) / len(scores):.4f} ({len(scores)} examples)")
@@ -1,3 +1,4 @@
+import os
 import random
 from dataclasses import dataclass
 
@@ -7,7 +8,10 @@ from datasets import Dataset, DatasetDict
 from pysat.solvers import Solver
 
 from satquest import CNF, create_problem
+from satquest.arrow import cast_cnf_columns, cnf_columns, cnf_from_row
 from satquest.constants import SAT_SOLVER_NAME
+from satquest.corpus import write_corpus
+from satquest.features import FeatureIndex, extract_features
 
 
 @dataclass
@@ -15,6 +19,8 @@ class Args:
     hf_entity: str = "sdpkjc"
     dataset_name: str = "SATQuest"
     seed: int = 9527
+    feature_index_path: str | None = None  # also save the feature index as JSON columns
+    corpus_path: str | None = None  # also write memory-mapped corpora to <corpus_path>/unsat and /sat
 
 
 def solve_sat(clause_set):
@@ -69,7 +75,10 @@ def post_process_fn(cnf_item, seed=0):
         **cnf_item,
         "num_variable": unsat_cnf.nv,
         "num_clause": unsat_cnf.mc,
+        **cnf_columns(unsat_cnf, "unsat"),
+        **cnf_columns(sat_cnf, "sat"),
         "solver_metadatas": solver_metadatas,
+        "features": extract_features(unsat_cnf, sat_cnf, solver_metadatas),
     }
 
 
@@ -112,10 +121,16 @@ if __name__ == "__main__":
             cnf_item_list[-1]["num_literal"],
         )
     print(len(cnf_item_list))
+    if args.feature_index_path:
+        FeatureIndex.build(cnf_item_list).save(args.feature_index_path)
+    if args.corpus_path:
+        for prefix in ("unsat", "sat"):
+            items = ((cnf_from_row(item, prefix), {"id": item["id"]}) for item in cnf_item_list)
+            write_corpus(os.path.join(args.corpus_path, prefix), items)
 
     dataset_dict = DatasetDict(
         {
-            "test": Dataset.from_list(cnf_item_list),
+            "test": cast_cnf_columns(Dataset.from_list(cnf_item_list)),
         }
     )
     print(args.dataset_name)
@@ -1,15 +1,27 @@
-import time
+import socket
+import threading
 
 from dotenv import load_dotenv
 from openai import OpenAI
 from tenacity import retry, stop_after_attempt, wait_random
 
+from satquest.satquest_utils import complete_answer
+
 load_dotenv()
 MAX_DURATION = 900
 
 client = OpenAI()
 
 
+def _trim_scan_buf(scan_buf: str) -> str:
+    # Keep only the unfinished last line, or a dangling "Answer:" whose value has not arrived yet.
+    cut = scan_buf.rfind("\n") + 1
+    k = scan_buf.lower().rfind("answer:")
+    if k != -1 and not scan_buf[k + len("answer:") :].strip():
+        cut = min(cut, k)
+    return scan_buf[cut:]
+
+
 @retry(
     stop=stop_after_attempt(20),
     wait=wait_random(min=3, max=10),
@@ -24,6 +36,9 @@ def llm_inference(
     reasoning_effort: str = None,
     stream: bool = False,
     v: bool = False,
+    max_duration: float = MAX_DURATION,
+    stop_on_answer: bool = False,
+    answer_length: int | None = None,  # stop_on_answer only stops on an answer line with a binary answer this long
 ):
     if v:
         print(question_w_template)
@@ -46,37 +61,76 @@ def llm_inference(
     response_obj = client.chat.completions.create(**call_params)
 
     content_output, reasoning_content_output, usage = "", "", {}
+    stopped_on_answer = False
     if stream:
-        start = time.time()
-        for chunk in response_obj:
-            if time.time() - start > MAX_DURATION:
-                print("stream timeout! break.")
-                break
-            if chunk.usage:
-                usage = chunk.usage.dict()
-            if not chunk.choices or not chunk.choices[0].delta:
-                continue
-            delta = chunk.choices[0].delta
-            if delta.content:
-                content_output += delta.content
-                if v:
-                    print(delta.content, end="")
-            if hasattr(delta, "reasoning_content") and delta.reasoning_content:
-                reasoning_content_output += delta.reasoning_content
-                if v:
-                    print(delta.reasoning_content, end="")
+        # Deltas are buffered and joined once; a timer closes the stream even if no chunk ever arrives.
+        content_chunks, reasoning_chunks, scan_buf = [], [], ""
+        deadline_hit = threading.Event()
+
+        def _on_deadline():
+            deadline_hit.set()
+            # Closing the response alone does not wake a read blocked in another thread; shutting the socket does.
+            try:
+                network_stream = response_obj.response.extensions["network_stream"]
+                network_stream.get_extra_info("socket").shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+            response_obj.close()
+
+        deadline_timer = threading.Timer(max_duration, _on_deadline)
+        deadline_timer.daemon = True
+        deadline_timer.start()
+        try:
+            for chunk in response_obj:
+                if deadline_hit.is_set():
+                    break
+                if chunk.usage:
+                    usage = chunk.usage.dict()
+                if not chunk.choices or not chunk.choices[0].delta:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_chunks.append(delta.content)
+                    if v:
+                        print(delta.content, end="")
+                    if stop_on_answer and answer_length is not None:
+                        scan_buf += delta.content
+                        if "\n" in delta.content:
+                            if complete_answer(scan_buf, answer_length) is not None:
+                                stopped_on_answer = True
+                                response_obj.close()
+                                break
+                            scan_buf = _trim_scan_buf(scan_buf)
+                if hasattr(delta, "reasoning_content") and delta.reasoning_content:
+                    reasoning_chunks.append(delta.reasoning_content)
+                    if v:
+                        print(delta.reasoning_content, end="")
+        except Exception:
+            if not deadline_hit.is_set():
+                raise
+        finally:
+            deadline_timer.cancel()
+        if deadline_hit.is_set():
+            raise TimeoutError(f"stream exceeded max_duration={max_duration}s")
+        content_output, reasoning_content_output = "".join(content_chunks), "".join(reasoning_chunks)
     else:
         message = response_obj.choices[0].message
         content_output = message.content
-        usage = response_obj.usage
+        usage = response_obj.usage.dict() if response_obj.usage else {}
         if hasattr(message, "reasoning_content") and message.reasoning_content:
             reasoning_content_output = message.reasoning_content
         if v:
             print(reasoning_content_output)
             print(content_output)
 
-    assert content_output is not None and len(content_output) > 0 and len(usage) > 0
-    return {"reasoning_content_output": reasoning_content_output, "content_output": content_output, "usage": usage}
+    # The usage chunk is sent last, so streams closed early on an answer line come without it.
+    assert content_output is not None and len(content_output) > 0 and (len(usage) > 0 or stopped_on_answer)
+    return {
+        "reasoning_content_output": reasoning_content_output,
+        "content_output": content_output,
+        "usage": usage,
+        "stopped_on_answer": stopped_on_answer,
+    }
 
 
 if __name__ == "__main__":
@@ -84,10 +138,9 @@ if __name__ == "__main__":
 
     from satquest import CNF, create_problem, create_question
     from satquest.satquest_utils import (
-        ANSWER_PATTERN,
         QUERY_TEMPLATE,
         SYSTEM_PROMPT,
-        re_matcher,
+        extract_final_answer,
     )
 
     model = "gpt-4o"
@@ -112,7 +165,7 @@ if __name__ == "__main__":
     )
 
     content_output = output_dict["content_output"]
-    final_answer = re_matcher(re_matcher(content_output, ANSWER_PATTERN), problem.ANSWER_PATTERN)
+    final_answer = extract_final_answer(content_output, problem.answer_length)
 
     print("\n==================\n")
 
@@ -0,0 +1,198 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import tyro
+
+from satquest import CNF, create_problem
+from satquest.constants import COOKIE_NAMES
+
+# Instruction phrases emitted by the Question visitors, mapped to the problem they ask for.
+P_TYPE_PHRASES = [
+    ("SATDP", ["Determine if the formula is satisfiable", "so every friend is happy?"]),
+    ("SATSP", ["Find a satisfying assignment", "find a cookie recipe that makes everyone happy"]),
+    ("MaxSAT", ["maximizes the number of satisfied clauses", "makes as many friends happy as possible"]),
+    ("MCS", ["whose removal makes the formula satisfiable", "must ignore to keep the others happy"]),
+    ("MUS", ["minimal subset of clauses that is unsatisfiable", "cannot possibly accommodate all their requirements"]),
+]
+
+_MATH_LITERAL = re.compile(r"(\\neg )?x_\{?(\d+)\}?")
+_STORY_LINE = re.compile(r"^\d+\. .+? (wants|dislikes): (.*)$", re.MULTILINE)
+
+
+def parse_prompt(prompt: str) -> tuple[str, CNF] | None:
+    # Recover (problem type, CNF) from a rendered SATQuest prompt; None if it is not one.
+    p_type = next((pt for pt, phrases in P_TYPE_PHRASES if any(ph in prompt for ph in phrases)), None)
+    if p_type is None:
+        return None
+    clauses = []
+    if "in DIMACS format" in prompt:
+        dimacs = prompt[prompt.index("p cnf") :].split("\n\n")[0]
+        return p_type, CNF(dimacs=dimacs)
+    if "in mathematical notation" in prompt:
+        formula = next(line for line in prompt.splitlines() if line.startswith("("))
+        for clause_str in formula.split(" \\land "):
+            clauses.append([-int(v) if neg else int(v) for neg, v in _MATH_LITERAL.findall(clause_str)])
+    else:
+        nv = int(re.search(r"baking (\d+) kinds of cookies", prompt).group(1))
+        cookie_ids = {name: i + 1 for i, name in enumerate(COOKIE_NAMES[:nv])}
+        for kind, conditions in _STORY_LINE.findall(prompt):
+            positive = "crunchy" if kind == "wants" else "chewy"
+            clause = []
+            for condition in conditions.split(", " if kind == "wants" else " + "):
+                texture, name = condition.split(" ", 1)
+                clause.append(cookie_ids[name] if texture == positive else -cookie_ids[name])
+            clauses.append(clause)
+    return (p_type, CNF(clauses=clauses)) if clauses else None
+
+
+@dataclass
+class MockLLMConfig:
+    host: str = "127.0.0.1"
+    port: int = 8011
+    latency: float = 0.2  # seconds before the first token
+    tokens_per_s: float = 200.0  # 0 or less streams without throttling
+    num_tokens: int = 64  # filler reasoning tokens emitted before the answer line
+    num_trailing_tokens: int = 0  # filler tokens emitted after the answer line
+    answer_format: str = "\nAnswer: {answer}\n"  # the answer line
+    answer_chunk_chars: int = 0  # stream the answer line in deltas of this many characters; 0 sends it whole
+    error_rate: float = 0.0  # fraction of requests answered with an HTTP error
+    error_status: int = 500
+    answer_mode: str = "solver"  # "solver" answers with the reference solution, "canned" with canned_answer
+    canned_answer: str = "0"
+    wrong_rate: float = 0.0  # fraction of solver answers replaced with canned_answer
+    seed: int | None = None
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    # Minimal OpenAI-compatible chat-completions endpoint for offline throughput benchmarks.
+    daemon_threads = True
+
+    def __init__(self, config: MockLLMConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "completion_tokens": 0, "disconnects": 0}
+        self.stats_lock = threading.Lock()
+        super().__init__((config.host, config.port), _MockLLMHandler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def random(self) -> float:
+        with self.rng_lock:
+            return self.rng.random()
+
+    def count(self, **deltas: int) -> None:
+        with self.stats_lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+
+    def answer(self, prompt: str) -> str:
+        if self.config.answer_mode == "solver" and self.random() >= self.config.wrong_rate:
+            try:
+                parsed = parse_prompt(prompt)
+                if parsed is not None:
+                    solution = create_problem(*parsed).solution
+                    if solution is not None:
+                        return solution
+            except Exception:
+                pass
+        return self.config.canned_answer
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class _MockLLMHandler(BaseHTTPRequestHandler):
+    server: MockLLMServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}", "type": "invalid_request_error"}})
+            return
+        config = self.server.config
+        self.server.count(requests=1)
+        if self.server.random() < config.error_rate:
+            self.server.count(errors=1)
+            self._send_json(config.error_status, {"error": {"message": "mock server error", "type": "server_error"}})
+            return
+
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        answer_line = config.answer_format.format(answer=self.server.answer(prompt))
+        size = config.answer_chunk_chars if config.answer_chunk_chars > 0 else len(answer_line)
+        tokens = ["Let me think. "] + ["step "] * config.num_tokens
+        tokens += [answer_line[i : i + size] for i in range(0, len(answer_line), size)]
+        tokens += ["done "] * config.num_trailing_tokens
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(tokens), "total_tokens": len(prompt) // 4 + len(tokens)}
+        self.server.count(completion_tokens=len(tokens))
+        chunk_base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "created": int(time.time()), "model": request.get("model", "mock")}
+
+        if not request.get("stream"):
+            time.sleep(config.latency)
+            if config.tokens_per_s > 0:
+                time.sleep(len(tokens) / config.tokens_per_s)
+            message = {"role": "assistant", "content": "".join(tokens)}
+            choice = {"index": 0, "message": message, "finish_reason": "stop"}
+            self._send_json(200, {**chunk_base, "object": "chat.completion", "choices": [choice], "usage": usage})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            # Like a real endpoint, the headers go out at once and the latency is the wait for the first token.
+            time.sleep(config.latency)
+            start = time.time()
+            for i, token in enumerate(tokens):
+                if config.tokens_per_s > 0:
+                    time.sleep(max(0.0, start + i / config.tokens_per_s - time.time()))
+                choice = {"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}
+                self._send_event({**chunk_base, "object": "chat.completion.chunk", "choices": [choice]})
+            choice = {"index": 0, "delta": {}, "finish_reason": "stop"}
+            self._send_event({**chunk_base, "object": "chat.completion.chunk", "choices": [choice]})
+            if (request.get("stream_options") or {}).get("include_usage"):
+                self._send_event({**chunk_base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early.
+            self.server.count(disconnects=1)
+
+    def _send_event(self, body: dict) -> None:
+        self.wfile.write(b"data: " + json.dumps(body).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+
+if __name__ == "__main__":
+    config = tyro.cli(MockLLMConfig)
+    server = MockLLMServer(config)
+    print(f"Mock LLM server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
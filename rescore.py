@@ -0,0 +1,28 @@
+import time
+from dataclasses import dataclass
+
+import tyro
+
+from satquest.rescore import CHUNK_SIZE, rescore
+
+
+@dataclass
+class Args:
+    path: tyro.conf.Positional[str]  # saved completions: an eval journal (.jsonl) or a .parquet file with the same columns
+    output: str | None = None  # write the rescored rows here; pass the input path to update it in place
+    processes: int | None = None  # pool workers; os.cpu_count() if None, 1 scores in this process
+    force: bool = False  # rescore rows whose checker fingerprint is current too
+    chunk_size: int = CHUNK_SIZE
+
+
+if __name__ == "__main__":
+    args = tyro.cli(Args)
+    start = time.perf_counter()
+    result = rescore(args.path, args.output, args.processes, args.force, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"{len(result)} rows in {elapsed:.1f}s ({sum(result.columns['rescored'])} rescored, {sum(result.columns['changed'])} changed)")
+    for group in result.aggregate():
+        print(
+            f"{group['model']} {group['problem_type']} {group['question_type']}: {group['accuracy']:.4f} "
+            f"({group['examples']} examples, format {group['format_accuracy']:.4f}, {group['changed']} changed)"
+        )
@@ -7,24 +7,35 @@ from transformers import AutoTokenizer
 from trl import GRPOConfig, GRPOTrainer
 
 from satquest import CNF, create_problem, create_question
-from satquest.satquest_utils import re_matcher
+from satquest.arrow import cnf_from_row
+from satquest.prompt_length import TokenCounter
+from satquest.satquest_utils import match_last_binary
+from satquest.verification import VerificationClient
+
+# Set from --verify-url; score_reward then hands answer checking to a shared verification server.
+verifier: VerificationClient | None = None
+
+
+SYSTEM_CONTENT = "You are a helpful AI Assistant that provides well-reasoned and detailed responses. You first think about the reasoning process as an internal monologue and then provide the user with the answer. Respond in the following format: <think>\n...\n</think>\n<answer>\n...\n</answer>"
+ANSWER_INSTRUCTION = "\nShow your work in <think> </think> tags. And return the final answer in <answer> </answer> tags, for example <answer> {} </answer>."
+# Chat-template tokens around the two messages (role headers and end markers), added to the estimate.
+CHAT_TEMPLATE_TOKENS = 32
 
 
 def make_process_fn(p_type, q_type):
     def process_fn(example):
-        cnf = CNF(dimacs=example["sat_dimacs"] if p_type in ["SATSP", "SATDP_SAT"] else example["unsat_dimacs"])
+        cnf = cnf_from_row(example, "sat" if p_type in ["SATSP", "SATDP_SAT"] else "unsat")
         cnf.shuffle()
         _problem, _question = create_problem(p_type, cnf), create_question(q_type)
-        question_str, exp_s = _problem.accept(_question), "0" * (len(_problem.solution) - 1) + "1"
+        question_str, exp_s = _problem.accept(_question), "0" * (_problem.answer_length - 1) + "1"
         prompt = [
             {
                 "role": "system",
-                "content": "You are a helpful AI Assistant that provides well-reasoned and detailed responses. You first think about the reasoning process as an internal monologue and then provide the user with the answer. Respond in the following format: <think>\n...\n</think>\n<answer>\n...\n</answer>",
+                "content": SYSTEM_CONTENT,
             },
             {
                 "role": "user",
-                "content": question_str
-                + f"\nShow your work in <think> </think> tags. And return the final answer in <answer> </answer> tags, for example <answer> {exp_s} </answer>.",
+                "content": question_str + ANSWER_INSTRUCTION.format(exp_s),
             },
         ]
         return {
@@ -36,6 +47,18 @@ def make_process_fn(p_type, q_type):
     return process_fn
 
 
+def make_length_filter_fn(p_type, q_type, counter, max_prompt_length):
+    # Drops instances whose prompt would be truncated, from the estimate of satquest.prompt_length instead of
+    # rendering and tokenizing every prompt.
+    def filter_fn(example):
+        _problem = create_problem(p_type, cnf_from_row(example, "sat" if p_type in ["SATSP", "SATDP_SAT"] else "unsat"))
+        exp_s = "0" * (_problem.answer_length - 1) + "1"
+        overhead = counter(SYSTEM_CONTENT) + counter(ANSWER_INSTRUCTION.format(exp_s)) + CHAT_TEMPLATE_TOKENS
+        return _problem.prompt_length(create_question(q_type), counter).tokens + overhead <= max_prompt_length
+
+    return filter_fn
+
+
 def tag_count_reward(completions, **kwargs) -> list[float]:
     """Reward function that checks if we produce the desired number of think and answer tags associated with `format_reward()`.
 
@@ -93,7 +116,7 @@ def compute_score(solution_str, cnf_dimacs, p_type, score=1.0):
     problem = create_problem(p_type, CNF(dimacs=cnf_dimacs))
     try:
         answer_str = extract_answer(solution_str=solution_str)
-        answer_01_str = re_matcher(answer_str, problem.ANSWER_PATTERN)
+        answer_01_str = match_last_binary(answer_str, problem.answer_length)
         if problem.check(answer_01_str):
             return score
     except Exception:
@@ -102,11 +125,28 @@ def compute_score(solution_str, cnf_dimacs, p_type, score=1.0):
 
 
 def score_reward(completions, **kwargs):
+    # The generations of one prompt share a problem, so each distinct answer is checked once per batch.
     completion_contents = [completion[0]["content"] for completion in completions]
-    rews = []
+    groups = {}
     for i, c in enumerate(completion_contents):
-        ka = {k: v[i] for k, v in kwargs.items()}
-        rews.append(compute_score(c, ka["cnf_dimacs"], ka["p_type"]))
+        key = (kwargs["cnf_dimacs"][i], kwargs["p_type"][i])
+        if key not in groups:
+            groups[key] = (create_problem(key[1], CNF(dimacs=key[0])), [], [])
+        problem, indices, answers = groups[key]
+        try:
+            answer_01_str = match_last_binary(extract_answer(solution_str=c), problem.answer_length)
+        except Exception:
+            answer_01_str = None
+        indices.append(i)
+        answers.append(answer_01_str)
+    rews = [0.0] * len(completion_contents)
+    if verifier is not None:
+        scores = verifier.score([(p_type, dimacs, answers) for (dimacs, p_type), (_, _, answers) in groups.items()])
+    else:
+        scores = [problem.check_batch(answers) for problem, _, answers in groups.values()]
+    for (_, indices, _), (is_correct, _) in zip(groups.values(), scores):
+        for i, ok in zip(indices, is_correct):
+            rews[i] = 1.0 if ok else 0.0
     return rews
 
 
@@ -117,20 +157,33 @@ class Args:
     q_list: list = field(default_factory=lambda: ["math"])  # ["math", "story"]
     exp_name: str = None
     server_ip: str = "0.0.0.0"
+    verify_url: str | None = None  # e.g. http://127.0.0.1:8021 or unix:/tmp/satquest.sock (see verify_server.py)
+    max_prompt_length: int = 2048  # instances whose estimated prompt is longer are dropped up front
 
 
 if __name__ == "__main__":
     args = tyro.cli(Args)
+    if args.verify_url is not None:
+        verifier = VerificationClient(args.verify_url)
     exp_name = args.model_id.split("/")[-1] + "_" + "-".join(args.p_list) + "_" + "-".join(args.q_list)
     if args.exp_name is not None:
         exp_name = exp_name + "_" + args.exp_name
     print(exp_name)
 
+    tokenizer = AutoTokenizer.from_pretrained(
+        args.model_id,
+        revision="main",
+        trust_remote_code=True,
+    )
+    counter = TokenCounter(tokenizer)
+
     dataset = load_dataset("sdpkjc/SATQuest-RFT-3k", split="train")
     dataset_list = []
     for pt in args.p_list:
         for qt in args.q_list:
-            dataset_list.append(dataset.map(function=make_process_fn(pt, qt)))
+            fitting = dataset.filter(make_length_filter_fn(pt, qt, counter, args.max_prompt_length))
+            print(f"{pt}/{qt}: {len(fitting)} of {len(dataset)} prompts fit in {args.max_prompt_length} tokens")
+            dataset_list.append(fitting.map(function=make_process_fn(pt, qt)))
     dataset = concatenate_datasets(dataset_list)
     dataset = dataset.shuffle(seed=9527).select_columns(["cnf_dimacs", "prompt", "p_type"])
 
@@ -140,7 +193,7 @@ if __name__ == "__main__":
         log_on_each_node=False,
         log_completions=True,
         warmup_steps=10,
-        max_prompt_length=2048,
+        max_prompt_length=args.max_prompt_length,
         max_completion_length=8192,
         use_vllm=True,
         vllm_server_host=args.server_ip,
@@ -168,11 +221,6 @@ if __name__ == "__main__":
         reward_weights=[1.0, 0.05, 0.05],
     )
 
-    tokenizer = AutoTokenizer.from_pretrained(
-        args.model_id,
-        revision="main",
-        trust_remote_code=True,
-    )
     trainer = GRPOTrainer(
         model=args.model_id,
         reward_funcs=[score_reward, tag_count_reward, format_reward],
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable
+
+from satquest.budget import Cancellation, Cancelled
+
+if TYPE_CHECKING:
+    from satquest.problem import Problem
+
+# Executors behind the awaitable Problem methods (asolution, acheck, acheck_batch, aenumerate). Calls run on
+# the executor given per call, else the one set here, else the event loop's default thread pool.
+#
+# On a thread, calls on the same problem take turns (its solvers are not thread-safe), and cancelling the
+# awaiting task interrupts the oracle the call is running; the task waits for the thread to stop before
+# CancelledError propagates, and the interrupted call caches nothing. A ProcessPoolExecutor gets a pickled
+# copy of the problem and the results are cached back on the caller's problem. There cancellation only
+# drops calls that have not started; a running one finishes in its worker and is discarded.
+
+_default_executor: Executor | None = None
+_locks: "weakref.WeakKeyDictionary[Problem, threading.Lock]" = weakref.WeakKeyDictionary()
+_locks_lock = threading.Lock()
+
+
+def set_default_executor(executor: Executor | None) -> None:
+    global _default_executor
+    _default_executor = executor
+
+
+def get_executor(executor: Executor | None = None) -> Executor | None:
+    return executor or _default_executor
+
+
+def in_process(executor: Executor | None) -> bool:
+    return isinstance(get_executor(executor), ProcessPoolExecutor)
+
+
+def _lock(problem: "Problem") -> threading.Lock:
+    with _locks_lock:
+        if problem not in _locks:
+            _locks[problem] = threading.Lock()
+        return _locks[problem]
+
+
+def _call(problem: "Problem", cancellation: Cancellation, fn: Callable, args: tuple) -> Any:
+    with _lock(problem), cancellation.active():
+        return fn(*args)
+
+
+async def run(problem: "Problem", executor: Executor | None, fn: Callable, *args: Any) -> Any:
+    # fn(*args) on the executor; fn must be picklable for a process pool.
+    loop, executor = asyncio.get_running_loop(), get_executor(executor)
+    if isinstance(executor, ProcessPoolExecutor):
+        return await loop.run_in_executor(executor, fn, *args)
+    cancellation = Cancellation()
+    future = loop.run_in_executor(executor, _call, problem, cancellation, fn, args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancellation.cancel()
+        try:
+            await future
+        except (Exception, Cancelled):
+            pass
+        raise
@@ -0,0 +1,59 @@
+from typing import Any, Generator
+
+from satquest.cnf import CNF
+from satquest.codec import arrow_view
+
+# Arrow column layout of a CNF, next to the DIMACS text columns of the SATQuest datasets:
+#   <prefix>_literals  list<int16>  every literal, clause after clause
+#   <prefix>_offsets   list<int32>  start of each clause in <prefix>_literals, plus the total (mc + 1 values)
+#   <prefix>_nv        int32        number of variables, which may exceed the largest literal
+# with prefix "sat" or "unsat". Without <prefix>_nv (older datasets) nv is the largest literal. A dataset
+# saved to disk is memory-mapped by Arrow, so iter_cnfs reads instances straight from the mapped buffers.
+LITERAL_TYPE, OFFSET_TYPE, NV_TYPE = "int16", "int32", "int32"
+PREFIXES = ("sat", "unsat")
+
+
+def cnf_columns(cnf: CNF, prefix: str) -> dict[str, list[int]]:
+    assert cnf.nv < 1 << 15, "literals are stored as int16"
+    offsets = [0]
+    for clause in cnf.clauses:
+        offsets.append(offsets[-1] + len(clause))
+    return {
+        f"{prefix}_literals": [lit for clause in cnf.clauses for lit in clause],
+        f"{prefix}_offsets": offsets,
+        f"{prefix}_nv": cnf.nv,
+    }
+
+
+def cast_cnf_columns(dataset, prefixes: tuple[str, ...] = PREFIXES):
+    # Narrow the inferred int64 lists of a datasets.Dataset to the layout types.
+    from datasets import Sequence, Value
+
+    for prefix in prefixes:
+        dataset = dataset.cast_column(f"{prefix}_literals", Sequence(Value(LITERAL_TYPE)))
+        dataset = dataset.cast_column(f"{prefix}_offsets", Sequence(Value(OFFSET_TYPE)))
+        dataset = dataset.cast_column(f"{prefix}_nv", Value(NV_TYPE))
+    return dataset
+
+
+def cnf_from_row(row: dict[str, Any], prefix: str) -> CNF:
+    # CNF of a dataset row, from the Arrow columns when present and the DIMACS text otherwise.
+    if row.get(f"{prefix}_literals") is not None:
+        return CNF.from_arrow(row[f"{prefix}_literals"], row[f"{prefix}_offsets"], row.get(f"{prefix}_nv"))
+    return CNF(dimacs=row[f"{prefix}_dimacs"])
+
+
+def iter_cnfs(table, prefix: str) -> Generator[CNF, None, None]:
+    # CNFs of every row of a pyarrow Table or RecordBatch (e.g. Dataset.data.table, which ignores the
+    # index mapping of select/shuffle). Each batch is viewed once; rows are decoded as they are reached.
+    for batch in table.to_batches() if hasattr(table, "to_batches") else [table]:
+        literal_lists, offset_lists = batch.column(f"{prefix}_literals"), batch.column(f"{prefix}_offsets")
+        literals, row_literals = arrow_view(literal_lists.values), arrow_view(literal_lists.offsets)
+        offsets, row_offsets = arrow_view(offset_lists.values), arrow_view(offset_lists.offsets)
+        nvs = batch.column(f"{prefix}_nv").to_pylist() if f"{prefix}_nv" in batch.schema.names else [None] * len(batch)
+        for i in range(len(batch)):
+            yield CNF.from_arrow(
+                literals[row_literals[i] : row_literals[i + 1]],
+                offsets[row_offsets[i] : row_offsets[i + 1]],
+                nvs[i],
+            )
@@ -0,0 +1,66 @@
+import random
+from typing import Generator
+
+from satquest.cnf import CNF, Permutation
+from satquest.problem import Problem
+
+# Solved variants of a solved instance. Renaming variables, flipping their polarity and reordering clauses
+# and literals changes how a formula reads but not its structure, so the reference solution, MaxSAT optima,
+# MCS/MUS sets and everything else cached on the problem are mapped through the transform
+# (Problem.permuted) instead of being solved again.
+
+# augment() stops once this many variants in a row repeat earlier ones (small formulas have few variants).
+MAX_REPEATS = 100
+
+
+def random_permutation(cnf: CNF, rng: random.Random, reorder: bool = True, relabel: bool = True, flip: bool = True) -> Permutation:
+    clauses = list(range(cnf.mc))
+    if reorder:
+        rng.shuffle(clauses)
+    variables = list(range(1, cnf.nv + 1))
+    if relabel:
+        rng.shuffle(variables)
+    if flip:
+        variables = [-w if rng.random() < 0.5 else w for w in variables]
+    return Permutation(tuple(clauses), tuple(variables))
+
+
+def _key(cnf: CNF) -> tuple:
+    return tuple(map(tuple, cnf.clauses))
+
+
+def augment(
+    problem: Problem,
+    n: int | None = None,
+    seed: int | None = None,
+    reorder: bool = True,
+    relabel: bool = True,
+    flip: bool = True,
+    verify: bool = False,
+    unique: bool = True,
+) -> Generator[tuple[Problem, Permutation], None, None]:
+    # Streams up to n (None: no limit) variants of problem with their permutations. The problem is solved
+    # once up front and a variant then costs a transform; its answers are right by construction, and verify
+    # re-checks each mapped solution on the variant (an MUS check can cost more than the solve). With unique,
+    # variants whose formula was already produced (or is the original) are skipped.
+    rng = random.Random(seed)
+    _ = problem.solution
+    seen, repeats, produced = {_key(problem.cnf)}, 0, 0
+    while (n is None or produced < n) and repeats < MAX_REPEATS:
+        permutation = random_permutation(problem.cnf, rng, reorder, relabel, flip)
+        cnf = permutation.apply(problem.cnf)
+        if reorder:
+            for clause in cnf.clauses:
+                rng.shuffle(clause)
+        if unique:
+            key = _key(cnf)
+            if key in seen:
+                repeats += 1
+                continue
+            seen.add(key)
+        repeats = 0
+        variant = problem.permuted(cnf, permutation)
+        if verify and isinstance(variant.solution, str):
+            assert variant.check(variant.solution), f"mapped solution of {problem} failed its check"
+        produced += 1
+        yield variant, permutation
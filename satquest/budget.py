@@ -0,0 +1,226 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+
+from pysat.solvers import Cadical103, Cadical153, Cadical195, Solver
+
+# CaDiCaL cannot be interrupted, so time budgets run it in conflict-limited slices of this size.
+SLICE_CONFLICTS = 1000
+
+
+@dataclass(frozen=True)
+class Budget:
+    time: float | None = None  # seconds spent solving
+    conflicts: int | None = None
+    propagations: int | None = None  # not supported by CaDiCaL
+
+    def __bool__(self) -> bool:
+        return self.time is not None or self.conflicts is not None or self.propagations is not None
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class Cancelled(BaseException):
+    # Raised by an oracle call whose Cancellation was triggered. A BaseException, like asyncio.CancelledError,
+    # so the `except Exception` fallbacks of the solvers don't cache a result for the interrupted call.
+    pass
+
+
+class _Unknown:
+    # Result of a solve or check that ran out of budget; falsy so it scores like a failed check.
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+    def __reduce__(self):
+        return (_Unknown, ())
+
+
+UNKNOWN = _Unknown()
+
+_default_budget = Budget()
+_local = threading.local()
+
+
+def set_default_budget(budget: Budget | None) -> None:
+    global _default_budget
+    _default_budget = budget or Budget()
+
+
+def get_default_budget() -> Budget:
+    return _default_budget
+
+
+def current_state() -> "BudgetState | None":
+    return getattr(_local, "state", None)
+
+
+def current_cancellation() -> "Cancellation | None":
+    return getattr(_local, "cancellation", None)
+
+
+class Cancellation:
+    # Stops the pysat oracles of the calls made while it is active, from any thread: cancel() interrupts
+    # the running oracle (CaDiCaL at its next conflict slice) and every later oracle call raises Cancelled.
+    def __init__(self):
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._current: set[Solver] = set()
+
+    @contextmanager
+    def active(self):
+        previous, _local.cancellation = current_cancellation(), self
+        try:
+            yield self
+        finally:
+            _local.cancellation = previous
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            for oracle in self._current:
+                if not _is_cadical(oracle):
+                    oracle.interrupt()
+
+    def _enter(self, oracle: Solver) -> None:
+        with self._lock:
+            if self.cancelled:
+                raise Cancelled()
+            self._current.add(oracle)
+
+    def _exit(self, oracle: Solver) -> None:
+        with self._lock:
+            self._current.discard(oracle)
+
+
+class BudgetState:
+    # Spending of one budgeted call, shared by every oracle it creates.
+    def __init__(self, budget: Budget):
+        self.budget = budget
+        self.time = 0.0
+        self.conflicts = 0
+        self.propagations = 0
+        self._lock = threading.Lock()
+        self._expired = False
+        self._current: Solver | None = None
+
+    @contextmanager
+    def active(self):
+        # Oracles created inside the block are limited; time only counts while a block is active.
+        previous, _local.state = current_state(), self
+        timer, start = None, time.perf_counter()
+        if self.budget.time is not None:
+            remaining = self.budget.time - self.time
+            self._expired = remaining <= 0
+            if not self._expired:
+                timer = threading.Timer(remaining, self._expire)
+                timer.daemon = True
+                timer.start()
+        try:
+            yield self
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self.time += time.perf_counter() - start
+            _local.state = previous
+
+    def _expire(self) -> None:
+        with self._lock:
+            self._expired = True
+            if self._current is not None and not _is_cadical(self._current):
+                self._current.interrupt()
+
+    def solve(self, oracle: Solver, assumptions=[]) -> bool:
+        budget, cancellation = self.budget, current_cancellation()
+        sliced = (budget.time is not None or cancellation is not None) and _is_cadical(oracle)
+        while True:
+            conflicts = None if budget.conflicts is None else budget.conflicts - self.conflicts
+            if sliced:
+                conflicts = SLICE_CONFLICTS if conflicts is None else min(conflicts, SLICE_CONFLICTS)
+            propagations = None if budget.propagations is None else budget.propagations - self.propagations
+            with self._lock:
+                if self._expired or (conflicts is not None and conflicts <= 0) or (propagations is not None and propagations <= 0):
+                    raise BudgetExceeded(budget)
+                self._current = oracle
+            oracle.conf_budget(-1 if conflicts is None else conflicts)
+            if propagations is not None:
+                oracle.prop_budget(propagations)
+            before = oracle.accum_stats()
+            if cancellation is not None:
+                cancellation._enter(oracle)
+            try:
+                result = Solver.solve_limited(oracle, assumptions, expect_interrupt=True)
+            finally:
+                with self._lock:
+                    self._current = None
+                if cancellation is not None:
+                    cancellation._exit(oracle)
+                # Limits stick to the solver, so clear them for later unbudgeted calls on a reused oracle.
+                oracle.conf_budget(-1)
+                if propagations is not None:
+                    oracle.prop_budget(-1)
+                after = oracle.accum_stats()
+                self.conflicts += after.get("conflicts", 0) - before.get("conflicts", 0)
+                self.propagations += after.get("propagations", 0) - before.get("propagations", 0)
+            if result is not None:
+                return result
+            if not _is_cadical(oracle):
+                oracle.clear_interrupt()
+            if cancellation is not None and cancellation.cancelled:
+                raise Cancelled()
+            if not sliced or self._expired:
+                raise BudgetExceeded(budget)
+
+
+def _dispatch(oracle: Solver, unlimited, assumptions=[], expect_interrupt: bool = False) -> bool:
+    state = current_state()
+    if state is None and current_cancellation() is not None:
+        state = BudgetState(Budget())  # unlimited, but interruptible
+    if state is None:
+        if unlimited is Solver.solve:
+            return Solver.solve(oracle, assumptions)
+        return Solver.solve_limited(oracle, assumptions, expect_interrupt)
+    return state.solve(oracle, assumptions)
+
+
+def limit_oracle(obj) -> None:
+    # Route the SAT oracle of a pysat solver or tool (RC2, LBX, MUSX, LSU, Hitman) through the budget
+    # active at each call, so a solver kept alive across calls follows the budget of the current one.
+    while obj is not None:
+        if isinstance(obj, Solver):
+            obj.solve = partial(_dispatch, obj, Solver.solve)
+            obj.solve_limited = partial(_dispatch, obj, Solver.solve_limited)
+            return
+        obj = getattr(obj, "oracle", None)
+
+
+def _is_cadical(oracle: Solver) -> bool:
+    return isinstance(oracle.solver, (Cadical103, Cadical153, Cadical195))
+
+
+@contextmanager
+def limited(budget: Budget | None):
+    # Apply a budget to the pysat oracles created in this block; an empty budget leaves them unlimited.
+    if not budget:
+        previous, _local.state = current_state(), None
+        try:
+            yield None
+        finally:
+            _local.state = previous
+        return
+    state = BudgetState(budget)
+    with state.active():
+        yield state
@@ -1,10 +1,59 @@
+import itertools
 import random
+from dataclasses import dataclass
 
 from pysat.formula import CNF as PysatCNF # type: ignore
 from pysat.solvers import Solver # type: ignore
 
+from satquest import codec
 from satquest.constants import SAT_SOLVER_NAME
 
+_MAGIC, _VERSION = b"SQC", 1
+
+
+@dataclass(frozen=True)
+class Permutation:
+    # How a reordered/relabeled CNF relates to its source: new clause j is old clause clauses[j], and old
+    # variable v is renamed variables[v - 1], negated where that is negative (a polarity flip). Maps answers
+    # of the source instance to answers of the new one.
+    clauses: tuple[int, ...]
+    variables: tuple[int, ...]
+
+    @classmethod
+    def identity(cls, mc: int, nv: int) -> "Permutation":
+        return cls(tuple(range(mc)), tuple(range(1, nv + 1)))
+
+    def apply(self, cnf: "CNF") -> "CNF":
+        # New CNF; literal order inside clauses is kept.
+        variables = self.variables
+        clauses = [[variables[lit - 1] if lit > 0 else -variables[-lit - 1] for lit in cnf.clauses[i]] for i in self.clauses]
+        return CNF._from_clauses(clauses, cnf.nv, cnf._is_sat)
+
+    def map_assignment(self, answer: str) -> str:
+        # answer[i] is x_{i+1} (SATSP, MaxSAT).
+        out = [""] * len(answer)
+        for v, value in enumerate(answer):
+            w = self.variables[v]
+            out[abs(w) - 1] = value if w > 0 else "1" if value == "0" else "0"
+        return "".join(out)
+
+    def map_subset(self, answer: str) -> str:
+        # answer[j] marks clause j (MCS, MUS).
+        return "".join(answer[i] for i in self.clauses)
+
+    def then(self, other: "Permutation") -> "Permutation":
+        # This permutation followed by other.
+        variables = tuple(other.variables[abs(w) - 1] * (1 if w > 0 else -1) for w in self.variables)
+        return Permutation(tuple(self.clauses[i] for i in other.clauses), variables)
+
+    def inverse(self) -> "Permutation":
+        clauses, variables = [0] * len(self.clauses), [0] * len(self.variables)
+        for j, i in enumerate(self.clauses):
+            clauses[i] = j
+        for v, w in enumerate(self.variables, 1):
+            variables[abs(w) - 1] = v if w > 0 else -v
+        return Permutation(tuple(clauses), tuple(variables))
+
 
 class CNF:
     def __init__(self, clauses: list | None = None, dimacs: str | None = None):
@@ -38,15 +87,67 @@ class CNF:
                 self._is_sat = solver.solve()
         return self._is_sat
 
-    def shuffle(self, seed: int | None = None) -> None:
+    def shuffle(self, seed: int | None = None, relabel: bool = False) -> Permutation:
+        # Shuffles literals and clauses in place, and with relabel also renames the variables; returns the
+        # permutation so answers of the original order can be mapped (Problem.permuted). Without relabel the
+        # result for a seed is the same as before permutations were tracked.
         self._is_sat = None
         _rng = random.Random(seed)
         for i in range(len(self.clauses)):
             _rng.shuffle(self.clauses[i])
-        _rng.shuffle(self.clauses)
+        order = list(range(len(self.clauses)))
+        _rng.shuffle(order)
+        self.clauses[:] = [self.clauses[i] for i in order]
+        variables = list(range(1, self.nv + 1))
+        if relabel:
+            _rng.shuffle(variables)
+            for clause in self.clauses:
+                clause[:] = [variables[lit - 1] if lit > 0 else -variables[-lit - 1] for lit in clause]
+        return Permutation(tuple(order), tuple(variables))
 
     def sort(self) -> None:
         self._is_sat = None
         for i in range(len(self.clauses)):
             self.clauses[i].sort(key=lambda x: abs(x))
         self.clauses.sort()
+
+    def to_bytes(self) -> bytes:
+        # Compact binary form, see satquest.codec; keeps the cached satisfiability.
+        header = _MAGIC + bytes([_VERSION, {None: 0, True: 1, False: 2}[self._is_sat]]) + codec.pack_u32(self.nv)
+        literals = list(itertools.chain.from_iterable(self.clauses))
+        return header + codec.pack_ints([len(c) for c in self.clauses]) + codec.pack_ints(literals)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CNF":
+        assert data[:3] == _MAGIC and data[3] == _VERSION, "not a SATQuest CNF encoding"
+        is_sat = data[4]
+        nv, offset = codec.unpack_u32(data, 5)
+        lengths, offset = codec.unpack_ints(data, offset)
+        literals, _ = codec.unpack_ints(data, offset)
+        starts = itertools.accumulate(lengths, initial=0)
+        return cls._from_clauses([literals[start : start + n] for start, n in zip(starts, lengths)], nv, (None, True, False)[is_sat])
+
+    @classmethod
+    def from_arrow(cls, literals, offsets, nv: int | None = None) -> "CNF":
+        # Flat literals and clause start offsets (mc + 1 of them), the column layout of satquest.arrow.
+        # pyarrow arrays are read straight from their buffers, so no text is parsed. nv defaults to the
+        # largest literal, which loses unused top variables.
+        literals, offsets = codec.arrow_view(literals), codec.arrow_view(offsets)
+        if isinstance(literals, memoryview):
+            literals = literals.tolist()
+        if isinstance(offsets, memoryview):
+            offsets = offsets.tolist()
+        clauses = [literals[start:end] for start, end in zip(offsets, offsets[1:])]
+        return cls._from_clauses(clauses, max(map(abs, literals), default=0) if nv is None else nv)
+
+    @classmethod
+    def _from_clauses(cls, clauses: list[list[int]], nv: int, is_sat: bool | None = None) -> "CNF":
+        # Takes ownership of clauses, skipping the copy and scan of PysatCNF(from_clauses=...).
+        cnf = cls.__new__(cls)
+        cnf.cnf = PysatCNF()
+        cnf.cnf.clauses, cnf.cnf.nv = clauses, nv
+        cnf._is_sat = is_sat
+        return cnf
+
+    def __reduce__(self):
+        return (self.__class__.from_bytes, (self.to_bytes(),))
@@ -0,0 +1,103 @@
+import struct
+import sys
+from array import array
+
+# Building blocks of the binary encodings of CNF and Problem (CNF.to_bytes, Problem.to_bytes). All
+# integers are little-endian.
+#
+#   ints     u8 width (1, 2, 4 or 8) | u32 count | count signed ints of that width
+#   str      u32 byte length | utf-8 bytes
+#   answers  u32 count | u32 length | count bit-packed 0/1 strings, character i at bit i % 8 of byte i // 8,
+#            ceil(length / 8) bytes each
+#
+# CNF:       b"SQC" | u8 version | u8 is_sat (0 unknown, 1 sat, 2 unsat) | u32 nv | ints clause lengths |
+#            ints literals, clause after clause
+# Problem:   b"SQP" | u8 version | str class name | str config (JSON) | u32 size | CNF | u8 state flags |
+#            answers solution | str solver metadata (JSON) | i64 answer count (-1 unknown) |
+#            answers checked | answers checked correct | u32 cursors | per cursor: str backend |
+#            u8 exhausted | answers
+
+_TYPECODES = {1: "b", 2: "h", 4: "i", 8: "q"}
+_ARROW_TYPECODES = {8: "b", 16: "h", 32: "i", 64: "q"}
+_U32 = struct.Struct("<I")
+
+
+def pack_ints(values: list[int]) -> bytes:
+    # Narrowest width that holds every value; array() range-checks each one for us.
+    for width, typecode in _TYPECODES.items():
+        try:
+            data = array(typecode, values)
+            break
+        except OverflowError:
+            continue
+    if sys.byteorder == "big":
+        data.byteswap()
+    return bytes([width]) + _U32.pack(len(values)) + data.tobytes()
+
+
+def unpack_ints(buf: bytes, offset: int) -> tuple[list[int], int]:
+    width, (count,) = buf[offset], _U32.unpack_from(buf, offset + 1)
+    start = offset + 5
+    data = array(_TYPECODES[width])
+    data.frombytes(buf[start : start + width * count])
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tolist(), start + width * count
+
+
+def pack_u32(value: int) -> bytes:
+    return _U32.pack(value)
+
+
+def unpack_u32(buf: bytes, offset: int) -> tuple[int, int]:
+    return _U32.unpack_from(buf, offset)[0], offset + 4
+
+
+def pack_str(value: str) -> bytes:
+    data = value.encode()
+    return _U32.pack(len(data)) + data
+
+
+def unpack_str(buf: bytes, offset: int) -> tuple[str, int]:
+    size, offset = unpack_u32(buf, offset)
+    return bytes(buf[offset : offset + size]).decode(), offset + size
+
+
+def pack_answers(answers: list[str], length: int) -> bytes:
+    size = (length + 7) // 8
+    out = [_U32.pack(len(answers)), _U32.pack(length)]
+    for answer in answers:
+        assert len(answer) == length
+        out.append(int(answer[::-1] or "0", 2).to_bytes(size, "little"))
+    return b"".join(out)
+
+
+def unpack_answers(buf: bytes, offset: int) -> tuple[list[str], int]:
+    count, offset = unpack_u32(buf, offset)
+    length, offset = unpack_u32(buf, offset)
+    size = (length + 7) // 8
+    answers = []
+    for _ in range(count):
+        value = int.from_bytes(buf[offset : offset + size], "little")
+        answers.append(format(value, f"0{length}b")[::-1] if length else "")
+        offset += size
+    return answers, offset
+
+
+def arrow_view(values) -> "memoryview | list[int]":
+    # Zero-copy view of the data buffer of a pyarrow signed integer array (a ListScalar reads its values);
+    # any other sequence is returned as a list.
+    if hasattr(values, "buffers"):
+        assert not values.null_count, "null literals or offsets"
+        if not len(values):
+            return []
+        typecode = _ARROW_TYPECODES[values.type.bit_width]
+        view = memoryview(values.buffers()[1]).cast(typecode)[values.offset : values.offset + len(values)]
+        if sys.byteorder == "big":  # Arrow buffers are little-endian, so only big-endian hosts copy
+            data = array(typecode, view.tobytes())
+            data.byteswap()
+            return data.tolist()
+        return view
+    if hasattr(values, "values") and hasattr(values, "as_py"):
+        return arrow_view(values.values)
+    return list(values)
@@ -9,6 +9,7 @@ except Exception:
 G_FILE_PATH = os.path.join(os.path.dirname(__file__), "..", "graphs_3_7_c.g6")
 
 SAT_SOLVER_NAME = "g4"
+PORTFOLIO_SOLVER_NAMES = ("g4", "cd19", "mcb", "m22")
 
 COOKIE_NAMES = [
     "oatmeal",
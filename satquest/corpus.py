@@ -0,0 +1,176 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Iterable, Iterator
+
+from pysat.formula import CNF as PysatCNF  # type: ignore
+
+from satquest.cnf import CNF
+
+# On-disk corpus of CNFs, read through mmap so every worker process shares the page cache:
+#   corpus.json     {"version", "count", "byteorder"}, written on close
+#   literals.bin    int32 literals of every clause of every instance, back to back
+#   clauses.bin     uint64 end of each clause in literals.bin, after a leading 0
+#   index.bin       per instance 3 x uint64 (end of its clauses in clauses.bin, end of its metadata in
+#                   metadata.jsonl, nv), after a leading all-zero record
+#   metadata.jsonl  one JSON object per instance
+# so instance i is found in O(1) from index records i and i + 1. Integers are in the writer's byte order.
+VERSION = 1
+_FILES = ("literals.bin", "clauses.bin", "index.bin", "metadata.jsonl")
+_TYPECODES = ("i", "Q", "Q", "B")
+
+
+class CorpusWriter:
+    # Streams instances to a new corpus directory; use as a context manager or call close().
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._files = [open(os.path.join(path, name), "wb") for name in _FILES]
+        self._num_literals = self._num_clauses = self._metadata_size = self.count = 0
+        self._files[1].write(array("Q", [0]).tobytes())
+        self._files[2].write(array("Q", [0, 0, 0]).tobytes())
+
+    def append(self, cnf: CNF, **metadata: Any) -> int:
+        literals, ends = array("i"), array("Q")
+        for clause in cnf.clauses:
+            literals.extend(clause)
+            ends.append(self._num_literals + len(literals))
+        line = (json.dumps(metadata) + "\n").encode()
+        self._num_literals += len(literals)
+        self._num_clauses += len(ends)
+        self._metadata_size += len(line)
+        self._files[0].write(literals.tobytes())
+        self._files[1].write(ends.tobytes())
+        self._files[2].write(array("Q", [self._num_clauses, self._metadata_size, cnf.nv]).tobytes())
+        self._files[3].write(line)
+        self.count += 1
+        return self.count - 1
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+        with open(os.path.join(self.path, "corpus.json"), "w") as f:
+            json.dump({"version": VERSION, "count": self.count, "byteorder": sys.byteorder}, f)
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_corpus(path: str, items: Iterable[tuple[CNF, dict]]) -> int:
+    # Writes (cnf, metadata) pairs; returns the number of instances.
+    with CorpusWriter(path) as writer:
+        for cnf, metadata in items:
+            writer.append(cnf, **metadata)
+    return writer.count
+
+
+class Corpus:
+    # Read-only, memory-mapped view of a corpus directory. corpus[i] is a LazyCNF that decodes its clauses
+    # on first use; nothing is read into the heap up front.
+    def __init__(self, path: str):
+        with open(os.path.join(path, "corpus.json")) as f:
+            header = json.load(f)
+        assert header["version"] == VERSION and header["byteorder"] == sys.byteorder, f"unsupported corpus {header}"
+        self.path = path
+        self.count = header["count"]
+        self._maps: list[tuple[mmap.mmap, memoryview]] = []
+        views = []
+        for name, typecode in zip(_FILES, _TYPECODES):
+            with open(os.path.join(path, name), "rb") as f:
+                if not os.fstat(f.fileno()).st_size:  # an empty file can't be mapped
+                    views.append(memoryview(array(typecode)))
+                    continue
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append((m, memoryview(m)))
+                views.append(self._maps[-1][1].cast(typecode))
+        self._literals, self._clauses, self._index, self._metadata = views
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> "LazyCNF":
+        if not -self.count <= i < self.count:
+            raise IndexError(i)
+        return LazyCNF(self, i % self.count)
+
+    def __iter__(self) -> Iterator["LazyCNF"]:
+        return (LazyCNF(self, i) for i in range(self.count))
+
+    def num_clauses(self, i: int) -> int:
+        return self._index[3 * i + 3] - self._index[3 * i]
+
+    def num_variables(self, i: int) -> int:
+        return self._index[3 * i + 5]
+
+    def clauses(self, i: int) -> list[list[int]]:
+        ends = self._clauses[self._index[3 * i] : self._index[3 * i + 3] + 1].tolist()
+        literals, base = self._literals[ends[0] : ends[-1]].tolist(), ends[0]
+        return [literals[start - base : end - base] for start, end in zip(ends, ends[1:])]
+
+    def metadata(self, i: int) -> dict:
+        return json.loads(self._metadata[self._index[3 * i + 1] : self._index[3 * i + 4]].tobytes())
+
+    def close(self) -> None:
+        # LazyCNFs that have not decoded their clauses yet can't be used afterwards.
+        for view in (self._literals, self._clauses, self._index, self._metadata):
+            view.release()
+        for m, view in self._maps:
+            view.release()
+            m.close()
+        self._maps = []
+        if _open_corpora.get(os.path.abspath(self.path)) is self:  # another instance may be the shared one
+            del _open_corpora[os.path.abspath(self.path)]
+
+
+_open_corpora: dict[str, Corpus] = {}
+
+
+def open_corpus(path: str) -> Corpus:
+    # One mapping per corpus and process; LazyCNFs unpickled in a worker reuse it.
+    path = os.path.abspath(path)
+    if path not in _open_corpora:
+        _open_corpora[path] = Corpus(path)
+    return _open_corpora[path]
+
+
+class LazyCNF(CNF):
+    # CNF backed by a corpus entry. nv and mc come from the index; the clauses are decoded on first use.
+    # Until decoded it pickles as (corpus path, index), so workers map the corpus themselves instead of
+    # receiving clauses.
+    def __init__(self, corpus: Corpus, i: int):
+        self.corpus, self.i = corpus, i
+        self._cnf: PysatCNF | None = None
+        self._is_sat = None
+
+    @property
+    def cnf(self) -> PysatCNF:
+        if self._cnf is None:
+            self._cnf = PysatCNF()
+            self._cnf.clauses, self._cnf.nv = self.corpus.clauses(self.i), self.nv
+        return self._cnf
+
+    @property
+    def nv(self) -> int:
+        return self.corpus.num_variables(self.i)
+
+    @property
+    def mc(self) -> int:
+        return self.corpus.num_clauses(self.i)
+
+    @property
+    def metadata(self) -> dict:
+        return self.corpus.metadata(self.i)
+
+    def __reduce__(self):
+        if self._cnf is None:
+            return (_lazy_cnf, (os.path.abspath(self.corpus.path), self.i))
+        return (CNF.from_bytes, (self.to_bytes(),))  # decoded clauses may have been shuffled or sorted
+
+
+def _lazy_cnf(path: str, i: int) -> LazyCNF:
+    return open_corpus(path)[i]
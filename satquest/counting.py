@@ -0,0 +1,87 @@
+from collections import Counter
+from math import prod
+
+# Exact #SAT by DPLL with unit propagation, splitting into variable-disjoint components and caching the
+# count of every component met. A formula is a frozenset of clauses, each a frozenset of literals, and
+# counts are over the variables that still occur in it.
+
+Formula = frozenset
+
+
+def count_models(clauses: list[list[int]], nv: int) -> int:
+    # Number of assignments to variables 1..nv satisfying every clause.
+    if any(not c for c in clauses):
+        return 0
+    formula = Formula(frozenset(c) for c in clauses if not any(-lit in c for lit in c))
+    return _count(formula, {}) << (nv - len(_variables(formula)))
+
+
+def _variables(formula: Formula) -> set[int]:
+    return {abs(lit) for clause in formula for lit in clause}
+
+
+def _assign(formula: Formula, lit: int) -> tuple[Formula | None, int]:
+    # Formula under lit and the unit literals it implies; (None, 0) on a conflict, else (rest, #assigned).
+    assigned: set[int] = set()
+    pending = [lit]
+    while pending:
+        lit = pending.pop()
+        if -lit in assigned:
+            return None, 0
+        if lit in assigned:
+            continue
+        assigned.add(lit)
+        reduced = set()
+        for clause in formula:
+            if lit in clause:
+                continue
+            if -lit in clause:
+                clause = clause - {-lit}
+                if not clause:
+                    return None, 0
+                if len(clause) == 1:
+                    pending.extend(clause)
+            reduced.add(clause)
+        formula = Formula(reduced)
+    return formula, len(assigned)
+
+
+def _components(formula: Formula) -> list[Formula]:
+    # Clauses grouped by shared variables (union-find over variables).
+    parent: dict[int, int] = {}
+
+    def find(v: int) -> int:
+        while parent.setdefault(v, v) != v:
+            parent[v] = v = parent[parent[v]]
+        return v
+
+    for clause in formula:
+        first, *rest = (find(abs(lit)) for lit in clause)
+        for v in rest:
+            parent[find(v)] = find(first)
+    groups: dict[int, set] = {}
+    for clause in formula:
+        groups.setdefault(find(abs(next(iter(clause)))), set()).add(clause)
+    return [Formula(g) for g in groups.values()]
+
+
+def _count(formula: Formula, cache: dict[Formula, int]) -> int:
+    if not formula:
+        return 1
+    if formula in cache:
+        return cache[formula]
+    components = _components(formula)
+    if len(components) > 1:
+        result = prod(_count(c, cache) for c in components)
+    else:
+        occurrences = Counter(abs(lit) for clause in formula for lit in clause)
+        var = max(occurrences, key=lambda v: (occurrences[v], -v))
+        result = 0
+        for lit in (var, -var):
+            rest, num_assigned = _assign(formula, lit)
+            if rest is not None:
+                # Variables gone from the rest without being assigned are free.
+                free = len(occurrences) - num_assigned - len(_variables(rest))
+                result += _count(rest, cache) << free
+    cache[formula] = result
+    return result
@@ -0,0 +1,63 @@
+from typing import TYPE_CHECKING, Any, Iterator
+
+from satquest.budget import Budget, BudgetExceeded, BudgetState, Cancelled
+
+if TYPE_CHECKING:
+    from satquest.problem import Problem
+
+_DONE = object()
+
+
+class EnumerationCursor:
+    # Memoized, resumable view over a problem's answers; obtained from Problem.cursor().
+    def __init__(self, problem: "Problem", solver_name: str, max_blocking: int | None = None):
+        self.problem = problem
+        self.solver_name = solver_name
+        # Answers the live solver may block; enumeration stops there instead of growing its clause database.
+        self.max_blocking = max_blocking
+        self.answers: list[Any] = []
+        self.exhausted = False  # every answer has been produced
+        self.capped = False  # stopped at max_blocking
+        self._seen: set = set()
+        self._live = None
+
+    def take(self, k: int, budget: Budget | None = None) -> list[Any]:
+        # First k answers, resuming the live enumeration for the ones not produced yet. Returns fewer if
+        # the enumeration is exhausted, capped or runs out of budget; a later call picks up from there.
+        if len(self.answers) >= k or self.exhausted:
+            return self.answers[:k]
+        # Always active, so the oracles of the live enumeration follow the budget of later calls too.
+        state = BudgetState(self.problem._budget(budget) or Budget())
+        try:
+            with state.active():
+                while len(self.answers) < k:
+                    if self.max_blocking is not None and len(self.answers) >= self.max_blocking:
+                        self.capped = True
+                        break
+                    if self._live is None:
+                        self._live = self.problem._solution_enumerate(self.solver_name, tuple(self.answers))
+                    answer = next(self._live, _DONE)
+                    if answer is _DONE:
+                        self.exhausted, self._live = True, None
+                        break
+                    if answer not in self._seen:
+                        self._seen.add(answer)
+                        self.answers.append(answer)
+        except BudgetExceeded:
+            # The interrupt ended the live generator; the next call restarts it past the known answers.
+            self._live = None
+        except Cancelled:
+            self._live = None
+            raise
+        return self.answers[:k]
+
+    def __iter__(self) -> Iterator[Any]:
+        i = 0
+        while i < len(self.answers) or len(self.take(i + 1)) > i:
+            yield self.answers[i]
+            i += 1
+
+    def close(self) -> None:
+        if self._live is not None:
+            self._live.close()
+            self._live = None
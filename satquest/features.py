@@ -0,0 +1,125 @@
+import json
+import multiprocessing as mp
+import random
+from typing import Any, Iterable, Sequence
+
+from pysat.solvers import Solver  # type: ignore
+
+from satquest.arrow import cnf_from_row
+from satquest.cnf import CNF
+from satquest.constants import SAT_SOLVER_NAME
+from satquest.problem import create_problem
+
+# Clause lengths from 1 up to this are counted separately; longer clauses share the last bucket.
+MAX_CLAUSE_LENGTH_BUCKET = 6
+# MCS/MUS counts come from enumeration, which stops here and records None.
+COUNT_LIMIT = 10_000
+P_TYPES = ("SATSP", "MaxSAT", "MCS", "MUS")
+
+
+def backbone(cnf: CNF, solver_name: str = SAT_SOLVER_NAME) -> list[int]:
+    # Literals true in every model (empty for an unsatisfiable formula). Each candidate from the first model
+    # is tested by solving with its negation; a counter-model also drops every candidate it flips.
+    with Solver(name=solver_name, bootstrap_with=cnf.clauses) as solver:
+        if not solver.solve():
+            return []
+        candidates = set(solver.get_model())
+        result = []
+        while candidates:
+            lit = candidates.pop()
+            if solver.solve(assumptions=[-lit]):
+                candidates.intersection_update(solver.get_model())
+            else:
+                result.append(lit)
+        return sorted(result, key=abs)
+
+
+def extract_features(
+    unsat_cnf: CNF,
+    sat_cnf: CNF,
+    solver_metadatas: dict | None = None,
+    count_limit: int | None = COUNT_LIMIT,
+) -> dict[str, Any]:
+    # Flat per-instance features: structure of the UNSAT formula, the backbone of its SAT twin, solver
+    # conflicts per problem type (from solver_metadatas when given, else solved here) and answer counts.
+    lengths = [len(clause) for clause in unsat_cnf.clauses]
+    features: dict[str, Any] = {
+        "num_variable": unsat_cnf.nv,
+        "num_clause": unsat_cnf.mc,
+        "num_literal": sum(lengths),
+        "clause_variable_ratio": unsat_cnf.mc / unsat_cnf.nv,
+    }
+    for k in range(1, MAX_CLAUSE_LENGTH_BUCKET + 1):
+        in_bucket = sum(1 for n in lengths if n == k or (k == MAX_CLAUSE_LENGTH_BUCKET and n > k))
+        features[f"clause_length_{k}{'+' if k == MAX_CLAUSE_LENGTH_BUCKET else ''}"] = in_bucket
+    features["backbone_size"] = len(backbone(sat_cnf))
+    for p_type in P_TYPES:
+        problem = create_problem(p_type, sat_cnf if p_type == "SATSP" else unsat_cnf)
+        metadata = (solver_metadatas or {}).get(p_type) or problem.solver_metadata or {}
+        features[f"{p_type.lower()}_conflicts"] = metadata.get("conflicts")
+        features[f"{p_type.lower()}_count"] = problem.count(limit=count_limit)
+    return features
+
+
+def _extract_row(row: dict) -> dict[str, Any]:
+    return extract_features(cnf_from_row(row, "unsat"), cnf_from_row(row, "sat"), row.get("solver_metadatas"))
+
+
+class FeatureIndex:
+    # Column store of instance features keyed by dataset id, for selecting instances by difficulty without
+    # re-solving. Numeric filters are inclusive (low, high) ranges with None for an open end; rows whose value
+    # is None never match a range.
+    def __init__(self, columns: dict[str, list]):
+        assert "id" in columns and len({len(values) for values in columns.values()}) == 1
+        self.columns = columns
+
+    @classmethod
+    def build(cls, rows: Iterable[dict], processes: int | None = 1) -> "FeatureIndex":
+        # Rows are dataset items (id, sat_dimacs, unsat_dimacs, optionally solver_metadatas and features).
+        # Features stored by the generator are reused; the others are extracted over a process pool.
+        rows = list(rows)
+        missing = [row for row in rows if not row.get("features")]
+        if processes == 1 or len(missing) < 2:
+            extracted = [_extract_row(row) for row in missing]
+        else:
+            with mp.get_context().Pool(processes) as pool:
+                extracted = pool.map(_extract_row, missing)
+        by_id = {row["id"]: features for row, features in zip(missing, extracted)}
+        records = [{"id": row["id"], **(row.get("features") or by_id[row["id"]])} for row in rows]
+        names = list(dict.fromkeys(name for record in records for name in record))
+        return cls({name: [record.get(name) for record in records] for name in names})
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def column(self, name: str) -> list:
+        return self.columns[name]
+
+    def select(self, **ranges: tuple[float | None, float | None]) -> list[int]:
+        # Ids of the rows inside every range, e.g. select(num_variable=(4, 8), mus_count=(2, None)).
+        keep = [True] * len(self)
+        for name, (low, high) in ranges.items():
+            for i, value in enumerate(self.columns[name]):
+                if keep[i] and (value is None or (low is not None and value < low) or (high is not None and value > high)):
+                    keep[i] = False
+        return [row_id for row_id, k in zip(self.columns["id"], keep) if k]
+
+    def sample(self, k: int, seed: int | None = None, **ranges: tuple[float | None, float | None]) -> list[int]:
+        ids = self.select(**ranges)
+        return random.Random(seed).sample(ids, min(k, len(ids)))
+
+    def order_by(self, name: str, ids: Sequence[int] | None = None, descending: bool = False) -> list[int]:
+        # Ids sorted by a feature (rows with None last), e.g. easy-to-hard for a curriculum.
+        value = dict(zip(self.columns["id"], self.columns[name]))
+        ids = self.columns["id"] if ids is None else ids
+        known = sorted((i for i in ids if value[i] is not None), key=lambda i: value[i], reverse=descending)
+        return known + [i for i in ids if value[i] is None]
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.columns, f)
+
+    @classmethod
+    def load(cls, path: str) -> "FeatureIndex":
+        with open(path) as f:
+            return cls(json.load(f))
@@ -0,0 +1,127 @@
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Checked by every instrumentation point; when False nothing is recorded and no timer is started.
+ENABLED = os.environ.get("SATQUEST_METRICS", "0").lower() in ("1", "true", "yes")
+
+BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+_lock = threading.Lock()
+_counters: dict[tuple, float] = {}
+_histograms: dict[tuple, list] = {}  # key -> [bucket counts..., +Inf count, sum]
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def enable() -> None:
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def inc(name: str, n: float = 1, **labels: str) -> None:
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+        hist[-1] += seconds
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: dict):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def timer(name: str, **labels: str):
+    # Context manager observing the elapsed time of its block; a shared no-op when disabled.
+    return _Timer(name, labels) if ENABLED else _NULL_TIMER
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = [{"name": k[0], "labels": dict(k[1]), "value": v} for k, v in _counters.items()]
+        histograms = []
+        for k, hist in _histograms.items():
+            histograms.append(
+                {
+                    "name": k[0],
+                    "labels": dict(k[1]),
+                    "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], hist[:-1])),
+                    "count": sum(hist[:-1]),
+                    "sum": hist[-1],
+                }
+            )
+    return {"counters": counters, "histograms": histograms}
+
+
+def to_json(indent: int | None = None) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _labels_text(labels: dict, **extra: str) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(items.items())) + "}"
+
+
+def to_prometheus(prefix: str = "satquest_") -> str:
+    lines, seen = [], set()
+    snap = snapshot()
+    for c in sorted(snap["counters"], key=lambda c: c["name"]):
+        name = prefix + c["name"]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_labels_text(c['labels'])} {c['value']}")
+    for h in sorted(snap["histograms"], key=lambda h: h["name"]):
+        name = prefix + h["name"]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for le, n in h["buckets"].items():
+            cumulative += n
+            lines.append(f"{name}_bucket{_labels_text(h['labels'], le=le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels_text(h['labels'])} {h['sum']}")
+        lines.append(f"{name}_count{_labels_text(h['labels'])} {h['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+import itertools
+import math
+import multiprocessing as mp
+import os
+from collections import Counter
+from typing import Generator, Sequence
+
+from pysat.examples.hitman import Hitman  # type: ignore
+from pysat.examples.lbx import LBX as MCSSolver  # type: ignore
+from pysat.formula import WCNF  # type: ignore
+from pysat.solvers import Solver  # type: ignore
+
+from satquest.problem import MCS, MUS, Problem
+
+# Each cube forces the split clauses into or out of the answer, so cubes partition the answers and
+# their union is exactly the serial enumeration. 2**depth cubes are spread over the pool; deeper splits
+# balance better but repeat more work across cubes.
+
+
+def _split_clauses(clauses: list[list[int]], depth: int) -> list[int]:
+    # Clauses over the most frequent variables tend to split the answers most evenly.
+    freq = Counter(abs(lit) for clause in clauses for lit in clause)
+    order = sorted(range(len(clauses)), key=lambda i: (-sum(freq[abs(lit)] for lit in clauses[i]), i))
+    return sorted(i + 1 for i in order[:depth])
+
+
+def _cubes(split: list[int]) -> list[tuple[frozenset, frozenset]]:
+    # (forced in, forced out) clause ids for every polarity of the split clauses.
+    return [
+        (frozenset(c for c, b in zip(split, bits) if b), frozenset(c for c, b in zip(split, bits) if not b))
+        for bits in itertools.product((True, False), repeat=len(split))
+    ]
+
+
+def _mcs_cube(clauses: list[list[int]], solver_name: str, cube: tuple[frozenset, frozenset]) -> list[tuple[int, ...]]:
+    # MCSes containing every clause of `into` and none of `out`: the MCSes N of the formula without `into`
+    # and with `out` hard, such that each clause of `into` is still needed (dropping it from N + into leaves
+    # the formula unsatisfiable).
+    into, out = cube
+    mc, nv = len(clauses), max(abs(lit) for clause in clauses for lit in clause)
+    sels = [nv + i for i in range(1, mc + 1)]
+    with Solver(name=solver_name, bootstrap_with=[c + [-s] for c, s in zip(clauses, sels)]) as checker:
+        if not checker.solve(assumptions=[sels[i - 1] for i in out]):
+            return []
+        soft = [i for i in range(1, mc + 1) if i not in into and i not in out]
+        wcnf = WCNF()
+        for i in out:
+            wcnf.append(clauses[i - 1])
+        for i in soft:
+            wcnf.append(clauses[i - 1], weight=1)
+        answers = []
+        with MCSSolver(wcnf, use_cld=False, solver_name=solver_name) as mcs_solver:
+            for mcs in mcs_solver.enumerate():
+                mcs_solver.block(mcs)
+                removed = into | {soft[j - 1] for j in mcs}
+                if not any(checker.solve(assumptions=[s for i, s in enumerate(sels, 1) if i not in removed or i == c]) for c in into):
+                    answers.append(tuple(sorted(removed)))
+                if not mcs:
+                    break  # the remaining formula is satisfiable; LBX would keep yielding the empty set
+        return answers
+
+
+def _mhs_cube(sets: list[frozenset], hitman_solver_name: str, cube: tuple[frozenset, frozenset]) -> list[tuple[int, ...]]:
+    # Minimal hitting sets (the MUSes, by duality with the MCSes) containing `into` and avoiding `out`:
+    # into + H' for every minimal hitting set H' of the sets `into` misses, with `out` removed, such that
+    # each element of `into` still has a set only it hits.
+    into, out = cube
+    rest = [s - out for s in sets if not s & into]
+    if any(not s for s in rest):
+        return []
+    answers = []
+    candidates: Sequence = [[]]
+    with Hitman(bootstrap_with=[sorted(s) for s in rest], solver=hitman_solver_name) as hitman:
+        if rest:
+            candidates = hitman.enumerate()
+        for hs in candidates:
+            hitting = into | set(hs)
+            if all(any(s & hitting == {c} for s in sets) for c in into):
+                answers.append(tuple(sorted(hitting)))
+    return answers
+
+
+def _run_cubes(fn, args: tuple, cubes: list, processes: int) -> Generator[tuple[int, ...], None, None]:
+    if processes == 1:
+        for cube in cubes:
+            yield from fn(*args, cube)
+        return
+    with mp.get_context().Pool(processes) as pool:
+        for answers in pool.imap_unordered(_CubeTask(fn, args), cubes):
+            yield from answers
+
+
+class _CubeTask:
+    # Picklable partial for the pool.
+    def __init__(self, fn, args: tuple):
+        self.fn, self.args = fn, args
+
+    def __call__(self, cube):
+        return self.fn(*self.args, cube)
+
+
+def parallel_enumerate(problem: Problem, processes: int | None = None, depth: int | None = None) -> Generator[str, None, None]:
+    # Every MCS or MUS of the problem, in no particular order, enumerated over a process pool. MUSes are
+    # the minimal hitting sets of the MCSes, so MUS enumeration runs the MCS pass first and shares its
+    # sets with every hitting set worker.
+    if not isinstance(problem, (MCS, MUS)):
+        raise ValueError(f"Parallel enumeration supports MCS and MUS, not {problem.__class__.__name__}")
+    assert not problem.cnf.is_sat
+    processes = processes or os.cpu_count() or 1
+    depth = min(problem.cnf.mc, depth if depth is not None else math.ceil(math.log2(processes)) + 1)
+    clauses = problem.cnf.clauses
+    solver_name = problem._solver_names(None)[0]
+    cubes = _cubes(_split_clauses(clauses, depth))
+    mcses = _run_cubes(_mcs_cube, (clauses, solver_name), cubes, processes)
+    if isinstance(problem, MUS):
+        sets = [frozenset(mcs) for mcs in mcses]
+        # Splitting on the clauses in most MCSes keeps the hitting set families of the `into` cubes small.
+        freq = Counter(i for s in sets for i in s)
+        split = sorted(sorted(freq, key=lambda i: (-freq[i], i))[:depth])
+        answers = _run_cubes(_mhs_cube, (sets, problem.hitman_solver_name), _cubes(split), processes)
+    else:
+        answers = mcses
+    for answer in answers:
+        yield "".join(["1" if i in answer else "0" for i in range(1, problem.cnf.mc + 1)])
@@ -0,0 +1,48 @@
+import multiprocessing as mp
+import queue as queue_lib
+from typing import Any, Callable, Sequence
+
+from satquest.budget import Cancelled, current_cancellation
+
+
+def _race_worker(queue, index: int, fn: Callable, args: tuple) -> None:
+    try:
+        queue.put((index, True, fn(*args)))
+    except BaseException as e:
+        queue.put((index, False, e))
+
+
+def race(fn: Callable, args_list: Sequence[tuple], start_method: str | None = None) -> tuple[int, Any]:
+    # Run fn(*args) for every args in parallel processes; return (index, result) of the first to
+    # finish without raising and terminate the rest. Raises the first error if all of them fail, and
+    # Cancelled (terminating them all) once an active Cancellation is triggered.
+    ctx, cancellation = mp.get_context(start_method), current_cancellation()
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_race_worker, args=(queue, i, fn, args), daemon=True) for i, args in enumerate(args_list)]
+    for p in procs:
+        p.start()
+    errors: list[BaseException] = []
+    try:
+        while len(errors) < len(procs):
+            try:
+                index, ok, result = queue.get(timeout=0.1)
+            except queue_lib.Empty:
+                if cancellation is not None and cancellation.cancelled:
+                    raise Cancelled()
+                if not any(p.is_alive() for p in procs) and queue.empty():
+                    # Workers that crashed without reporting (e.g. killed by a signal).
+                    errors.append(RuntimeError("portfolio worker exited without a result"))
+                    break
+                continue
+            if ok:
+                return index, result
+            errors.append(result)
+        raise errors[0]
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+        queue.close()
+        queue.join_thread()
@@ -1,41 +1,353 @@
+import json
+import struct
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Generator
+from collections import OrderedDict
+from dataclasses import asdict
+from concurrent.futures import Executor
+from typing import Any, AsyncGenerator, Generator, Iterable, Sequence
 
 from pysat.examples.lbx import LBX as MCSSolver # type: ignore
 from pysat.examples.musx import MUSX as MUSSolver # type: ignore
 from pysat.examples.rc2 import RC2 as MaxSATSolver # type: ignore
+from pysat.examples.rc2 import RC2Stratified as MaxSATStratifiedSolver # type: ignore
 from pysat.solvers import Solver # type: ignore
-from pysat.examples.lsu import LSU # type: ignore
 from pysat.examples.hitman import Hitman # type: ignore
-
-from satquest.cnf import CNF
-from satquest.constants import GIT_HASH, SAT_SOLVER_NAME
+from pysat.formula import WCNF # type: ignore
+
+from satquest import aio, codec, metrics, truth_table
+from satquest.budget import UNKNOWN, Budget, BudgetExceeded, BudgetState, current_cancellation, current_state, get_default_budget, limit_oracle, limited
+from satquest.cnf import CNF, Permutation
+from satquest.counting import count_models
+from satquest.constants import GIT_HASH, PORTFOLIO_SOLVER_NAMES, SAT_SOLVER_NAME
+from satquest.cursor import EnumerationCursor
+from satquest.portfolio import race
+from satquest.prompt_length import PromptLength, TokenCounter
 from satquest.question import Question
 from satquest.satquest_utils import cnf2wcnf, get_class_source_hash
+from satquest.truth_table import TruthTable
+
+
+# Portfolio workers set raise_errors: a backend error then loses the race instead of coming back as a
+# (None, None) solution or a False check that could win it.
+_backend = threading.local()
+
+
+def _raise_backend_errors() -> bool:
+    return getattr(_backend, "raise_errors", False)
+
+
+def _call_with_solver(
+    problem: "Problem", method: str, args: tuple, solver_name: str, budget: Budget | None, raise_errors: bool = False
+) -> Any:
+    previous, _backend.raise_errors = _raise_backend_errors(), raise_errors
+    try:
+        with limited(budget):
+            return getattr(problem, method)(*args, solver_name)
+    finally:
+        _backend.raise_errors = previous
+
+
+def _solve_remote(problem: "Problem", budget: Budget | None) -> tuple[Any | None, dict | None]:
+    return problem.solve(budget), problem._solver_metadata
+
+
+def _enumerate_remote(problem: "Problem", solver_name: str, known: list, k: int, budget: Budget | None) -> tuple[list, bool]:
+    # Up to k answers past `known` from a fresh enumeration, and whether it ended (UNKNOWN last if the budget ran out).
+    seen, answers = set(known), []
+    generator = problem._solution_enumerate(solver_name, tuple(known))
+    try:
+        with limited(budget):
+            for answer in generator:
+                if answer not in seen:
+                    seen.add(answer)
+                    answers.append(answer)
+                    if len(answers) == k:
+                        return answers, False
+    except BudgetExceeded:
+        return answers + [UNKNOWN], True
+    finally:
+        generator.close()
+    return answers, True
+
+
+_MAGIC, _VERSION = b"SQP", 1
+_DONE = object()
+# Answers fetched per process-pool call by aenumerate.
+ENUMERATE_CHUNK = 64
+# Check results a Problem keeps, least recently used evicted first.
+CHECKED_CACHE_SIZE = 4096
+# Per-instance settings carried by Problem.to_bytes when set on the instance rather than the class.
+_CONFIG_ATTRS = ("solver_name", "budget", "truth_table_max_variables", "stratified", "exhaust", "hitman_solver_name")
+
+
+def num_falsified(clauses: list[list[int]], answer: str) -> int:
+    # Number of clauses the assignment (answer[i] is x_{i+1}) falsifies.
+    values = [False] + [ai == "1" for ai in answer]
+    return sum(1 for clause in clauses if not any(values[abs(lit)] == (lit > 0) for lit in clause))
+
+
+def _tuples(value: Any) -> Any:
+    # JSON gives lists back for the tuples in solver metadata ("solvers", "portfolio").
+    if isinstance(value, dict):
+        return {k: _tuples(v) for k, v in value.items()}
+    return tuple(value) if isinstance(value, list) else value
 
 
 class Problem(ABC):
-    def __init__(self, cnf: CNF):
+    # pysat backend name, or "portfolio" / a sequence of names to race them in parallel processes.
+    solver_name: str | Sequence[str] = SAT_SOLVER_NAME
+    # Limits for solution, check and solution_enumerate; falls back to budget.get_default_budget().
+    budget: Budget | None = None
+    # Instances with at most this many variables are enumerated and checked on an exhaustive NumPy truth
+    # table instead of pysat; 0 disables it. The reference solution and its metadata always come from pysat.
+    truth_table_max_variables: int = truth_table.MAX_VARIABLES
+
+    def __init__(
+        self,
+        cnf: CNF,
+        solver_name: str | Sequence[str] | None = None,
+        budget: Budget | None = None,
+        truth_table_max_variables: int | None = None,
+    ):
         self.cnf = cnf
+        if solver_name is not None:
+            self.solver_name = solver_name
+        if budget is not None:
+            self.budget = budget
+        if truth_table_max_variables is not None:
+            self.truth_table_max_variables = truth_table_max_variables
+        self._truth_table: TruthTable | None = None
+        self._answer_count: int | None = None
+        self._checked: OrderedDict[Any, bool] = OrderedDict()  # check_batch results by answer, in LRU order
+        self._solved = False
         self._solution = None
         self._solver_metadata = None
+        self._cursors: dict[str, EnumerationCursor] = {}
 
     @property
-    @abstractmethod
     def solution(self) -> Any | None:
+        return self.solve()
+
+    def solve(self, budget: Budget | None = None) -> Any | None:
+        # Cached reference solution, UNKNOWN if the budget ran out; an explicit budget retries an UNKNOWN.
+        if not self._solved or (budget is not None and self._solution is UNKNOWN):
+            p_name = self.__class__.__name__
+            metrics.inc("solution_cache_misses_total", problem=p_name)
+            budget = self._budget(budget)
+            with metrics.timer("solve_seconds", problem=p_name):
+                try:
+                    self._solution, self._solver_metadata = self._with_solver("_solve", (), None, budget)
+                except BudgetExceeded:
+                    metrics.inc("budget_exceeded_total", problem=p_name, op="solve")
+                    self._solution, self._solver_metadata = UNKNOWN, {"status": "unknown", "budget": asdict(budget)}
+            self._solved = True
+        elif metrics.ENABLED:
+            metrics.inc("solution_cache_hits_total", problem=self.__class__.__name__)
+        return self._solution
+
+    def solution_enumerate(self, solver_name: str | None = None, budget: Budget | None = None) -> Generator[str | None, None, None]:
+        # Enumeration is a stateful generator, so a portfolio setting falls back to its first backend.
+        # The budget covers the time spent inside the generator; running out yields UNKNOWN and stops.
+        solver_names = self._solver_names(solver_name)
+        cursor = self._cursors.get(solver_names[0])
+        if cursor is not None and cursor.exhausted:  # every answer is known, e.g. carried over by permuted()
+            yield from list(cursor.answers)
+            return
+        budget = self._budget(budget)
+        if not metrics.ENABLED and not budget:
+            yield from self._solution_enumerate(solver_names[0])
+            return
+        p_name, state = self.__class__.__name__, BudgetState(budget) if budget else None
+        answers = self._solution_enumerate(solver_names[0])
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    if state is None:
+                        answer = next(answers)
+                    else:
+                        with state.active():
+                            answer = next(answers)
+                except StopIteration:
+                    return
+                except BudgetExceeded:
+                    metrics.inc("budget_exceeded_total", problem=p_name, op="enumerate")
+                    yield UNKNOWN
+                    return
+                if metrics.ENABLED:
+                    metrics.inc("enumerate_yields_total", problem=p_name)
+                    metrics.observe("enumerate_next_seconds", time.perf_counter() - start, problem=p_name)
+                yield answer
+        finally:
+            answers.close()
+
+    def cursor(self, solver_name: str | None = None, max_blocking: int | None = None) -> EnumerationCursor:
+        # One cursor per backend, kept on the problem so later take() calls resume earlier work.
+        solver_name = self._solver_names(solver_name)[0]
+        cursor = self._cursors.get(solver_name)
+        if cursor is None:
+            cursor = self._cursors[solver_name] = EnumerationCursor(self, solver_name, max_blocking)
+        elif max_blocking is not None:
+            cursor.max_blocking = max_blocking
+        return cursor
+
+    def check(self, answer: Any, solver_name: str | Sequence[str] | None = None, budget: Budget | None = None) -> bool:
+        # True/False, or UNKNOWN (falsy) if the budget ran out.
+        with metrics.timer("check_seconds", problem=self.__class__.__name__):
+            try:
+                return self._with_solver("_check", (answer,), solver_name, self._budget(budget))
+            except BudgetExceeded:
+                metrics.inc("budget_exceeded_total", problem=self.__class__.__name__, op="check")
+                return UNKNOWN
+
+    def check_batch(
+        self, answers: Sequence[Any], solver_name: str | Sequence[str] | None = None, budget: Budget | None = None
+    ) -> tuple[list[bool], list[bool]]:
+        # (is_correct, is_format_correct) for every answer. Malformed answers are never checked, identical
+        # ones are checked once, and results are kept on the problem for later batches (UNKNOWN ones excepted).
+        is_format_correct = [self.format_check(answer) for answer in answers]
+        unique = dict.fromkeys(a for a, ok in zip(answers, is_format_correct) if ok)
+        checked = {a: self._checked[a] for a in unique if a in self._checked}
+        for answer in checked:
+            self._checked.move_to_end(answer)
+        pending = [a for a in unique if a not in checked]
+        if pending:
+            p_name = self.__class__.__name__
+            with metrics.timer("check_batch_seconds", problem=p_name):
+                try:
+                    results = self._with_solver("_check_batch", (pending,), solver_name, self._budget(budget))
+                except BudgetExceeded:
+                    metrics.inc("budget_exceeded_total", problem=p_name, op="check_batch")
+                    results = [UNKNOWN] * len(pending)
+            checked.update(zip(pending, results))
+            self._remember_checks((a, r) for a, r in zip(pending, results) if r is not UNKNOWN)
+        is_correct = [checked.get(a, UNKNOWN) if ok else False for a, ok in zip(answers, is_format_correct)]
+        return is_correct, is_format_correct
+
+    def _remember_checks(self, results: Iterable[tuple[Any, bool]]) -> None:
+        for answer, ok in results:
+            self._checked[answer] = ok
+            self._checked.move_to_end(answer)
+        while len(self._checked) > CHECKED_CACHE_SIZE:
+            self._checked.popitem(last=False)
+
+    def _check_batch(self, answers: list[Any], solver_name: str) -> list[bool]:
+        # Well-formed, distinct answers.
+        return [self._check(answer, solver_name) for answer in answers]
+
+    def count(self, limit: int | None = None) -> int | None:
+        # Number of distinct valid answers, cached once known. SATSP and MaxSAT count exactly without listing
+        # the answers; the other types enumerate them and give None past `limit` answers.
+        if self._answer_count is None:
+            with metrics.timer("count_seconds", problem=self.__class__.__name__):
+                self._answer_count = self._count(self._solver_names(None)[0], limit)
+        return self._answer_count
+
+    def _count(self, solver_name: str, limit: int | None) -> int | None:
+        answers = self._solution_enumerate(solver_name)
+        try:
+            num_answers = 0
+            for _ in answers:
+                num_answers += 1
+                if limit is not None and num_answers > limit:
+                    return None
+            return num_answers
+        finally:
+            answers.close()
+
+    # Awaitable versions of solve, check, check_batch and solution_enumerate, run on an executor so solving
+    # doesn't block the event loop; see satquest.aio for executor choice and cancellation.
+    async def asolution(self, budget: Budget | None = None, executor: Executor | None = None) -> Any | None:
+        if self._solved and (budget is None or self._solution is not UNKNOWN):
+            return self.solve(budget)
+        if not aio.in_process(executor):
+            return await aio.run(self, executor, self.solve, budget)
+        solution, solver_metadata = await aio.run(self, executor, _solve_remote, self, self._budget(budget))
+        self._solution, self._solver_metadata, self._solved = solution, solver_metadata, True
+        return solution
+
+    async def acheck(
+        self, answer: Any, solver_name: str | Sequence[str] | None = None, budget: Budget | None = None, executor: Executor | None = None
+    ) -> bool:
+        return await aio.run(self, executor, self.check, answer, solver_name, budget)
+
+    async def acheck_batch(
+        self,
+        answers: Sequence[Any],
+        solver_name: str | Sequence[str] | None = None,
+        budget: Budget | None = None,
+        executor: Executor | None = None,
+    ) -> tuple[list[bool], list[bool]]:
+        if all(answer in self._checked for answer in answers):
+            return self.check_batch(answers)
+        if not aio.in_process(executor):
+            return await aio.run(self, executor, self.check_batch, answers, solver_name, budget)
+        is_correct, is_format_correct = await aio.run(self, executor, self.check_batch, answers, solver_name, budget)
+        self._remember_checks((a, r) for a, r, ok in zip(answers, is_correct, is_format_correct) if ok and r is not UNKNOWN)
+        return is_correct, is_format_correct
+
+    async def aenumerate(
+        self, solver_name: str | None = None, budget: Budget | None = None, executor: Executor | None = None
+    ) -> AsyncGenerator[str | None, None]:
+        # In a process pool the answers come ENUMERATE_CHUNK at a time, and the budget applies to each chunk.
+        if aio.in_process(executor):
+            known, solver_name, budget, done = [], self._solver_names(solver_name)[0], self._budget(budget), False
+            while not done:
+                answers, done = await aio.run(self, executor, _enumerate_remote, self, solver_name, known, ENUMERATE_CHUNK, budget)
+                for answer in answers:
+                    yield answer
+                known += answers
+            return
+        answers = self.solution_enumerate(solver_name, budget)
+        try:
+            while (answer := await aio.run(self, executor, next, answers, _DONE)) is not _DONE:
+                yield answer
+        finally:
+            answers.close()
+
+    @abstractmethod
+    def _solve(self, solver_name: str) -> tuple[Any | None, dict | None]:
+        # Reference solve; returns (solution, solver metadata) for the cache.
         pass
 
     @abstractmethod
-    def solution_enumerate(self) -> Generator[str | None, None, None]:
+    def _solution_enumerate(self, solver_name: str, known: Sequence[str] = ()) -> Generator[str | None, None, None]:
+        # known: answers already produced; blocked up front where the solver allows, otherwise re-yielded.
         pass
 
-    @property
     @abstractmethod
-    def search_space_size(self) -> Any:
+    def _check(self, answer: Any, solver_name: str) -> bool:
         pass
 
+    def _solver_names(self, solver_name: str | Sequence[str] | None) -> tuple[str, ...]:
+        solver_name = solver_name or self.solver_name
+        if solver_name == "portfolio":
+            return PORTFOLIO_SOLVER_NAMES
+        return (solver_name,) if isinstance(solver_name, str) else tuple(solver_name)
+
+    def _budget(self, budget: Budget | None) -> Budget | None:
+        return budget or self.budget or get_default_budget() or None
+
+    def _with_solver(self, method: str, args: tuple, solver_name: str | Sequence[str] | None, budget: Budget | None) -> Any:
+        solver_names = self._solver_names(solver_name)
+        if len(solver_names) == 1:
+            return _call_with_solver(self, method, args, solver_names[0], budget)
+        try:
+            _, result = race(_call_with_solver, [(self, method, args, name, budget, True) for name in solver_names])
+        except BudgetExceeded:
+            raise
+        except Exception:
+            # Every backend failed: give the result a single failing backend gives.
+            return _call_with_solver(self, method, args, solver_names[0], budget)
+        if method == "_solve" and result[1] is not None:
+            result = result[0], {**result[1], "portfolio": solver_names}
+        return result
+
+    @property
     @abstractmethod
-    def check(self, answer: Any) -> bool:
+    def search_space_size(self) -> Any:
         pass
 
     @abstractmethod
@@ -48,45 +360,203 @@ class Problem(ABC):
 
     @property
     @abstractmethod
-    def ANSWER_PATTERN(self) -> str:
+    def answer_length(self) -> int:
         pass
 
+    def prompt_length(self, question: Question, counter: TokenCounter | None = None) -> PromptLength:
+        # Length of self.accept(question), computed without rendering the formula (satquest.prompt_length).
+        return question.prompt_length(self.__class__.__name__.lower(), self.cnf, counter)
+
+    @property
+    def ANSWER_PATTERN(self) -> str:
+        return r"(?=([01]{%d}))" % self.answer_length
+
     @property
     def solver_metadata(self) -> dict | None:
         if self._solver_metadata is None:
             _ = self.solution
         return self._solver_metadata
 
+    @property
+    def truth_table(self) -> TruthTable | None:
+        # Built on first use; None if the instance is too large or numpy is missing.
+        if self._truth_table is None and truth_table.available(self.cnf, self.truth_table_max_variables):
+            with metrics.timer("truth_table_build_seconds", problem=self.__class__.__name__):
+                self._truth_table = TruthTable(self.cnf)
+        return self._truth_table
+
+    def _cheap_truth_table(self) -> TruthTable | None:
+        # Checks and enumeration only use the table once built (e.g. through self.truth_table) or when building
+        # it is about as cheap as a solver call; past that the solvers win by orders of magnitude.
+        if self._truth_table is not None or self.cnf.nv <= min(truth_table.CHECK_VARIABLES, self.truth_table_max_variables):
+            return self.truth_table
+        return None
+
+    def _make_solver(self, solver_cls: type, *args, **kwargs) -> Any:
+        with metrics.timer("solver_construct_seconds", problem=self.__class__.__name__, solver=solver_cls.__name__):
+            solver = solver_cls(*args, **kwargs)
+        if current_state() is not None or current_cancellation() is not None:
+            limit_oracle(solver)
+        return solver
+
+    def shuffled(self, seed: int | None = None, relabel: bool = False) -> "Problem":
+        # Same problem on a shuffled (and with relabel, renamed) copy of the CNF, with the cached results
+        # carried over instead of solved again.
+        cnf = CNF._from_clauses([clause[:] for clause in self.cnf.clauses], self.cnf.nv)
+        permutation = cnf.shuffle(seed, relabel)
+        cnf._is_sat = self.cnf._is_sat
+        return self.permuted(cnf, permutation)
+
+    def permuted(self, cnf: CNF, permutation: Permutation) -> "Problem":
+        # Problem on cnf, the result of applying permutation to this problem's CNF. Settings, the solution
+        # with its metadata, the answer count, check results and cursor answers are mapped without a solver.
+        problem = type(self)(cnf)
+        problem.__dict__.update({name: self.__dict__[name] for name in _CONFIG_ATTRS if name in self.__dict__})
+        mapped = {}
+
+        def map_answer(answer: Any) -> Any:
+            if answer not in mapped:
+                mapped[answer] = self._map_answer(answer, permutation) if isinstance(answer, str) and self.format_check(answer) else answer
+            return mapped[answer]
+
+        problem._solved, problem._solution = self._solved, map_answer(self._solution)
+        problem._solver_metadata, problem._answer_count = self._solver_metadata, self._answer_count
+        problem._checked = OrderedDict((map_answer(a), ok) for a, ok in self._checked.items())
+        for name, cursor in self._cursors.items():
+            clone = problem.cursor(name, cursor.max_blocking)
+            clone.answers = [map_answer(a) for a in cursor.answers]
+            clone._seen, clone.exhausted, clone.capped = set(clone.answers), cursor.exhausted, cursor.capped
+        return problem
+
+    def _map_answer(self, answer: str, permutation: Permutation) -> str:
+        # Answer of the permuted instance; the default suits answers that don't depend on order (SATDP).
+        return answer
+
+    def to_bytes(self) -> bytes:
+        # The CNF, per-instance settings and cached results (solution and metadata, answer count, checked
+        # answers, cursor answers) in the binary format of satquest.codec. Live solvers and the truth table
+        # are rebuilt on demand after decoding.
+        config = {name: self.__dict__[name] for name in _CONFIG_ATTRS if name in self.__dict__}
+        if config.get("budget") is not None:
+            config["budget"] = asdict(config["budget"])
+        cnf = self.cnf.to_bytes()
+        solution = self._solution
+        flags = self._solved | (solution is UNKNOWN) << 1 | (isinstance(solution, str)) << 2
+        length = self.answer_length
+        checked = [a for a in self._checked if isinstance(a, str) and len(a) == length]
+        cursors = [(name, c) for name, c in self._cursors.items() if all(isinstance(a, str) for a in c.answers)]
+        parts = [
+            _MAGIC + bytes([_VERSION]),
+            codec.pack_str(self.__class__.__name__),
+            codec.pack_str(json.dumps(config)),
+            codec.pack_u32(len(cnf)),
+            cnf,
+            bytes([flags]),
+            codec.pack_answers([solution] if isinstance(solution, str) else [], len(solution) if isinstance(solution, str) else 0),
+            codec.pack_str(json.dumps(self._solver_metadata)),
+            struct.pack("<q", -1 if self._answer_count is None else self._answer_count),
+            codec.pack_answers(checked, length),
+            codec.pack_answers([a for a in checked if self._checked[a]], length),
+            codec.pack_u32(len(cursors)),
+        ]
+        for name, cursor in cursors:
+            parts += [codec.pack_str(name), bytes([cursor.exhausted]), codec.pack_answers(cursor.answers, length)]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Problem":
+        assert data[:3] == _MAGIC and data[3] == _VERSION, "not a SATQuest problem encoding"
+        name, offset = codec.unpack_str(data, 4)
+        config, offset = codec.unpack_str(data, offset)
+        size, offset = codec.unpack_u32(data, offset)
+        cnf = CNF.from_bytes(data[offset : offset + size])
+        offset += size
+        config = json.loads(config)
+        if config.get("budget") is not None:
+            config["budget"] = Budget(**config["budget"])
+        problem = get_problem_class(name)(cnf)
+        problem.__dict__.update(config)
+        flags = data[offset]
+        solutions, offset = codec.unpack_answers(data, offset + 1)
+        metadata, offset = codec.unpack_str(data, offset)
+        (answer_count,) = struct.unpack_from("<q", data, offset)
+        checked, offset = codec.unpack_answers(data, offset + 8)
+        correct, offset = codec.unpack_answers(data, offset)
+        num_cursors, offset = codec.unpack_u32(data, offset)
+        problem._solved = bool(flags & 1)
+        problem._solution = UNKNOWN if flags & 2 else solutions[0] if flags & 4 else None
+        problem._solver_metadata = _tuples(json.loads(metadata))
+        problem._answer_count = None if answer_count < 0 else answer_count
+        correct = set(correct)
+        problem._checked = OrderedDict((a, a in correct) for a in checked)
+        for _ in range(num_cursors):
+            backend, offset = codec.unpack_str(data, offset)
+            exhausted = bool(data[offset])
+            answers, offset = codec.unpack_answers(data, offset + 1)
+            cursor = problem.cursor(backend)
+            cursor.answers, cursor._seen, cursor.exhausted = answers, set(answers), exhausted
+        return problem
+
+    def __reduce__(self):
+        return (Problem.from_bytes, (self.to_bytes(),))
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}_{GIT_HASH}_{get_class_source_hash(self.__class__)}"
 
 
+class SubsetOracle:
+    # Satisfiability of clause subsets on one incremental solver shared by a batch of MCS/MUS checks.
+    # Clause i (0-based) gets selector nv + i + 1 and a subset is solved under its selectors; answers of
+    # one batch overlap heavily, so results are memoized per subset.
+    def __init__(self, problem: Problem, solver_name: str):
+        cnf = problem.cnf
+        self.sels = [cnf.nv + i for i in range(1, cnf.mc + 1)]
+        self.solver = problem._make_solver(Solver, name=solver_name, bootstrap_with=[c + [-s] for c, s in zip(cnf.clauses, self.sels)])
+        self._known: dict[frozenset, bool] = {}
+
+    def is_sat(self, subset: frozenset) -> bool:
+        if subset not in self._known:
+            self._known[subset] = self.solver.solve(assumptions=[self.sels[i] for i in subset])
+        return self._known[subset]
+
+    def __enter__(self) -> "SubsetOracle":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.solver.delete()
+
+
 class SATDP(Problem):
-    @property
-    def solution(self) -> str | None:
-        if self._solution is None:
-            self._solution, self._solver_metadata = None, None
-            try:
-                with Solver(name=SAT_SOLVER_NAME, bootstrap_with=self.cnf.clauses) as solver:
-                    self._solution = str(int(solver.solve()))
-                    self._solver_metadata = {**solver.accum_stats(), "solvers": (SAT_SOLVER_NAME,)}
-            except Exception:
-                pass
-        return self._solution
+    def _solve(self, solver_name: str) -> tuple[str | None, dict | None]:
+        try:
+            with self._make_solver(Solver, name=solver_name, bootstrap_with=self.cnf.clauses) as solver:
+                return str(int(solver.solve())), {**solver.accum_stats(), "solvers": (solver_name,)}
+        except BudgetExceeded:
+            raise
+        except Exception:
+            if _raise_backend_errors():
+                raise
+        return None, None
 
-    def solution_enumerate(self) -> Generator[str | None, None, None]:
+    def _solution_enumerate(self, solver_name: str, known: Sequence[str] = ()) -> Generator[str | None, None, None]:
         yield self.solution
 
     @property
     def search_space_size(self) -> Any:
         return 2**self.cnf.nv
 
-    def check(self, answer: str) -> bool:
+    def _check(self, answer: str, solver_name: str) -> bool:
         try:
             assert self.format_check(answer)
+            # Compared against the cached reference solution, so the solve budget applies rather than the check's.
+            if self.solution is UNKNOWN:
+                return UNKNOWN
             return answer == str(self.solution)
+        except BudgetExceeded:
+            raise
         except Exception:
-            pass
+            if _raise_backend_errors():
+                raise
         return False
 
     def format_check(self, answer: str) -> bool:
@@ -96,46 +566,75 @@ class SATDP(Problem):
         return question.visit_satdp(self.cnf, *args, **kwargs)
 
     @property
-    def ANSWER_PATTERN(self) -> str:
-        return r"(?=([01]{%d}))" % 1
+    def answer_length(self) -> int:
+        return 1
 
 
 class SATSP(Problem):
-    @property
-    def solution(self) -> str | None:
+    def _solve(self, solver_name: str) -> tuple[str | None, dict | None]:
         assert self.cnf.is_sat
-        if self._solution is None:
-            self._solution, self._solver_metadata = None, None
-            try:
-                with Solver(name=SAT_SOLVER_NAME, bootstrap_with=self.cnf.clauses) as solver:
-                    _is_sat = solver.solve()
-                    if _is_sat:
-                        self._solution = "".join(["1" if iv > 0 else "0" for iv in solver.get_model()])
-                    self._solver_metadata = {**solver.accum_stats(), "solvers": (SAT_SOLVER_NAME,)}
-            except Exception:
-                pass
-        return self._solution
+        try:
+            with self._make_solver(Solver, name=solver_name, bootstrap_with=self.cnf.clauses) as solver:
+                _solution = None
+                if solver.solve():
+                    _solution = "".join(["1" if iv > 0 else "0" for iv in solver.get_model()])
+                return _solution, {**solver.accum_stats(), "solvers": (solver_name,)}
+        except BudgetExceeded:
+            raise
+        except Exception:
+            if _raise_backend_errors():
+                raise
+        return None, None
 
-    def solution_enumerate(self) -> Generator[str, None, None]:
+    def _solution_enumerate(self, solver_name: str, known: Sequence[str] = ()) -> Generator[str, None, None]:
         assert self.cnf.is_sat
-        with Solver(name=SAT_SOLVER_NAME, bootstrap_with=self.cnf.clauses) as solver:
-            for s in solver.enum_models():
-                yield "".join(["1" if iv > 0 else "0" for iv in s])
+        if (table := self._cheap_truth_table()) is not None:
+            known = set(known)
+            yield from (model for model in table.models() if model not in known)
+            return
+        with self._make_solver(Solver, name=solver_name, bootstrap_with=self.cnf.clauses) as solver:
+            for answer in known:
+                solver.add_clause([-(i + 1) if ai == "1" else (i + 1) for i, ai in enumerate(answer)])
+            # Same loop as enum_models, but through solver.solve so budgets reach it.
+            while solver.solve():
+                model = solver.get_model()
+                yield "".join(["1" if iv > 0 else "0" for iv in model])
+                solver.add_clause([-iv for iv in model])
+
+    def _count(self, solver_name: str, limit: int | None) -> int:
+        # Component-caching DPLL beats building the truth table from about 12 variables on.
+        if self._truth_table is not None:
+            return self._truth_table.num_models
+        return count_models(self.cnf.clauses, self.cnf.nv)
 
     @property
     def search_space_size(self) -> Any:
         return 2**self.cnf.nv
 
-    def check(self, answer: str) -> bool:
+    def _check(self, answer: str, solver_name: str) -> bool:
         assert self.cnf.is_sat
         try:
             assert self.format_check(answer)
-            with Solver(name=SAT_SOLVER_NAME, bootstrap_with=self.cnf.clauses) as solver:
+            if (table := self._cheap_truth_table()) is not None:
+                return table.falsified(answer) == 0
+            with self._make_solver(Solver, name=solver_name, bootstrap_with=self.cnf.clauses) as solver:
                 return solver.solve(assumptions=[(i + 1) if ai == "1" else -(i + 1) for i, ai in enumerate(answer)])
+        except BudgetExceeded:
+            raise
         except Exception:
-            pass
+            if _raise_backend_errors():
+                raise
         return False
 
+    def _check_batch(self, answers: list[str], solver_name: str) -> list[bool]:
+        # A full assignment is checked by evaluating the clauses, no solver needed.
+        if (table := self._cheap_truth_table()) is not None:
+            return [table.falsified(answer) == 0 for answer in answers]
+        return [num_falsified(self.cnf.clauses, answer) == 0 for answer in answers]
+
+    def _map_answer(self, answer: str, permutation: Permutation) -> str:
+        return permutation.map_assignment(answer)
+
     def format_check(self, answer: str) -> bool:
         return isinstance(answer, str) and len(answer) == self.cnf.nv and set(answer).issubset({"0", "1"})
 
@@ -143,55 +642,161 @@ class SATSP(Problem):
         return question.visit_satsp(self.cnf, *args, **kwargs)
 
     @property
-    def ANSWER_PATTERN(self) -> str:
-        return r"(?=([01]{%d}))" % self.cnf.nv
+    def answer_length(self) -> int:
+        return self.cnf.nv
+
+
+class MaxSATEngine:
+    # One RC2 kept alive per MaxSAT problem, so cores, the optimum and the enumeration position carry over.
+    def __init__(self, rc2: MaxSATSolver, solver_name: str):
+        self.rc2 = rc2
+        self.solver_name = solver_name
+        self.valid = True
+        self.cost: int | None = None
+        self.stats: dict | None = None  # oracle stats when the first optimum was found
+        self.optima: list[str] = []
+        self._models = rc2.enumerate()
+        self._exhausted = False
+
+    def optimum(self, i: int) -> str | None:
+        # The i-th optimal model, continuing the live enumeration as needed; None past the last one.
+        try:
+            while len(self.optima) <= i and not self._exhausted:
+                model = next(self._models, None)
+                if model is None or (self.cost is not None and self.rc2.cost != self.cost):
+                    self._exhausted = True
+                    break
+                if self.cost is None:
+                    self.cost, self.stats = self.rc2.cost, self.rc2.oracle.accum_stats()
+                self.optima.append("".join(["1" if iv > 0 else "0" for iv in model]))
+        except BaseException:
+            # An interrupted RC2 is left mid-core, so it can't be resumed.
+            self.valid = False
+            raise
+        return self.optima[i] if i < len(self.optima) else None
+
+    def delete(self) -> None:
+        self.rc2.delete()
 
 
 class MaxSAT(Problem):
-    @property
-    def solution(self) -> str | None:
+    # RC2 configuration; stratification only changes the search on weighted instances.
+    stratified: bool = False
+    exhaust: bool = False
+
+    def __init__(self, cnf: CNF, *, stratified: bool | None = None, exhaust: bool | None = None, **kwargs):
+        super().__init__(cnf, **kwargs)
+        if stratified is not None:
+            self.stratified = stratified
+        if exhaust is not None:
+            self.exhaust = exhaust
+        self._engine: MaxSATEngine | None = None
+
+    def permuted(self, cnf: CNF, permutation: Permutation) -> "MaxSAT":
+        # The optima found by the live RC2 are carried over as cursor answers.
+        problem = super().permuted(cnf, permutation)
+        engine = self._engine
+        if engine is not None and engine.optima:
+            cursor = problem.cursor(engine.solver_name)
+            if len(cursor.answers) < len(engine.optima):
+                cursor.answers = [permutation.map_assignment(a) for a in engine.optima]
+                cursor._seen, cursor.exhausted = set(cursor.answers), engine._exhausted
+        return problem
+
+    def engine(self, solver_name: str | None = None) -> MaxSATEngine:
+        solver_name = solver_name or self._solver_names(None)[0]
+        if self._engine is None or not self._engine.valid or self._engine.solver_name != solver_name:
+            if self._engine is not None:
+                self._engine.delete()
+            solver_cls = MaxSATStratifiedSolver if self.stratified else MaxSATSolver
+            rc2 = self._make_solver(solver_cls, cnf2wcnf(self.cnf.cnf), solver=solver_name, exhaust=self.exhaust, verbose=0)
+            limit_oracle(rc2)
+            self._engine = MaxSATEngine(rc2, solver_name)
+        return self._engine
+
+    def _solve(self, solver_name: str) -> tuple[str | None, dict | None]:
         assert not self.cnf.is_sat
-        if self._solution is None:
-            self._solution, self._solver_metadata = None, None
-            try:
-                with MaxSATSolver(cnf2wcnf(self.cnf.cnf), solver=SAT_SOLVER_NAME, verbose=0) as solver:
-                    solver.compute()
-                    self._solver_metadata = {**solver.oracle.accum_stats(), "solvers": (SAT_SOLVER_NAME, "RC2")}
-                    self._solution = "".join(["1" if iv > 0 else "0" for iv in solver.model])
-            except Exception:
-                pass
-        return self._solution
+        try:
+            engine = self.engine(solver_name)
+            _solution = engine.optimum(0)
+            return _solution, {**engine.stats, "solvers": (solver_name, "RC2")}
+        except BudgetExceeded:
+            raise
+        except Exception:
+            if _raise_backend_errors():
+                raise
+        return None, None
 
-    def solution_enumerate(self) -> Generator[str, None, None]:
+    def _solution_enumerate(self, solver_name: str, known: Sequence[str] = ()) -> Generator[str, None, None]:
         assert not self.cnf.is_sat
-
-        with MaxSATSolver(cnf2wcnf(self.cnf.cnf), solver=SAT_SOLVER_NAME, verbose=0) as solver:
-            pre_cost = None
-            for s in solver.enumerate():
-                if pre_cost is None:
-                    pre_cost = solver.cost
-                if solver.cost != pre_cost:
-                    break
-                yield "".join(["1" if iv > 0 else "0" for iv in s])
+        if (table := self._cheap_truth_table()) is not None:
+            known = set(known)
+            yield from (model for model in table.optimal_models() if model not in known)
+            return
+        i = 0
+        # Looked up on every step, so an engine rebuilt after an interrupt picks up at the same index.
+        while (model := self.engine(solver_name).optimum(i)) is not None:
+            yield model
+            i += 1
+
+    def _count(self, solver_name: str, limit: int | None) -> int:
+        # An optimal model falsifies exactly one minimum-cost set of clauses, so the optima are counted per
+        # set: the models of the other clauses that falsify every clause of the set. Selector b_i = nv + i
+        # marks clause i as kept; RC2 lists the sets through the selectors, blocking each one found.
+        assert not self.cnf.is_sat
+        if self._truth_table is not None:
+            return self._truth_table.num_optimal_models
+        nv, clauses = self.cnf.nv, self.cnf.clauses
+        wcnf = WCNF()
+        for i, clause in enumerate(clauses, 1):
+            wcnf.append(clause + [-(nv + i)])
+            wcnf.append([nv + i], weight=1)
+        num_optima, cost = 0, None
+        with self._make_solver(MaxSATSolver, wcnf, solver=solver_name, verbose=0) as rc2:
+            while (model := rc2.compute()) is not None and cost in (None, rc2.cost):
+                cost = rc2.cost
+                falsified = {i for i in range(len(clauses)) if model[nv + i] < 0}
+                kept = [clause for i, clause in enumerate(clauses) if i not in falsified]
+                num_optima += count_models(kept + [[-lit] for i in falsified for lit in clauses[i]], nv)
+                rc2.add_clause([nv + 1 + i for i in falsified])
+        return num_optima
 
     @property
     def search_space_size(self) -> Any:
         return 2**self.cnf.nv
 
-    def check(self, answer: str) -> bool:
+    def _check(self, answer: str, solver_name: str) -> bool:
         assert not self.cnf.is_sat
         try:
             assert self.format_check(answer)
-            with LSU(cnf2wcnf(self.cnf.cnf), solver=SAT_SOLVER_NAME, verbose=0) as solver:
-                solver.solve()
-                answer_cost = solver._get_model_cost(
-                    cnf2wcnf(self.cnf.cnf), [(i + 1) if ai == "1" else -(i + 1) for i, ai in enumerate(answer)]
-                )
-                return answer_cost == solver.cost
+            # The optimum is the cost of the cached reference solution, so no solver runs per check.
+            if (table := self._cheap_truth_table()) is not None:
+                return table.falsified(answer) == table.min_falsified
+            if self.solution is UNKNOWN:
+                return UNKNOWN
+            return self.cost(answer) == self.cost(self.solution)
+        except BudgetExceeded:
+            raise
         except Exception:
-            pass
+            if _raise_backend_errors():
+                raise
         return False
 
+    def _check_batch(self, answers: list[str], solver_name: str) -> list[bool]:
+        if (table := self._cheap_truth_table()) is not None:
+            return [table.falsified(answer) == table.min_falsified for answer in answers]
+        if self.solution is UNKNOWN:
+            return [UNKNOWN] * len(answers)
+        optimum = self.cost(self.solution)
+        return [self.cost(answer) == optimum for answer in answers]
+
+    def cost(self, answer: str) -> int:
+        # Number of clauses the assignment falsifies.
+        return num_falsified(self.cnf.clauses, answer)
+
+    def _map_answer(self, answer: str, permutation: Permutation) -> str:
+        return permutation.map_assignment(answer)
+
     def format_check(self, answer: str) -> bool:
         return isinstance(answer, str) and len(answer) == self.cnf.nv and set(answer).issubset({"0", "1"})
 
@@ -199,24 +804,23 @@ class MaxSAT(Problem):
         return question.visit_maxsat(self.cnf, *args, **kwargs)
 
     @property
-    def ANSWER_PATTERN(self) -> str:
-        return r"(?=([01]{%d}))" % self.cnf.nv
+    def answer_length(self) -> int:
+        return self.cnf.nv
 
 
 class MCS(Problem):
-    @property
-    def solution(self) -> str | None:
+    def _solve(self, solver_name: str) -> tuple[str | None, dict | None]:
         assert not self.cnf.is_sat
-        if self._solution is None:
-            with MCSSolver(cnf2wcnf(self.cnf.cnf), use_cld=False, solver_name=SAT_SOLVER_NAME) as solver:
-                _solution_model = solver.compute()
-                self._solution = "".join(["1" if i in _solution_model else "0" for i in range(1, self.cnf.mc + 1)])
-                self._solver_metadata = {**solver.oracle.accum_stats(), "solvers": (SAT_SOLVER_NAME, "LBX")}
-        return self._solution
+        with self._make_solver(MCSSolver, cnf2wcnf(self.cnf.cnf), use_cld=False, solver_name=solver_name) as solver:
+            _solution_model = solver.compute()
+            _solution = "".join(["1" if i in _solution_model else "0" for i in range(1, self.cnf.mc + 1)])
+            return _solution, {**solver.oracle.accum_stats(), "solvers": (solver_name, "LBX")}
 
-    def solution_enumerate(self) -> Generator[str, None, None]:
+    def _solution_enumerate(self, solver_name: str, known: Sequence[str] = ()) -> Generator[str, None, None]:
         assert not self.cnf.is_sat
-        with MCSSolver(cnf2wcnf(self.cnf.cnf), use_cld=False, solver_name=SAT_SOLVER_NAME) as solver:
+        with self._make_solver(MCSSolver, cnf2wcnf(self.cnf.cnf), use_cld=False, solver_name=solver_name) as solver:
+            for answer in known:
+                solver.block([i + 1 for i, ai in enumerate(answer) if ai == "1"])
             for mcs in solver.enumerate():
                 solver.block(mcs)
                 yield "".join(["1" if i in mcs else "0" for i in range(1, len(self.cnf.clauses) + 1)])
@@ -225,25 +829,44 @@ class MCS(Problem):
     def search_space_size(self) -> Any:
         return 2**self.cnf.mc
 
-    def check(self, answer: str) -> bool:
+    def _check(self, answer: str, solver_name: str) -> bool:
         assert not self.cnf.is_sat
         try:
             assert self.format_check(answer)
+            if (table := self._cheap_truth_table()) is not None:
+                return table.is_mcs(answer)
             unmcs_clauses = [self.cnf.clauses[i] for i in range(self.cnf.mc) if answer[i] == "0"]
             mcs_clauses = [self.cnf.clauses[i] for i in range(self.cnf.mc) if answer[i] == "1"]
-            with Solver(name=SAT_SOLVER_NAME, bootstrap_with=CNF(unmcs_clauses).cnf) as solver:
+            with self._make_solver(Solver, name=solver_name, bootstrap_with=CNF(unmcs_clauses).cnf) as solver:
                 if not solver.solve():
                     return False
             for i in range(len(mcs_clauses)):
                 add_mcs_clauses = unmcs_clauses + [mcs_clauses[i]]
-                with Solver(name=SAT_SOLVER_NAME, bootstrap_with=CNF(add_mcs_clauses).cnf) as solver:
+                with self._make_solver(Solver, name=solver_name, bootstrap_with=CNF(add_mcs_clauses).cnf) as solver:
                     if solver.solve():
                         return False
             return True
+        except BudgetExceeded:
+            raise
         except Exception:
-            pass
+            if _raise_backend_errors():
+                raise
         return False
 
+    def _check_batch(self, answers: list[str], solver_name: str) -> list[bool]:
+        if (table := self._cheap_truth_table()) is not None:
+            return [table.is_mcs(answer) for answer in answers]
+        with SubsetOracle(self, solver_name) as oracle:
+            results = []
+            for answer in answers:
+                rest = frozenset(i for i, ai in enumerate(answer) if ai == "0")
+                removed = [i for i, ai in enumerate(answer) if ai == "1"]
+                results.append(oracle.is_sat(rest) and not any(oracle.is_sat(rest | {i}) for i in removed))
+            return results
+
+    def _map_answer(self, answer: str, permutation: Permutation) -> str:
+        return permutation.map_subset(answer)
+
     def format_check(self, answer: str) -> bool:
         return isinstance(answer, str) and len(answer) == self.cnf.mc and set(answer).issubset({"0", "1"})
 
@@ -251,54 +874,79 @@ class MCS(Problem):
         return question.visit_mcs(self.cnf, *args, **kwargs)
 
     @property
-    def ANSWER_PATTERN(self) -> str:
-        return r"(?=([01]{%d}))" % self.cnf.mc
+    def answer_length(self) -> int:
+        return self.cnf.mc
 
 
 class MUS(Problem):
-    @property
-    def solution(self) -> str | None:
-        assert not self.cnf.is_sat
-        if self._solution is None:
-            with MUSSolver(self.cnf.cnf, solver=SAT_SOLVER_NAME, verbosity=0) as solver:
-                _solution_model = solver.compute()
-                self._solution = "".join(["1" if i in _solution_model else "0" for i in range(1, self.cnf.mc + 1)])
-                self._solver_metadata = {**solver.oracle.accum_stats(), "solvers": (SAT_SOLVER_NAME, "MUSX")}
-        return self._solution
+    hitman_solver_name: str = "m22"
 
-    def solution_enumerate(self) -> Generator[str, None, None]:
+    def _solve(self, solver_name: str) -> tuple[str | None, dict | None]:
         assert not self.cnf.is_sat
-
-        with Hitman(solver="m22") as hitman_solver:
-            with MCSSolver(cnf2wcnf(self.cnf.cnf), use_cld=False, solver_name=SAT_SOLVER_NAME) as solver:
-                for mcs in solver.enumerate():
-                    solver.block(mcs)
-                    hitman_solver.hit(mcs)
-            for mus in hitman_solver.enumerate():
-                yield "".join(["1" if i in mus else "0" for i in range(1, len(self.cnf.clauses) + 1)])
+        with self._make_solver(MUSSolver, self.cnf.cnf, solver=solver_name, verbosity=0) as solver:
+            _solution_model = solver.compute()
+            _solution = "".join(["1" if i in _solution_model else "0" for i in range(1, self.cnf.mc + 1)])
+            return _solution, {**solver.oracle.accum_stats(), "solvers": (solver_name, "MUSX")}
+
+    def _solution_enumerate(self, solver_name: str, known: Sequence[str] = ()) -> Generator[str, None, None]:
+        # Online MUS/MCS duality: Hitman proposes a minimal hitting set of the MCSes found so far. If its
+        # clauses are unsatisfiable it is a MUS and is yielded at once; otherwise LBX extends it to a new
+        # MCS disjoint from it, which Hitman must hit from then on.
+        assert not self.cnf.is_sat
+        mc = self.cnf.mc
+        sels = [self.cnf.nv + i for i in range(1, mc + 1)]
+        with self._make_solver(Hitman, solver=self.hitman_solver_name) as hitman_solver:
+            with self._make_solver(MCSSolver, cnf2wcnf(self.cnf.cnf), use_cld=False, solver_name=solver_name) as mcs_solver:
+                with self._make_solver(Solver, name=solver_name, bootstrap_with=[c + [-s] for c, s in zip(self.cnf.clauses, sels)]) as solver:
+                    for answer in known:
+                        hitman_solver.block([i + 1 for i, ai in enumerate(answer) if ai == "1"])
+                    while (hs := hitman_solver.get()) is not None:
+                        if solver.solve(assumptions=[sels[i - 1] for i in hs]):
+                            hitman_solver.hit(mcs_solver.compute(enable=hs))
+                        else:
+                            hitman_solver.block(hs)
+                            yield "".join(["1" if i in hs else "0" for i in range(1, mc + 1)])
 
     @property
     def search_space_size(self) -> Any:
         return 2**self.cnf.mc
 
-    def check(self, answer: str) -> bool:
+    def _check(self, answer: str, solver_name: str) -> bool:
         assert not self.cnf.is_sat
         try:
             assert self.format_check(answer)
+            if (table := self._cheap_truth_table()) is not None:
+                return table.is_mus(answer)
             mus_clauses = [self.cnf.clauses[i] for i in range(self.cnf.mc) if answer[i] == "1"]
-            with Solver(name=SAT_SOLVER_NAME, bootstrap_with=CNF(mus_clauses).cnf) as solver:
+            with self._make_solver(Solver, name=solver_name, bootstrap_with=CNF(mus_clauses).cnf) as solver:
                 if solver.solve():
                     return False
             for i in range(len(mus_clauses)):
                 sub_mus_clauses = mus_clauses[:i] + mus_clauses[i + 1 :]
-                with Solver(name=SAT_SOLVER_NAME, bootstrap_with=CNF(sub_mus_clauses).cnf) as solver:
+                with self._make_solver(Solver, name=solver_name, bootstrap_with=CNF(sub_mus_clauses).cnf) as solver:
                     if not solver.solve():
                         return False
             return True
+        except BudgetExceeded:
+            raise
         except Exception:
-            pass
+            if _raise_backend_errors():
+                raise
         return False
 
+    def _check_batch(self, answers: list[str], solver_name: str) -> list[bool]:
+        if (table := self._cheap_truth_table()) is not None:
+            return [table.is_mus(answer) for answer in answers]
+        with SubsetOracle(self, solver_name) as oracle:
+            results = []
+            for answer in answers:
+                subset = frozenset(i for i, ai in enumerate(answer) if ai == "1")
+                results.append(not oracle.is_sat(subset) and all(oracle.is_sat(subset - {i}) for i in subset))
+            return results
+
+    def _map_answer(self, answer: str, permutation: Permutation) -> str:
+        return permutation.map_subset(answer)
+
     def format_check(self, answer: str) -> bool:
         return isinstance(answer, str) and len(answer) == self.cnf.mc and set(answer).issubset({"0", "1"})
 
@@ -306,21 +954,30 @@ class MUS(Problem):
         return question.visit_mus(self.cnf, *args, **kwargs)
 
     @property
-    def ANSWER_PATTERN(self) -> str:
-        return r"(?=([01]{%d}))" % self.cnf.mc
+    def answer_length(self) -> int:
+        return self.cnf.mc
 
 
-def create_problem(problem_type: str, cnf: CNF) -> Problem:
+def get_problem_class(problem_type: str) -> type[Problem]:
     problem_type = problem_type.lower()
     match problem_type:
         case "satdp" | "satdp_sat" | "satdp_unsat":
-            return SATDP(cnf)
+            return SATDP
         case "satsp":
-            return SATSP(cnf)
+            return SATSP
         case "maxsat":
-            return MaxSAT(cnf)
+            return MaxSAT
         case "mcs":
-            return MCS(cnf)
+            return MCS
         case "mus":
-            return MUS(cnf)
-    raise ValueError(f"Invalid problem type: {problem_type}")
\ No newline at end of file
+            return MUS
+    raise ValueError(f"Invalid problem type: {problem_type}")
+
+
+def create_problem(problem_type: str, cnf: CNF, **kwargs) -> Problem:
+    return get_problem_class(problem_type)(cnf, **kwargs)
+
+
+def set_solver_name(problem_type: str, solver_name: str | Sequence[str]) -> None:
+    # Default backend for every instance of a problem type; "portfolio" or a sequence of names races them.
+    get_problem_class(problem_type).solver_name = solver_name
\ No newline at end of file
@@ -0,0 +1,50 @@
+import math
+from dataclasses import dataclass
+from typing import Any
+
+# Prompt lengths without rendering the formula (Question.prompt_length, Problem.prompt_length). The question
+# renders its template on a formula-free Shape of the CNF, and the formula is counted as a multiset of
+# fragments (literals, names, separators) whose token counts are cached by TokenCounter. Characters are exact;
+# tokens are an estimate, since fragments are tokenized on their own and merges across their boundaries are
+# missed.
+
+CHARS_PER_TOKEN = 4.0  # TokenCounter estimate when no tokenizer is given
+
+
+@dataclass(frozen=True)
+class PromptLength:
+    chars: int
+    tokens: int
+
+
+class TokenCounter:
+    # Token count of a text, memoized per text. tokenizer is a Hugging Face / tiktoken-style object with
+    # encode(), a callable returning the count, or None for len(text) / chars_per_token.
+    def __init__(self, tokenizer: Any = None, chars_per_token: float = CHARS_PER_TOKEN):
+        self.tokenizer = tokenizer
+        self.chars_per_token = chars_per_token
+        self._counts: dict[str, int] = {}
+
+    def __call__(self, text: str) -> int:
+        count = self._counts.get(text)
+        if count is None:
+            if self.tokenizer is None:
+                count = math.ceil(len(text) / self.chars_per_token)
+            elif hasattr(self.tokenizer, "encode"):
+                try:
+                    count = len(self.tokenizer.encode(text, add_special_tokens=False))
+                except TypeError:
+                    count = len(self.tokenizer.encode(text))
+            else:
+                count = self.tokenizer(text)
+            self._counts[text] = count
+        return count
+
+
+class Shape:
+    # Formula-free stand-in for a CNF: what question templates read besides the clauses.
+    dimacs = ""
+
+    def __init__(self, nv: int, mc: int):
+        self.nv, self.mc = nv, mc
+        self.clauses: list = []
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+from collections import Counter
 
 from satquest.cnf import CNF
 from satquest.constants import CHARACTERS, CHEF_NAME, COOKIE_NAMES, GIT_HASH
+from satquest.prompt_length import PromptLength, Shape, TokenCounter
 from satquest.satquest_utils import get_class_source_hash
 
 
@@ -31,10 +33,37 @@ class Question(ABC):
         # Minimal Unsatisfiable Subset (MUS)
         pass
 
+    def formula_fragments(self, cnf: CNF) -> Counter | None:
+        # Pieces of the rendered formula with their multiplicity, adding up to it in length; None makes
+        # prompt_length render the whole prompt.
+        return None
+
+    def prompt_length(self, problem_type: str, cnf: CNF, counter: TokenCounter | None = None) -> PromptLength:
+        # Length of the visit_<problem_type> prompt (e.g. "mus"), see satquest.prompt_length.
+        counter = counter or TokenCounter()
+        visit = getattr(self, f"visit_{problem_type}")
+        fragments = self.formula_fragments(cnf)
+        if fragments is None:
+            text = visit(cnf)
+            return PromptLength(len(text), counter(text))
+        skeleton = visit(Shape(cnf.nv, cnf.mc))
+        return PromptLength(
+            len(skeleton) + sum(len(text) * n for text, n in fragments.items()),
+            counter(skeleton) + sum(counter(text) * n for text, n in fragments.items()),
+        )
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}_{GIT_HASH}_{get_class_source_hash(self.__class__)}"
 
 
+def _literal_counts(cnf: CNF) -> tuple[Counter, Counter]:
+    # Literals that open a clause, and the others. Fragments keep a space in front rather than behind, the
+    # way BPE tokenizers attach it, so the others get one.
+    first = Counter(clause[0] for clause in cnf.clauses if clause)
+    rest = Counter(lit for clause in cnf.clauses for lit in clause[1:])
+    return first, rest
+
+
 class QuestionDIMACS(Question):
     def visit_satdp(self, cnf: CNF) -> str:
         Q = self._get_q_prefix(cnf)
@@ -71,6 +100,13 @@ Find a minimal subset of clauses that is unsatisfiable (no proper subset is unsa
 Output a binary string of length {cnf.mc} ('1' if the clause is in the subset, '0' otherwise), following the order of clauses in the formula."""
         return Q
 
+    def formula_fragments(self, cnf: CNF) -> Counter:
+        first, rest = _literal_counts(cnf)
+        fragments = Counter({f"{lit}": n for lit, n in first.items()})
+        fragments.update({f" {lit}": n for lit, n in rest.items()})
+        fragments.update({f"p cnf {cnf.nv} {cnf.mc}": 1, " 0": cnf.mc, "\n": cnf.mc})
+        return fragments
+
     def _get_q_prefix(self, cnf: CNF) -> str:
         Q_prefix = f"""\
 Given a CNF formula with {cnf.nv} variables and {cnf.mc} clauses in DIMACS format:
@@ -81,6 +117,14 @@ Given a CNF formula with {cnf.nv} variables and {cnf.mc} clauses in DIMACS forma
 
 
 class QuestionMath(QuestionDIMACS):
+    def formula_fragments(self, cnf: CNF) -> Counter:
+        first, rest = _literal_counts(cnf)
+        fragments = Counter({self._clauses2mathformula([[lit]])[1:-1]: n for lit, n in first.items()})
+        fragments.update({" " + self._clauses2mathformula([[lit]])[1:-1]: n for lit, n in rest.items()})
+        num_rest = sum(rest.values())
+        fragments.update({"(": 1, " (": cnf.mc - 1, ")": cnf.mc, " \\lor": num_rest, " \\land": cnf.mc - 1})
+        return fragments
+
     def _clauses2mathformula(self, clauses: list) -> str:
         return " \\land ".join(
             "("
@@ -155,6 +199,17 @@ Each of his {cnf.mc} friends will be happy if {CHEF_NAME} bakes at least one coo
 """
         return Q_prefix
 
+    _WANTS, _AND, _TEXTURES = " wants:", ",", ("chewy", "crunchy")
+
+    def formula_fragments(self, cnf: CNF) -> Counter:
+        cookie_names, character_names = self._get_names(cnf.nv, cnf.mc)
+        first, rest = _literal_counts(cnf)
+        fragments = Counter({f" {self._TEXTURES[lit > 0]} {cookie_names[abs(lit) - 1]}": n for lit, n in (first + rest).items()})
+        fragments.update(f"{i + 1}." for i in range(cnf.mc))
+        fragments.update(f" {name}" for name in character_names)
+        fragments.update({self._WANTS: cnf.mc, self._AND: sum(rest.values()), "\n": cnf.mc - 1})
+        return fragments
+
     def _clauses2story_conditions(self, clauses: list) -> str:
         friends_texts = []
         for friend_idx, clause in enumerate(clauses):
@@ -177,6 +232,7 @@ Each of his {cnf.mc} friends will be happy if {CHEF_NAME} bakes at least one coo
 
 class QuestionDualStory(QuestionStory):
     # Cookie Challenge (Dislikes)
+    _WANTS, _AND, _TEXTURES = " dislikes:", " +", ("crunchy", "chewy")
 
     def _get_q_prefix(self, cnf: CNF) -> str:
         Q_prefix = f"""It's cookie day on Quirkwild Zoo!
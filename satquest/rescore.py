@@ -0,0 +1,207 @@
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import multiprocessing as mp
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Iterator, Sequence
+
+from satquest.budget import UNKNOWN
+from satquest.cnf import CNF
+from satquest.problem import Problem, create_problem, get_problem_class
+from satquest.satquest_utils import extract_final_answers
+
+# Offline rescoring of saved completions, e.g. the journals of eval_model.py, as JSONL or as Parquet with the
+# same columns. Every row needs problem_type, dimacs and content_output. Rows are streamed in chunks to a
+# process pool, whose workers re-extract the answers and score them with the current checkers: each chunk's
+# rows are grouped by formula and scored with one Problem.check_batch call, on Problems the worker keeps warm.
+# A row whose checker_fingerprint matches the current one keeps its stored scores unless force is set; a row
+# whose check ran out of budget gets is_correct False and no fingerprint, so the next run retries it.
+
+KEY_FIELDS = ("cnf_id", "problem_type", "question_type", "repeat_i", "model")
+SCORE_FIELDS = ("final_answer", "is_correct", "is_format_correct", "checker_fingerprint")
+CHUNK_SIZE = 4096  # rows per pool task
+WORKER_CACHE_SIZE = 1024  # problems kept alive per pool worker
+# Modules whose code decides a score: the checkers with their helpers, and the answer extraction.
+CHECKER_MODULES = ("satquest.problem", "satquest.truth_table", "satquest.cnf", "satquest.satquest_utils")
+
+
+@functools.lru_cache(maxsize=None)
+def _checker_source_hash() -> str:
+    source = "".join(inspect.getsource(importlib.import_module(name)) for name in CHECKER_MODULES)
+    return hashlib.md5(source.encode()).hexdigest()[:8]
+
+
+@functools.lru_cache(maxsize=None)
+def checker_fingerprint(problem_type: str) -> str:
+    # Source hash of CHECKER_MODULES. Unlike repr(problem) it leaves out the git commit, so commits that
+    # don't touch checking keep saved scores valid.
+    return f"{get_problem_class(problem_type).__name__}_{_checker_source_hash()}"
+
+
+_worker_problems: OrderedDict = OrderedDict()
+
+
+def _problem(p_type: str, dimacs: str) -> Problem:
+    key = (p_type, dimacs)
+    problem = _worker_problems.pop(key, None) or create_problem(p_type, CNF(dimacs=dimacs))
+    _worker_problems[key] = problem
+    if len(_worker_problems) > WORKER_CACHE_SIZE:
+        _worker_problems.popitem(last=False)
+    return problem
+
+
+def _parse(item: str | dict) -> dict | None:
+    if isinstance(item, dict):
+        return item
+    try:
+        return json.loads(item)
+    except json.JSONDecodeError:  # a partially written last line from a killed run
+        return None
+
+
+def _rescore_chunk(chunk: list, force: bool, dump: bool) -> tuple[dict[str, list], list[str] | None]:
+    # Pool worker: result columns for a chunk of JSONL lines or row dicts, and the updated lines if dump.
+    kept = [(item, row) for item in chunk if (row := _parse(item)) is not None]
+    rows = [row for _, row in kept]
+    stale: dict[tuple[str, str], list[int]] = {}
+    for i, row in enumerate(rows):
+        if force or row.get("checker_fingerprint") != checker_fingerprint(row["problem_type"]):
+            stale.setdefault((row["problem_type"], row["dimacs"]), []).append(i)
+    rescored, changed = [False] * len(rows), [False] * len(rows)
+    for (p_type, dimacs), indices in stale.items():
+        problem = _problem(p_type, dimacs)
+        answers = extract_final_answers([rows[i].get("content_output") for i in indices], problem.answer_length)
+        is_correct, is_format_correct = problem.check_batch(answers)
+        fingerprint = checker_fingerprint(p_type)
+        for i, answer, ok, format_ok in zip(indices, answers, is_correct, is_format_correct):
+            changed[i] = rows[i].get("is_correct") != bool(ok)
+            rescored[i] = True
+            rows[i].update(final_answer=answer, is_correct=bool(ok), is_format_correct=format_ok)
+            rows[i]["checker_fingerprint"] = None if ok is UNKNOWN else fingerprint
+    columns = {name: [row.get(name) for row in rows] for name in KEY_FIELDS + SCORE_FIELDS}
+    columns.update(rescored=rescored, changed=changed)
+    lines = None
+    if dump:
+        lines = [json.dumps(row, ensure_ascii=False) if new else item.rstrip("\n") for (item, row), new in zip(kept, rescored)]
+    return columns, lines
+
+
+def _chunks(path: str, chunk_size: int, columns: Sequence[str] | None = None) -> Iterator[list]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        if columns is not None:
+            columns = [name for name in columns if name in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pylist()
+    else:
+        with open(path, encoding="utf-8") as f:
+            while chunk := [line for line in islice(f, chunk_size) if line.strip()]:
+                yield chunk
+
+
+@dataclass
+class Rescored:
+    # Column per field (KEY_FIELDS, SCORE_FIELDS, rescored, changed), one value per row in file order.
+    columns: dict[str, list]
+
+    def __len__(self) -> int:
+        return len(self.columns["problem_type"])
+
+    def aggregate(self, by: Sequence[str] = ("model", "problem_type", "question_type")) -> list[dict[str, Any]]:
+        # Per group of `by`: rows, accuracy, format accuracy, and the rows rescored and changed by this run.
+        groups: dict[tuple, int] = {}
+        group_ids = [groups.setdefault(key, len(groups)) for key in zip(*(self.columns[name] for name in by))]
+        totals = {"examples": [0] * len(groups)}
+        for g in group_ids:
+            totals["examples"][g] += 1
+        for name in ("is_correct", "is_format_correct", "rescored", "changed"):
+            totals[name] = [0] * len(groups)
+            for g, value in zip(group_ids, self.columns[name]):
+                totals[name][g] += bool(value)
+        return [
+            {
+                **dict(zip(by, key)),
+                "examples": totals["examples"][g],
+                "accuracy": totals["is_correct"][g] / totals["examples"][g],
+                "format_accuracy": totals["is_format_correct"][g] / totals["examples"][g],
+                "rescored": totals["rescored"][g],
+                "changed": totals["changed"][g],
+            }
+            for key, g in groups.items()
+        ]
+
+
+def rescore(
+    path: str,
+    output: str | None = None,
+    processes: int | None = None,
+    force: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> Rescored:
+    # Rescores the completions in `path` (.parquet, else JSONL) and, if `output` is given, writes the file back
+    # with updated SCORE_FIELDS there; output may be path itself. Parquet needs pyarrow.
+    parquet = path.endswith(".parquet")
+    dump = output is not None and not parquet
+    needed = KEY_FIELDS + SCORE_FIELDS + ("dimacs", "content_output")
+    tasks = ((chunk, force, dump) for chunk in _chunks(path, chunk_size, needed))
+    columns: dict[str, list] = {name: [] for name in KEY_FIELDS + SCORE_FIELDS + ("rescored", "changed")}
+    out = open(f"{output}.tmp", "w", encoding="utf-8") if dump else None
+    try:
+        if processes == 1:
+            _collect(map(_star_rescore_chunk, tasks), columns, out)
+        else:
+            with mp.get_context().Pool(processes) as pool:
+                _collect(pool.imap(_star_rescore_chunk, tasks), columns, out)
+    finally:
+        if out is not None:
+            out.close()
+    if dump:
+        os.replace(f"{output}.tmp", output)
+    elif output is not None:
+        _write_parquet(path, output, columns, chunk_size)
+    return Rescored(columns)
+
+
+def _star_rescore_chunk(task: tuple) -> tuple[dict[str, list], list[str] | None]:
+    return _rescore_chunk(*task)
+
+
+def _collect(results, columns: dict[str, list], out) -> None:
+    for chunk_columns, lines in results:
+        for name, values in chunk_columns.items():
+            columns[name].extend(values)
+        if out is not None and lines:
+            out.write("\n".join(lines) + "\n")
+
+
+def _write_parquet(path: str, output: str, columns: dict[str, list], chunk_size: int) -> None:
+    # Streams the input row groups, replacing or appending the score columns.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, start = None, 0
+    try:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            table = pa.Table.from_batches([batch])
+            for name, type_ in zip(SCORE_FIELDS, (pa.string(), pa.bool_(), pa.bool_(), pa.string())):
+                values = pa.array(columns[name][start : start + len(table)], type=type_)
+                if name in table.column_names:
+                    table = table.set_column(table.column_names.index(name), name, values)
+                else:
+                    table = table.append_column(name, values)
+            if writer is None:
+                writer = pq.ParquetWriter(f"{output}.tmp", table.schema)
+            writer.write_table(table)
+            start += len(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(f"{output}.tmp", output)
@@ -1,6 +1,8 @@
+import functools
 import hashlib
 import inspect
 import re
+from typing import Iterable
 
 from pysat.formula import WCNF, CNF # type: ignore
 
@@ -35,6 +37,70 @@ def re_matcher(content_output: str, pattern: str) -> str | None:
     return final_answer
 
 
+ANSWER_PATTERN = r"(?i)answer:\s*([^\n]+)"
+_ANSWER_LINE_PATTERN = re.compile(ANSWER_PATTERN)
+
+
+def _last_answer_line(text: str) -> str | None:
+    # Same result as re_matcher(text, ANSWER_PATTERN), scanning newline-delimited chunks from the end.
+    # A match only crosses a newline through the whitespace right after "answer:", so every other
+    # newline is a point where finditer starts fresh and the chunk after it can be matched alone.
+    end = len(text)
+    while end > 0:
+        p = text.rfind("\n", 0, end)
+        while p != -1:
+            q = p
+            while q > 0 and text[q - 1].isspace():
+                q -= 1
+            if text[max(0, q - 7) : q].lower() != "answer:":
+                break
+            p = text.rfind("\n", 0, p)
+        last = None
+        for last in _ANSWER_LINE_PATTERN.finditer(text, p + 1, end):
+            pass
+        if last is not None:
+            return last.group(1)
+        end = p
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _last_binary_pattern(answer_length: int) -> re.Pattern:
+    return re.compile(r"(?s).*([01]{%d})" % answer_length)
+
+
+def match_last_binary(text: str | None, answer_length: int) -> str | None:
+    # Same result as the last match of re_matcher(text, Problem.ANSWER_PATTERN).
+    if not isinstance(text, str):
+        return None
+    m = _last_binary_pattern(answer_length).match(text)
+    return m.group(1) if m else None
+
+
+def extract_final_answer(content_output: str | None, answer_length: int) -> str | None:
+    # Last "Answer:" line, then the last binary string of the expected length within it.
+    if not isinstance(content_output, str):
+        return None
+    return match_last_binary(_last_answer_line(content_output), answer_length)
+
+
+_COMPLETE_ANSWER_LINE_PATTERN = re.compile(ANSWER_PATTERN + r"\n")
+
+
+def complete_answer(text: str, answer_length: int) -> str | None:
+    # Binary answer of the first newline-terminated "Answer:" line whose value holds one. Lines such as
+    # "The answer: we need x1 true" or a bare "**Answer:**" header don't count, so a stream stopped on this
+    # can't be cut before the real final answer.
+    for m in _COMPLETE_ANSWER_LINE_PATTERN.finditer(text):
+        if (answer := match_last_binary(m.group(1), answer_length)) is not None:
+            return answer
+    return None
+
+
+def extract_final_answers(content_outputs: Iterable[str | None], answer_length: int) -> list[str | None]:
+    return [extract_final_answer(content_output, answer_length) for content_output in content_outputs]
+
+
 SYSTEM_PROMPT = "You are a helpful assistant."
 QUERY_TEMPLATE = """\
 Solve the following problem step by step. The last line of your response should be of the form Answer: $ANSWER (without quotes) where $ANSWER is the answer to the problem.
@@ -43,5 +109,3 @@ Solve the following problem step by step. The last line of your response should
 
 Remember to put your answer on its own line after "Answer:", and you do not need to use a \\boxed command.
 """.strip()
-
-ANSWER_PATTERN = r"(?i)answer:\s*([^\n]+)"
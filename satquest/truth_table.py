@@ -0,0 +1,101 @@
+try:
+    import numpy as np
+except ImportError:  # optional; problems fall back to the pysat solvers
+    np = None
+
+from satquest.cnf import CNF
+
+# 2**20 assignments take ~1 MiB per byte of per-assignment state (clause masks, falsified counts).
+MAX_VARIABLES = 20
+# Up to here building a table costs about as much as one solver call, so checks and SATSP/MaxSAT enumeration
+# use it without being asked. Measured crossover for full enumeration: ~12 variables for MaxSAT, while SATSP
+# formulas with few models stay faster on the solver throughout.
+CHECK_VARIABLES = 10
+# Set bits per byte value, for counting bits where np.bitwise_count (NumPy >= 2) is missing.
+_POPCOUNT = None if np is None else np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _count_bits(packed: "np.ndarray") -> "np.ndarray":
+    # Set bits per row of a packed uint8 array.
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(packed).sum(axis=1)
+    return _POPCOUNT[packed].sum(axis=1)
+
+
+def available(cnf: CNF, max_variables: int = MAX_VARIABLES) -> bool:
+    return np is not None and 0 < cnf.nv <= max_variables
+
+
+class TruthTable:
+    # Every assignment of a small CNF evaluated in one vectorized pass. Row a assigns x_i = (a >> (i - 1)) & 1,
+    # so the answer string of row a is its bits from the lowest up. masks[a] packs the clauses row a satisfies,
+    # clause j (0-based) at bit j % 8 of byte j // 8.
+    def __init__(self, cnf: CNF):
+        self.nv, self.mc = cnf.nv, cnf.mc
+        rows = np.arange(1 << self.nv, dtype=np.uint32)
+        values = np.empty((2 * self.nv + 1, 1 << self.nv), dtype=bool)  # values[lit] for lit in -nv..nv
+        for i in range(1, self.nv + 1):
+            values[i] = (rows >> (i - 1)) & 1
+            np.logical_not(values[i], out=values[-i])
+        sat = np.empty((self.mc, 1 << self.nv), dtype=bool)
+        for j, clause in enumerate(cnf.clauses):
+            sat[j] = False
+            for lit in clause:
+                np.logical_or(sat[j], values[lit], out=sat[j])
+        self.num_falsified = self.mc - sat.sum(axis=0, dtype=np.int32)
+        self.masks = np.ascontiguousarray(np.packbits(sat, axis=0, bitorder="little").T)
+        self.min_falsified = int(self.num_falsified.min())
+
+    def row(self, answer: str) -> int:
+        return int(answer[::-1], 2)
+
+    def answer(self, row: int) -> str:
+        return format(row, f"0{self.nv}b")[::-1]
+
+    def answers(self, rows) -> list[str]:
+        return [self.answer(int(a)) for a in rows]
+
+    def _clause_mask(self, answer: str) -> "np.ndarray":
+        # Packed mask of the clauses marked "1" in a clause-indexed answer.
+        return np.packbits(np.frombuffer(answer.encode(), dtype=np.uint8) == ord("1"), bitorder="little")
+
+    def _rows_covering(self, mask: "np.ndarray") -> "np.ndarray":
+        # Rows satisfying every clause in mask.
+        return ~np.any(mask & ~self.masks, axis=1)
+
+    @property
+    def is_sat(self) -> bool:
+        return self.min_falsified == 0
+
+    @property
+    def num_models(self) -> int:
+        return int(np.count_nonzero(self.num_falsified == 0))
+
+    @property
+    def num_optimal_models(self) -> int:
+        return int(np.count_nonzero(self.num_falsified == self.min_falsified))
+
+    def models(self) -> list[str]:
+        return self.answers(np.flatnonzero(self.num_falsified == 0))
+
+    def optimal_models(self) -> list[str]:
+        return self.answers(np.flatnonzero(self.num_falsified == self.min_falsified))
+
+    def falsified(self, answer: str) -> int:
+        return int(self.num_falsified[self.row(answer)])
+
+    def is_mcs(self, answer: str) -> bool:
+        # The rest of the formula is satisfiable, and no assignment satisfying it also satisfies a removed clause.
+        removed = self._clause_mask(answer)
+        rest = self._clause_mask("".join("0" if aj == "1" else "1" for aj in answer))
+        covering = self._rows_covering(rest)
+        return bool(covering.any()) and not bool((self.masks[covering] & removed).any())
+
+    def is_mus(self, answer: str) -> bool:
+        # Unsatisfiable, and satisfiable again without any single one of its clauses: the rows missing
+        # exactly one of its clauses must between them miss every one.
+        missing = self._clause_mask(answer) & ~self.masks
+        num_missing = _count_bits(missing)
+        if not num_missing.all():
+            return False
+        return bool((np.bitwise_or.reduce(missing[num_missing == 1], axis=0) == self._clause_mask(answer)).all())
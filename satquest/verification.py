@@ -0,0 +1,329 @@
+import asyncio
+import hashlib
+import http.client
+import json
+import multiprocessing as mp
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from satquest.budget import UNKNOWN
+from satquest.cnf import CNF
+from satquest.problem import create_problem, get_problem_class
+
+# Batched answer verification over local HTTP/1.1 (TCP or a Unix socket), so trainer and evaluator
+# processes can hand checking to a shared server.
+#
+#   POST /score  {"requests": [{"p_type": "MUS", "dimacs": "p cnf ...", "answers": ["0110", null, ...]}, ...]}
+#             -> {"results": [{"is_correct": [...], "is_format_correct": [...]}, ...]}
+#                is_correct is null for a check that ran out of budget (UNKNOWN); those are not cached
+#                400 {"error": ...} for an unknown problem type or a formula that can't be checked
+#                503 {"error": ...} when a problem type's queue is full; the client backs off and retries
+#   GET /stats -> counters
+#
+# The asyncio front end answers from a result cache keyed by (p_type, formula digest, answer). The other
+# answers go to one queue per problem type, so quick SATSP checks are not batched behind slow MUS ones.
+# Each queue's dispatcher groups requests into batches for a process pool whose workers keep recent
+# Problems warm and score each formula's answers with Problem.check_batch.
+
+WORKER_CACHE_SIZE = 1024  # problems kept alive per pool worker
+
+
+@dataclass
+class VerificationConfig:
+    host: str = "127.0.0.1"
+    port: int = 8021  # 0 picks a free port
+    unix_socket: str | None = None  # listen here instead of host/port
+    processes: int | None = None  # pool workers; os.cpu_count() if None
+    max_batch: int = 256  # answers per pool task
+    max_wait: float = 0.005  # seconds a dispatcher waits to fill a batch
+    max_pending: int = 100_000  # answers queued or in flight per problem type before requests get 503
+    cache_size: int = 1_000_000  # results kept by the front end
+
+
+class Overloaded(Exception):
+    pass
+
+
+class InvalidRequest(Exception):
+    pass
+
+
+@dataclass
+class _Work:
+    p_type: str
+    dimacs: str
+    answers: list
+    future: asyncio.Future = field(repr=False)
+
+
+_worker_problems: OrderedDict = OrderedDict()
+
+
+def _score_batch(p_type: str, items: list[tuple[str, list]]) -> list[tuple[list, list] | InvalidRequest]:
+    # Pool worker: (is_correct, is_format_correct) per (dimacs, answers) item, or the error of that item alone,
+    # so one malformed formula doesn't fail the other requests batched with it. UNKNOWN becomes None.
+    results = []
+    for dimacs, answers in items:
+        key = (p_type, dimacs)
+        try:
+            problem = _worker_problems.pop(key, None) or create_problem(p_type, CNF(dimacs=dimacs))
+            _worker_problems[key] = problem
+            if len(_worker_problems) > WORKER_CACHE_SIZE:
+                _worker_problems.popitem(last=False)
+            is_correct, is_format_correct = problem.check_batch(answers)
+        except Exception as e:
+            results.append(InvalidRequest(f"{p_type} formula: {e!r}"))
+            continue
+        results.append(([None if ok is UNKNOWN else bool(ok) for ok in is_correct], is_format_correct))
+    return results
+
+
+class VerificationServer:
+    def __init__(self, config: VerificationConfig):
+        self.config = config
+        self.stats = {"requests": 0, "answers": 0, "cache_hits": 0, "batches": 0, "rejected": 0}
+        self._cache: OrderedDict = OrderedDict()
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._pending: dict[str, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._pool: ProcessPoolExecutor | None = None
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        if self.config.unix_socket:
+            return f"unix:{self.config.unix_socket}"
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        # Spawned workers: forking a process that runs an event loop and threads is unsafe.
+        self._pool = ProcessPoolExecutor(self.config.processes, mp_context=mp.get_context("spawn"))
+        if self.config.unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, self.config.unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.config.host, self.config.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for task in self._tasks:
+            task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def start_in_thread(self) -> threading.Thread:
+        # Runs the server on its own event loop in a daemon thread; returns once it is listening.
+        ready = threading.Event()
+
+        async def main():
+            await self.start()
+            ready.set()
+            await self.serve_forever()
+
+        thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+        thread.start()
+        ready.wait()
+        return thread
+
+    async def score(self, requests: list[dict]) -> list[dict]:
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        for request in requests:
+            try:
+                get_problem_class(request["p_type"])
+            except (ValueError, AttributeError) as e:  # checked before a queue is created for it
+                raise InvalidRequest(repr(e)) from None
+        results, work = [], []
+        for request in requests:
+            p_type, dimacs, answers = request["p_type"], request["dimacs"], request["answers"]
+            digest = hashlib.blake2b(dimacs.encode(), digest_size=16).digest()
+            known = {}
+            for answer in answers:
+                if (p_type, digest, answer) in self._cache:
+                    self._cache.move_to_end((p_type, digest, answer))
+                    known[answer] = self._cache[(p_type, digest, answer)]
+            missing = [a for a in dict.fromkeys(answers) if a not in known]
+            self.stats["answers"] += len(answers)
+            self.stats["cache_hits"] += len(answers) - len(missing)
+            item = _Work(p_type, dimacs, missing, loop.create_future()) if missing else None
+            results.append((p_type, digest, answers, known, item))
+            if item is not None:
+                work.append(item)
+        # Admission is all-or-nothing per call, so a rejected call leaves nothing queued.
+        demand: dict[str, int] = {}
+        for item in work:
+            demand[item.p_type] = demand.get(item.p_type, 0) + len(item.answers)
+        if any(self._pending.get(p, 0) + n > self.config.max_pending for p, n in demand.items()):
+            self.stats["rejected"] += 1
+            raise Overloaded(demand)
+        for item in work:
+            self._enqueue(item)
+        out = []
+        for p_type, digest, answers, known, item in results:
+            if item is not None:
+                for answer, result in zip(item.answers, await item.future):
+                    known[answer] = result
+                    if result[0] is not None:
+                        self._remember((p_type, digest, answer), result)
+            out.append({"is_correct": [known[a][0] for a in answers], "is_format_correct": [known[a][1] for a in answers]})
+        return out
+
+    def _remember(self, key: tuple, result: tuple) -> None:
+        self._cache[key] = result
+        if len(self._cache) > self.config.cache_size:
+            self._cache.popitem(last=False)
+
+    def _enqueue(self, item: _Work) -> None:
+        if item.p_type not in self._queues:
+            self._queues[item.p_type] = asyncio.Queue()
+            self._pending[item.p_type] = 0
+            self._spawn(self._dispatch(item.p_type))
+        self._pending[item.p_type] += len(item.answers)
+        self._queues[item.p_type].put_nowait(item)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, p_type: str) -> None:
+        loop, queue = asyncio.get_running_loop(), self._queues[p_type]
+        while True:
+            items = [await queue.get()]
+            size, deadline = len(items[0].answers), loop.time() + self.config.max_wait
+            while size < self.config.max_batch and (timeout := deadline - loop.time()) > 0:
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                size += len(items[-1].answers)
+            self.stats["batches"] += 1
+            try:
+                future = loop.run_in_executor(self._pool, _score_batch, p_type, [(i.dimacs, i.answers) for i in items])
+            except Exception as e:  # e.g. a broken pool; fail this batch but keep the queue alive
+                future = loop.create_future()
+                future.set_exception(e)
+            self._spawn(self._finish(p_type, future, items, size))
+
+    async def _finish(self, p_type: str, future, items: list[_Work], size: int) -> None:
+        try:
+            batch = await future
+        except Exception as e:
+            for item in items:
+                item.future.set_exception(e)
+        else:
+            for item, result in zip(items, batch):
+                if isinstance(result, InvalidRequest):
+                    item.future.set_exception(result)
+                else:
+                    item.future.set_result(list(zip(*result)))
+        finally:
+            self._pending[p_type] -= size
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while request_line := await reader.readline():
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+                head = f"HTTP/1.1 {status} {http.client.responses[status]}\r\nContent-Type: application/json\r\n"
+                writer.write(f"{head}Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        if method == "GET" and path == "/stats":
+            return 200, {**self.stats, "pending": dict(self._pending), "cached": len(self._cache)}
+        if method != "POST" or path != "/score":
+            return 404, {"error": f"unknown endpoint {method} {path}"}
+        try:
+            return 200, {"results": await self.score(json.loads(body)["requests"])}
+        except Overloaded as e:
+            return 503, {"error": f"queue full: {e}"}
+        except InvalidRequest as e:
+            return 400, {"error": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {"error": repr(e)}
+        except Exception as e:
+            return 500, {"error": repr(e)}
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class VerificationClient:
+    # Blocking client; one keep-alive connection per thread. url is "http://host:port" or "unix:/path".
+    def __init__(self, url: str = "http://127.0.0.1:8021", timeout: float = 600.0, retries: int = 8):
+        self.url, self.timeout, self.retries = url, timeout, retries
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if getattr(self._local, "conn", None) is None:
+            if self.url.startswith("unix:"):
+                self._local.conn = _UnixHTTPConnection(self.url[len("unix:") :], self.timeout)
+            else:
+                self._local.conn = http.client.HTTPConnection(self.url.split("://", 1)[-1], timeout=self.timeout)
+        return self._local.conn
+
+    def _request(self, method: str, path: str, payload: Any = None) -> Any:
+        body = None if payload is None else json.dumps(payload).encode()
+        for attempt in range(self.retries + 1):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                data = json.loads(response.read())
+            except (ConnectionError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt == self.retries:
+                    raise
+                continue
+            if response.status == 503 and attempt < self.retries:
+                time.sleep(min(2.0, 0.05 * 2**attempt))
+                continue
+            if response.status != 200:
+                raise RuntimeError(f"verification server returned {response.status}: {data.get('error')}")
+            return data
+
+    def score(self, requests: list[tuple[str, str, list]]) -> list[tuple[list[bool], list[bool]]]:
+        # (is_correct, is_format_correct) for each (p_type, dimacs, answers) request; is_correct is None where
+        # a check ran out of budget.
+        payload = {"requests": [{"p_type": p, "dimacs": d, "answers": list(a)} for p, d, a in requests]}
+        return [(r["is_correct"], r["is_format_correct"]) for r in self._request("POST", "/score", payload)["results"]]
+
+    def stats(self) -> dict:
+        return self._request("GET", "/stats")
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing as mp
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from satquest import aio
+from satquest.budget import UNKNOWN, Budget
+from satquest.cnf import CNF
+from satquest.problem import MUS, SATDP, create_problem
+
+
+def _random_3sat(nv: int, seed: int = 1, ratio: float = 4.26) -> CNF:
+    rng = random.Random(seed)
+    return CNF(clauses=[[rng.choice([-1, 1]) * v for v in rng.sample(range(1, nv + 1), 3)] for _ in range(int(ratio * nv))])
+
+
+def _unsat_cnf() -> CNF:
+    return CNF(clauses=[[1, 2], [-1, 2], [1, -2], [-1, -2], [3], [-3, 1]])
+
+
+async def _collect(answers) -> list:
+    return [answer async for answer in answers]
+
+
+@pytest.mark.parametrize("executor_cls", [ThreadPoolExecutor, ProcessPoolExecutor])
+@pytest.mark.parametrize("p_type", ["SATSP", "MaxSAT", "MCS", "MUS"])
+def test_matches_blocking_api(executor_cls, p_type):
+    cnf = _random_3sat(6, ratio=2) if p_type == "SATSP" else _unsat_cnf()
+    reference = create_problem(p_type, cnf, truth_table_max_variables=0)
+    answers = sorted(reference.solution_enumerate())
+    candidates = [answers[0], "0" * reference.answer_length, "1" * reference.answer_length, "01", None]
+    kwargs = {"mp_context": mp.get_context("spawn")} if executor_cls is ProcessPoolExecutor else {}
+
+    async def main(executor):
+        problem = create_problem(p_type, cnf, truth_table_max_variables=0)
+        assert await problem.asolution(executor=executor) == reference.solution
+        assert problem._solved and problem.solver_metadata == reference.solver_metadata
+        assert await problem.acheck(answers[-1], executor=executor) is True
+        assert await problem.acheck_batch(candidates, executor=executor) == reference.check_batch(candidates)
+        assert set(problem._checked) == {a for a in candidates if problem.format_check(a)}
+        assert sorted(await _collect(problem.aenumerate(executor=executor))) == answers
+
+    with executor_cls(1, **kwargs) as executor:
+        asyncio.run(main(executor))
+
+
+def test_default_executor_and_process_chunks(monkeypatch):
+    monkeypatch.setattr("satquest.problem.ENUMERATE_CHUNK", 2)
+    problem = MUS(CNF(clauses=[[1], [-1], [2], [-2]]), truth_table_max_variables=0)
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as executor:
+        aio.set_default_executor(executor)
+        try:
+            assert sorted(asyncio.run(_collect(problem.aenumerate()))) == ["0011", "1100"]
+            assert asyncio.run(_collect(problem.aenumerate(budget=Budget(propagations=1)))) == [UNKNOWN]
+        finally:
+            aio.set_default_executor(None)
+
+
+@pytest.mark.parametrize("solver_name", ["g4", "cd19"])
+def test_cancel_interrupts_solver(solver_name):
+    problem = SATDP(_random_3sat(400), solver_name=solver_name)
+
+    async def main():
+        task = asyncio.create_task(problem.asolution())
+        ticks = 0
+        while ticks < 20:  # the loop keeps running while the solver works
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not task.done()
+        start = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) < 3.0
+    assert not problem._solved
+    assert problem.solve(budget=Budget(conflicts=10)) is UNKNOWN
+
+
+def test_cancel_stops_enumeration():
+    problem = SATDP(_random_3sat(400))
+
+    async def main():
+        answers = problem.aenumerate()
+        task = asyncio.create_task(answers.__anext__())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await answers.aclose()
+
+    asyncio.run(asyncio.wait_for(main(), 5))
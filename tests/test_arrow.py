@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from satquest.arrow import cnf_columns, cnf_from_row, iter_cnfs
+from satquest.cnf import CNF
+
+
+def _cnfs(n: int) -> list[CNF]:
+    rng = random.Random(0)
+    return [CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 9), rng.randint(1, 3))] for _ in range(12)]) for _ in range(n)]
+
+
+def test_columns_round_trip_through_rows():
+    for cnf in _cnfs(5):
+        row = cnf_columns(cnf, "unsat")
+        assert row["unsat_offsets"][-1] == len(row["unsat_literals"]) and len(row["unsat_offsets"]) == cnf.mc + 1
+        clone = cnf_from_row(row, "unsat")
+        assert clone.clauses == cnf.clauses and clone.nv == cnf.nv
+    assert cnf_from_row({"sat_dimacs": cnf.dimacs, "sat_literals": None}, "sat").clauses == cnf.clauses
+
+
+def test_iter_cnfs_reads_sliced_chunked_tables():
+    pa = pytest.importorskip("pyarrow")
+    cnfs = _cnfs(30)
+    schema = pa.schema([("unsat_literals", pa.list_(pa.int16())), ("unsat_offsets", pa.list_(pa.int32()))])
+    table = pa.Table.from_pylist([cnf_columns(cnf, "unsat") for cnf in cnfs], schema=schema)
+    table = pa.concat_tables([table.slice(0, 10), table.slice(10)]).slice(3, 20)
+
+    assert [cnf.clauses for cnf in iter_cnfs(table, "unsat")] == [cnf.clauses for cnf in cnfs[3:23]]
+    row = table.slice(4, 1)
+    clone = CNF.from_arrow(row.column("unsat_literals")[0], row.column("unsat_offsets")[0])
+    assert clone.clauses == cnfs[7].clauses and clone.nv == cnfs[7].nv
+
+
+def test_unused_top_variable_round_trips():
+    cnf = CNF(clauses=[[1, -2], [3]])
+    cnf.cnf.nv = 5  # e.g. decoded from CNF.to_bytes or a corpus, which keep nv
+    clone = cnf_from_row(cnf_columns(cnf, "sat"), "sat")
+    assert clone.nv == 5 and clone.dimacs == cnf.dimacs
+    row = cnf_columns(cnf, "sat")
+    assert CNF.from_arrow(row["sat_literals"], row["sat_offsets"]).nv == 3  # without the nv column
+
+    pa = pytest.importorskip("pyarrow")
+    table = pa.Table.from_pylist([cnf_columns(cnf, "sat")])
+    assert [c.nv for c in iter_cnfs(table, "sat")] == [5]
+    assert [c.nv for c in iter_cnfs(table.drop_columns(["sat_nv"]), "sat")] == [3]
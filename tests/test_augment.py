@@ -0,0 +1,37 @@
+import pytest
+
+from satquest.augment import augment
+from satquest.cnf import CNF
+from satquest.problem import Problem, create_problem
+
+
+def _cnf(p_type: str) -> CNF:
+    clauses = [[1, 2, -4], [-1, 2], [1, -2, 3], [-1, -2], [3, 4], [-3, 1], [-4, -3]]
+    return CNF(clauses=clauses[:4] if p_type == "SATSP" else clauses)
+
+
+@pytest.mark.parametrize("p_type", ["SATDP_UNSAT", "SATSP", "MaxSAT", "MCS", "MUS"])
+def test_variants_carry_valid_answers(p_type, monkeypatch):
+    problem = create_problem(p_type, _cnf(p_type), truth_table_max_variables=0)
+    everything, _ = sorted(problem.cursor().take(1000)), problem.solution
+
+    monkeypatch.setattr(Problem, "_make_solver", lambda *args, **kwargs: pytest.fail("solver constructed"))
+    variants = list(augment(problem, n=8, seed=0))
+    monkeypatch.undo()
+
+    assert len({v.cnf.dimacs for v, _ in variants}) == 8
+    assert any(w < 0 for _, permutation in variants for w in permutation.variables)
+    for variant, permutation in variants:
+        reference = create_problem(p_type, variant.cnf, truth_table_max_variables=0)
+        assert reference.check(variant.solution)
+        assert variant.solver_metadata == problem.solver_metadata
+        assert sorted(variant.cursor().answers) == sorted(reference.solution_enumerate()) == sorted(
+            problem._map_answer(a, permutation) for a in everything
+        )
+
+
+def test_stream_is_seeded_and_stops_when_variants_run_out():
+    problem = create_problem("MUS", CNF(clauses=[[1], [-1]]))
+    assert [v.cnf.dimacs for v, _ in augment(problem, n=3, seed=1)] == [v.cnf.dimacs for v, _ in augment(problem, n=3, seed=1)]
+    # [[1], [-1]] only has the variant [[-1], [1]] besides itself
+    assert [v.cnf.clauses for v, _ in augment(problem, seed=0)] == [[[-1], [1]]]
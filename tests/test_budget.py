@@ -0,0 +1,83 @@
+import pickle
+import random
+import time
+
+import pytest
+
+from satquest import metrics
+from satquest.budget import UNKNOWN, Budget, get_default_budget, set_default_budget
+from satquest.cnf import CNF
+from satquest.problem import MUS, SATDP, SATSP, MaxSAT
+
+
+def _random_3sat(nv: int, seed: int = 1, ratio: float = 4.26) -> CNF:
+    rng = random.Random(seed)
+    return CNF(clauses=[[rng.choice([-1, 1]) * v for v in rng.sample(range(1, nv + 1), 3)] for _ in range(int(ratio * nv))])
+
+
+def test_unknown_is_a_falsy_singleton():
+    assert not UNKNOWN
+    assert repr(UNKNOWN) == "UNKNOWN"
+    assert pickle.loads(pickle.dumps(UNKNOWN)) is UNKNOWN
+
+
+def test_conflict_budget_returns_and_caches_unknown():
+    metrics.reset()
+    metrics.enable()
+    try:
+        problem = SATDP(_random_3sat(200), budget=Budget(conflicts=1))
+        assert problem.solution is UNKNOWN
+        assert problem.solution is UNKNOWN
+        assert problem.solver_metadata == {"status": "unknown", "budget": {"time": None, "conflicts": 1, "propagations": None}}
+        snap = metrics.snapshot()
+    finally:
+        metrics.disable()
+        metrics.reset()
+    misses = [c["value"] for c in snap["counters"] if c["name"] == "solution_cache_misses_total"]
+    assert misses == [1]
+
+    assert problem.solve(budget=Budget(conflicts=10**7)) in ("0", "1")
+
+
+@pytest.mark.parametrize("solver_name", ["g4", "m22", "cd19"])
+def test_time_budget_interrupts_solver(solver_name):
+    problem = SATDP(_random_3sat(400), solver_name=solver_name, budget=Budget(time=0.05))
+    start = time.perf_counter()
+    assert problem.solution is UNKNOWN
+    assert time.perf_counter() - start < 3.0
+
+
+def test_budget_limits_check_and_enumeration():
+    cnf = _random_3sat(200)
+    problem = SATSP(CNF(clauses=[[1, 2], [-1, 2]]))
+    assert problem.check("01", budget=Budget(conflicts=10)) is True
+    assert sorted(problem.solution_enumerate(budget=Budget(conflicts=10))) == ["01", "11"]
+
+    assert SATDP(cnf, budget=Budget(conflicts=1)).check("1") is UNKNOWN
+    unsat_cnf = _random_3sat(30, seed=3, ratio=8)
+    assert list(MUS(unsat_cnf).solution_enumerate(budget=Budget(propagations=1))) == [UNKNOWN]
+
+
+def test_budget_reaches_pysat_tools_and_default_budget():
+    cnf = _random_3sat(30, seed=3, ratio=8)
+    assert MaxSAT(cnf, budget=Budget(propagations=1)).solution is UNKNOWN
+    assert MUS(cnf, budget=Budget(propagations=1)).solution is UNKNOWN
+    assert MUS(cnf).check("1" * cnf.mc, budget=Budget(propagations=1)) is UNKNOWN
+
+    set_default_budget(Budget(propagations=1))
+    try:
+        assert get_default_budget() == Budget(propagations=1)
+        assert MUS(cnf).solution is UNKNOWN
+        assert MUS(cnf, budget=Budget(conflicts=10**7)).solution is not UNKNOWN
+    finally:
+        set_default_budget(None)
+
+
+def test_interrupted_maxsat_engine_is_rebuilt():
+    problem = MaxSAT(_random_3sat(30, seed=3, ratio=8))
+    assert problem.check("1" * 30, budget=Budget(propagations=1)) is False  # solution falls back to the unlimited default
+    engine = problem.engine()
+    assert list(problem.solution_enumerate(budget=Budget(propagations=1))) == [problem.solution, UNKNOWN]
+    assert not engine.valid
+    assert problem.engine() is not engine
+    assert next(problem.solution_enumerate()) == problem.solution
@@ -1,3 +1,5 @@
+import pickle
+
 from satquest.cnf import CNF
 
 
@@ -45,3 +47,30 @@ def test_is_sat_handles_sat_and_unsat_instances():
 
     assert sat_cnf.is_sat is True
     assert unsat_cnf.is_sat is False
+
+
+def test_to_bytes_round_trips_clauses_and_cached_satisfiability():
+    cnf = CNF(clauses=[[1, -2, 300], [-1], [2, -5]])
+    assert cnf.is_sat is True
+    for clone in (CNF.from_bytes(cnf.to_bytes()), pickle.loads(pickle.dumps(cnf))):
+        assert clone.clauses == cnf.clauses and clone.nv == cnf.nv == 300
+        assert clone._is_sat is True and clone.dimacs == cnf.dimacs
+    assert CNF.from_bytes(CNF(clauses=[[1]]).to_bytes())._is_sat is None
+    assert len(cnf.to_bytes()) < len(pickle.dumps(cnf.cnf))
+
+
+def test_shuffle_returns_permutation_that_maps_answers():
+    base = [[1, 2, -3], [3, -1], [-2, 4], [4]]
+    cnf = CNF(clauses=[clause[:] for clause in base])
+    permutation = cnf.shuffle(seed=5, relabel=True)
+
+    assert sorted(permutation.variables) == [1, 2, 3, 4]
+    for j, i in enumerate(permutation.clauses):
+        renamed = [permutation.variables[abs(lit) - 1] * (1 if lit > 0 else -1) for lit in base[i]]
+        assert sorted(cnf.clauses[j]) == sorted(renamed)
+    assert permutation.map_assignment("1100") == "".join("1100"[permutation.variables.index(v)] for v in range(1, 5))
+    assert permutation.map_subset("1000")[permutation.clauses.index(0)] == "1"
+    assert permutation.then(permutation.inverse()) == type(permutation).identity(4, 4)
+
+    plain = CNF(clauses=[clause[:] for clause in base]).shuffle(seed=5)
+    assert plain.variables == (1, 2, 3, 4)
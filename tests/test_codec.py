@@ -0,0 +1,21 @@
+import pytest
+
+from satquest import codec
+
+
+@pytest.mark.parametrize(
+    "values, width", [([], 1), ([0, 1, -128, 127], 1), ([128, -1], 2), ([-40000, 5], 4), ([2**40, -(2**40)], 8)]
+)
+def test_ints_round_trip_at_narrowest_width(values, width):
+    data = codec.pack_ints(values)
+    assert data[0] == width and len(data) == 5 + width * len(values)
+    assert codec.unpack_ints(b"xy" + data, 2) == (values, 2 + len(data))
+
+
+@pytest.mark.parametrize("length", [0, 1, 8, 13])
+def test_answers_round_trip(length):
+    answers = [format(i, f"0{length}b")[-length:] if length else "" for i in range(5)]
+    data = codec.pack_answers(answers, length) + codec.pack_str("Ünïcode")
+    decoded, offset = codec.unpack_answers(data, 0)
+    assert decoded == answers
+    assert codec.unpack_str(data, offset) == ("Ünïcode", len(data))
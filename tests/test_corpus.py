@@ -0,0 +1,72 @@
+import multiprocessing as mp
+import pickle
+import random
+
+import pytest
+
+from satquest.cnf import CNF
+from satquest.corpus import Corpus, CorpusWriter, open_corpus, write_corpus
+from satquest.problem import create_problem
+
+
+def _cnfs(n: int) -> list[CNF]:
+    rng = random.Random(0)
+    return [CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 9), rng.randint(1, 3))] for _ in range(rng.randint(1, 12))]) for _ in range(n)]
+
+
+def _decode(cnf: CNF) -> list[list[int]]:
+    return cnf.clauses
+
+
+@pytest.fixture
+def corpus_dir(tmp_path):
+    cnfs = _cnfs(50)
+    assert write_corpus(str(tmp_path), ((cnf, {"id": i, "tag": "x" * i}) for i, cnf in enumerate(cnfs))) == 50
+    return str(tmp_path), cnfs
+
+
+def test_random_access_is_lazy_and_exact(corpus_dir):
+    path, cnfs = corpus_dir
+    corpus = Corpus(path)
+    assert len(corpus) == 50
+    for i in random.Random(1).sample(range(50), 20) + [0, 49, -1]:
+        view = corpus[i]
+        assert (view.mc, view.nv) == (cnfs[i].mc, cnfs[i].nv) and view._cnf is None
+        assert view.clauses == cnfs[i].clauses and view.metadata["id"] == i % 50
+    with pytest.raises(IndexError):
+        corpus[50]
+    assert [view.clauses for view in corpus] == [cnf.clauses for cnf in cnfs]
+    assert create_problem("SATDP", corpus[3]).solution == str(int(cnfs[3].is_sat))
+    corpus.close()
+
+
+def test_views_pickle_by_reference_until_decoded(corpus_dir):
+    path, cnfs = corpus_dir
+    corpus = open_corpus(path)
+    view = corpus[7]
+    clone = pickle.loads(pickle.dumps(view))
+    assert clone.corpus is corpus and clone.clauses == cnfs[7].clauses
+    view.shuffle(seed=3)
+    assert pickle.loads(pickle.dumps(view)).clauses == view.clauses
+    with mp.get_context("spawn").Pool(2) as pool:
+        assert pool.map(_decode, [corpus[i] for i in range(10)]) == [cnf.clauses for cnf in cnfs[:10]]
+    corpus.close()
+
+
+def test_closing_a_private_corpus_keeps_the_shared_one(corpus_dir):
+    path, cnfs = corpus_dir
+    shared = open_corpus(path)
+    Corpus(path).close()
+    assert open_corpus(path) is shared
+    assert pickle.loads(pickle.dumps(shared[2])).clauses == cnfs[2].clauses
+    shared.close()
+    assert open_corpus(path) is not shared
+    open_corpus(path).close()
+
+
+def test_empty_corpus(tmp_path):
+    with CorpusWriter(str(tmp_path)):
+        pass
+    corpus = Corpus(str(tmp_path))
+    assert len(corpus) == 0 and list(corpus) == []
+    corpus.close()
@@ -0,0 +1,60 @@
+import itertools
+import random
+
+import pytest
+
+from satquest.cnf import CNF
+from satquest.counting import count_models
+from satquest.problem import MCS, MUS, SATDP, SATSP, MaxSAT
+
+
+def _brute_force_count(clauses: list[list[int]], nv: int) -> int:
+    return sum(
+        all(any((lit > 0) == values[abs(lit) - 1] for lit in clause) for clause in clauses)
+        for values in itertools.product((False, True), repeat=nv)
+    )
+
+
+def _random_cnf(rng: random.Random, nv: int, mc: int) -> list[list[int]]:
+    return [[v * rng.choice([-1, 1]) for v in rng.sample(range(1, nv + 1), rng.randint(1, min(3, nv)))] for _ in range(mc)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_count_models_matches_brute_force(seed):
+    rng = random.Random(seed)
+    nv = rng.randint(1, 9)
+    clauses = _random_cnf(rng, nv, rng.randint(1, 3 * nv))
+    assert count_models(clauses, nv + 2) == 4 * _brute_force_count(clauses, nv)
+
+
+def test_count_models_edge_cases():
+    assert count_models([], 3) == 8
+    assert count_models([[1, -1]], 2) == 4
+    assert count_models([[1], []], 2) == 0
+    # Two independent components: (x1 | x2) has 3 models, (x3 | x4) & -x3 has 1.
+    assert count_models([[1, 2], [3, 4], [-3]], 4) == 3
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_problem_counts_match_enumeration(seed):
+    rng = random.Random(seed)
+    while not (unsat := CNF(clauses=_random_cnf(rng, 5, 14))).nv == 5 or unsat.is_sat:
+        pass
+    sat = CNF(clauses=unsat.clauses[:6])
+    if sat.is_sat:
+        reference = SATSP(sat, truth_table_max_variables=0)
+        assert SATSP(sat, truth_table_max_variables=0).count() == len(list(reference.solution_enumerate()))
+    for cls in (MaxSAT, MCS, MUS):
+        reference = cls(unsat, truth_table_max_variables=0)
+        assert cls(unsat, truth_table_max_variables=0).count() == len(list(reference.solution_enumerate()))
+    with_table = MaxSAT(unsat)
+    if with_table.truth_table is not None:
+        assert with_table.count() == MaxSAT(unsat, truth_table_max_variables=0).count()
+
+
+def test_count_is_cached_and_honours_limit():
+    cnf = CNF(clauses=[[1], [-1], [2], [-2]])
+    problem = MCS(cnf)
+    assert problem.count(limit=3) is None
+    assert problem.count() == 4 and problem.count(limit=1) == 4
+    assert MUS(cnf).count() == 2 and SATDP(cnf).count() == 1
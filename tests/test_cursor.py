@@ -0,0 +1,61 @@
+import pytest
+
+from satquest import metrics
+from satquest.budget import Budget
+from satquest.cnf import CNF
+from satquest.problem import create_problem
+
+UNSAT_CNF = CNF(clauses=[[1], [-1], [2], [-2], [1, 2], [-1, -2]])
+SAT_CNF = CNF(clauses=[[1, 2, 3]])
+
+
+@pytest.mark.parametrize("p_type", ["SATSP", "MaxSAT", "MCS", "MUS"])
+def test_cursor_matches_solution_enumerate(p_type):
+    cnf = SAT_CNF if p_type == "SATSP" else UNSAT_CNF
+    expected = sorted(create_problem(p_type, cnf).solution_enumerate())
+    cursor = create_problem(p_type, cnf).cursor()
+
+    first = cursor.take(2)
+    assert len(first) == 2 and cursor.take(1) == first[:1]
+    assert sorted(cursor.take(1000)) == expected
+    assert cursor.exhausted
+    assert list(cursor) == cursor.answers
+
+
+def test_cursor_is_cached_and_resumes_live_solver():
+    problem = create_problem("SATSP", SAT_CNF, truth_table_max_variables=0)
+    cursor = problem.cursor()
+    assert problem.cursor() is cursor
+
+    metrics.reset()
+    metrics.enable()
+    try:
+        cursor.take(3)
+        cursor.take(5)
+        cursor.take(8)
+        snap = metrics.snapshot()
+    finally:
+        metrics.disable()
+        metrics.reset()
+    constructs = [h["count"] for h in snap["histograms"] if h["name"] == "solver_construct_seconds"]
+    assert constructs == [1]
+    assert len(set(cursor.answers)) == 7 and cursor.exhausted
+
+
+@pytest.mark.parametrize("p_type, cnf", [("SATSP", SAT_CNF), ("MCS", UNSAT_CNF)])
+def test_cursor_restarts_past_known_answers_after_budget_hit(p_type, cnf):
+    # Budgets bound the pysat solvers, so the truth table is disabled here.
+    cursor = create_problem(p_type, cnf, truth_table_max_variables=0).cursor()
+    first = cursor.take(2)
+
+    assert cursor.take(10, budget=Budget(time=0)) == first
+    assert not cursor.exhausted
+    rest = cursor.take(10)
+    assert rest[:2] == first and len(set(rest)) == len(rest)
+    assert sorted(rest) == sorted(create_problem(p_type, cnf).solution_enumerate())
+
+
+def test_cursor_stops_at_blocking_cap():
+    cursor = create_problem("SATSP", SAT_CNF).cursor(max_blocking=4)
+    assert len(cursor.take(10)) == 4
+    assert cursor.capped and not cursor.exhausted
@@ -0,0 +1,35 @@
+import json
+
+from eval_journal import EvalJournal, journal_key
+
+
+def _record(cnf_id: int, repeat_i: int = 0, **extra) -> dict:
+    return {"cnf_id": cnf_id, "problem_type": "SATSP", "question_type": "math", "repeat_i": repeat_i, "model": "m", **extra}
+
+
+def test_resume_skips_journaled_keys(tmp_path):
+    path = str(tmp_path / "journal" / "run.jsonl")
+    journal = EvalJournal(path)
+    assert journal.records() == [] and journal.completed_keys() == set()
+    for cnf_id in range(3):
+        journal.append(_record(cnf_id, is_correct=cnf_id == 1))
+
+    completed = EvalJournal(path).completed_keys()  # a resumed run
+    planned = [_record(cnf_id, r) for cnf_id in range(4) for r in range(2)]
+    remaining = [key for key in map(journal_key, planned) if key not in completed]
+    assert remaining == [journal_key(_record(cnf_id, r)) for cnf_id, r in [(0, 1), (1, 1), (2, 1), (3, 0), (3, 1)]]
+    # Records written without repeat_i (n_repeat == 1) match keys with repeat_i 0.
+    assert journal_key({k: v for k, v in _record(0).items() if k != "repeat_i"}) in completed
+
+
+def test_truncated_last_line_is_recovered(tmp_path):
+    path = tmp_path / "run.jsonl"
+    line = json.dumps(_record(0, is_correct=True))
+    path.write_text(line + "\n" + line[: len(line) // 2], encoding="utf-8")  # killed mid-write
+
+    journal = EvalJournal(str(path))
+    assert path.read_text(encoding="utf-8").endswith("\n")
+    assert journal.records() == [_record(0, is_correct=True)]
+    journal.append(_record(1, is_correct=False))
+    assert [r["cnf_id"] for r in journal.records()] == [0, 1]
+    assert journal.completed_keys() == {journal_key(_record(0)), journal_key(_record(1))}
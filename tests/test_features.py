@@ -0,0 +1,56 @@
+from satquest.cnf import CNF
+from satquest.features import FeatureIndex, backbone, extract_features
+from satquest.problem import create_problem
+
+UNSAT_CNF = CNF(clauses=[[1, 2], [-1, 2], [1, -2], [-1, -2], [3, -1, 2], [-3]])
+SAT_CNF = CNF(clauses=[[1, 2], [-1, 2], [1, -2], [-1, -2, 3], [3, -1, 2], [-3, 1]])
+
+
+def _rows() -> list[dict]:
+    small = CNF(clauses=[[1], [-1], [2]])
+    return [
+        {"id": 7, "unsat_dimacs": UNSAT_CNF.dimacs, "sat_dimacs": SAT_CNF.dimacs},
+        {"id": 9, "unsat_dimacs": small.dimacs, "sat_dimacs": CNF(clauses=[[1], [2]]).dimacs},
+    ]
+
+
+def test_backbone():
+    assert backbone(SAT_CNF) == [1, 2, 3]
+    assert backbone(CNF(clauses=[[1, 2], [3]])) == [3]
+    assert backbone(UNSAT_CNF) == []
+
+
+def test_extract_features():
+    features = extract_features(UNSAT_CNF, SAT_CNF)
+    assert (features["num_variable"], features["num_clause"], features["num_literal"]) == (3, 6, 12)
+    assert features["clause_variable_ratio"] == 2
+    assert (features["clause_length_1"], features["clause_length_2"], features["clause_length_3"]) == (1, 4, 1)
+    assert features["backbone_size"] == 3
+    for p_type in ("SATSP", "MaxSAT", "MCS", "MUS"):
+        problem = create_problem(p_type, SAT_CNF if p_type == "SATSP" else UNSAT_CNF)
+        assert features[f"{p_type.lower()}_count"] == len(list(problem.solution_enumerate()))
+        assert features[f"{p_type.lower()}_conflicts"] == problem.solver_metadata["conflicts"]
+    assert extract_features(UNSAT_CNF, SAT_CNF, count_limit=0)["mus_count"] is None
+
+
+def test_feature_index_queries_and_round_trip(tmp_path):
+    rows = _rows()
+    rows[1]["features"] = {**extract_features(CNF(dimacs=rows[1]["unsat_dimacs"]), CNF(dimacs=rows[1]["sat_dimacs"])), "mus_count": None}
+    index = FeatureIndex.build(rows)
+    assert len(index) == 2 and index.column("id") == [7, 9]
+    assert index.column("mus_count")[1] is None  # stored features are reused as is
+
+    assert index.select(num_variable=(3, None)) == [7]
+    assert index.select(num_clause=(None, 3)) == [9]
+    assert index.select(mus_count=(0, None)) == [7]
+    assert sorted(index.sample(5, seed=0)) == [7, 9]
+    assert index.order_by("num_clause") == [9, 7]
+    assert index.order_by("mus_count", descending=True) == [7, 9]
+
+    path = tmp_path / "index.json"
+    index.save(str(path))
+    assert FeatureIndex.load(str(path)).columns == index.columns
+
+
+def test_feature_index_builds_over_a_pool():
+    assert FeatureIndex.build(_rows(), processes=2).columns == FeatureIndex.build(_rows()).columns
@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+from openai import OpenAI
+
+from mock_llm_server import MockLLMConfig, MockLLMServer
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")  # llm_inference builds its client at import time
+import llm_inference  # noqa: E402
+from llm_inference import _trim_scan_buf  # noqa: E402
+
+# The undecorated function, so a failure is raised at once instead of being retried.
+_infer = llm_inference.llm_inference.__wrapped__
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    servers = []
+
+    def start(**overrides) -> MockLLMServer:
+        config = MockLLMConfig(port=0, latency=0.0, tokens_per_s=0, num_tokens=4, answer_mode="canned", canned_answer="0110")
+        for name, value in overrides.items():
+            setattr(config, name, value)
+        server = MockLLMServer(config)
+        server.start()
+        servers.append(server)
+        monkeypatch.setattr(llm_inference, "client", OpenAI(base_url=server.base_url, api_key="mock", max_retries=0))
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_trim_scan_buf_keeps_unfinished_and_dangling_answers():
+    assert _trim_scan_buf("step step\nAnswer: 01") == "Answer: 01"
+    assert _trim_scan_buf("step\nthe answer: x1 is true\n") == ""
+    assert _trim_scan_buf("step\nAnswer:\n") == "Answer:\n"
+
+
+def test_stream_runs_to_the_end_without_stop_on_answer(mock_server):
+    mock_server(num_trailing_tokens=3)
+    output = _infer("question", model="mock-model", stream=True, answer_length=4)
+    assert not output["stopped_on_answer"] and output["usage"]["completion_tokens"] == 9
+    assert output["content_output"].endswith("\nAnswer: 0110\ndone done done ")
+
+
+def test_stop_on_answer_line_split_across_chunks(mock_server):
+    mock_server(num_trailing_tokens=50, answer_chunk_chars=3)
+    output = _infer("question", model="mock-model", stream=True, stop_on_answer=True, answer_length=4)
+    assert output["stopped_on_answer"] and output["usage"] == {}
+    assert output["content_output"].endswith("\nAnswer: 0110\n") and "done" not in output["content_output"]
+
+
+def test_stop_on_answer_waits_for_a_dangling_answer_value(mock_server):
+    # "Answer:\n" arrives as its own delta, so the line is complete before its value is.
+    mock_server(num_trailing_tokens=5, answer_format="\nAnswer:\n0110\n", answer_chunk_chars=1)
+    output = _infer("question", model="mock-model", stream=True, stop_on_answer=True, answer_length=4)
+    assert output["stopped_on_answer"]
+    assert output["content_output"].endswith("\nAnswer:\n0110\n")
+
+
+def test_stop_on_answer_ignores_answers_of_the_wrong_length(mock_server):
+    mock_server(num_trailing_tokens=2, answer_chunk_chars=2)
+    output = _infer("question", model="mock-model", stream=True, stop_on_answer=True, answer_length=5)
+    assert not output["stopped_on_answer"] and output["content_output"].endswith("done done ")
+
+
+def test_deadline_fires_when_no_chunk_arrives(mock_server):
+    server = mock_server(latency=1.0)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        _infer("question", model="mock-model", stream=True, max_duration=0.2)
+    assert time.perf_counter() - start < 0.9
+    # The client closed the connection, so the server's first write after its latency fails.
+    assert _wait_for(lambda: server.stats["disconnects"] == 1)
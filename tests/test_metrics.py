@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from satquest import metrics
+from satquest.cnf import CNF
+from satquest.problem import MUS, SATSP
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def _counter(snapshot: dict, name: str, **labels) -> float:
+    return sum(c["value"] for c in snapshot["counters"] if c["name"] == name and c["labels"] == labels)
+
+
+def _histogram_count(snapshot: dict, name: str, **labels) -> int:
+    return sum(h["count"] for h in snapshot["histograms"] if h["name"] == name and all(h["labels"].get(k) == v for k, v in labels.items()))
+
+
+def test_disabled_metrics_record_nothing():
+    metrics.reset()
+    metrics.disable()
+    problem = SATSP(CNF(clauses=[[1, -2], [2]]))
+    _ = problem.solution
+    assert problem.check("11") is True
+
+    assert metrics.snapshot() == {"counters": [], "histograms": []}
+
+
+def test_solution_check_and_enumeration_are_recorded(enabled_metrics):
+    problem = SATSP(CNF(clauses=[[1, -2], [2]]), truth_table_max_variables=0)
+    _ = problem.solution
+    _ = problem.solution
+    problem.check("11")
+    assert list(problem.solution_enumerate()) == ["11"]
+
+    snap = metrics.snapshot()
+    assert _counter(snap, "solution_cache_misses_total", problem="SATSP") == 1
+    assert _counter(snap, "solution_cache_hits_total", problem="SATSP") == 1
+    assert _counter(snap, "enumerate_yields_total", problem="SATSP") == 1
+    assert _histogram_count(snap, "solve_seconds", problem="SATSP") == 1
+    assert _histogram_count(snap, "check_seconds", problem="SATSP") == 1
+    assert _histogram_count(snap, "solver_construct_seconds", problem="SATSP", solver="Solver") == 3
+
+
+def test_exports_json_and_prometheus_text(enabled_metrics):
+    problem = MUS(CNF(clauses=[[1], [-1]]))
+    problem.check("11")
+
+    data = json.loads(metrics.to_json())
+    assert _histogram_count(data, "check_seconds", problem="MUS") == 1
+
+    text = metrics.to_prometheus()
+    assert "# TYPE satquest_check_seconds histogram" in text
+    assert 'satquest_check_seconds_bucket{le="+Inf",problem="MUS"} 1' in text
+    assert 'satquest_check_seconds_count{problem="MUS"} 1' in text
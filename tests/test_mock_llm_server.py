@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from mock_llm_server import parse_prompt
+from satquest import CNF, create_problem, create_question
+
+
+@pytest.mark.parametrize("q_type", ["math", "dimacs", "story", "dualstory"])
+@pytest.mark.parametrize("p_type", ["SATSP", "SATDP_SAT", "SATDP_UNSAT", "MaxSAT", "MCS", "MUS"])
+def test_parse_prompt_recovers_problem_and_formula(p_type, q_type):
+    rng = random.Random(0)
+    sat = p_type in ["SATSP", "SATDP_SAT"]
+    cnf = None
+    while cnf is None or cnf.nv != 6 or cnf.is_sat != sat:
+        cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 7), rng.choice([2, 3]))] for _ in range(14)])
+    problem = create_problem(p_type, cnf)
+    parsed = parse_prompt(problem.accept(create_question(q_type)))
+    assert parsed is not None
+    parsed_type, parsed_cnf = parsed
+    assert parsed_type == p_type.split("_")[0]
+    assert parsed_cnf.clauses == cnf.clauses
+    assert create_problem(p_type, parsed_cnf).check(problem.solution)
+
+
+def test_parse_prompt_rejects_other_prompts():
+    assert parse_prompt("What is the capital of France?") is None
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from satquest.cnf import CNF
+from satquest.parallel import parallel_enumerate
+from satquest.problem import MCS, MUS, SATSP
+
+
+def _random_unsat_cnf(seed: int, nv: int = 6) -> CNF:
+    rng = random.Random(seed)
+    while True:
+        cnf = CNF(clauses=[[rng.choice([-1, 1]) * v for v in rng.sample(range(1, nv + 1), rng.randint(1, 3))] for _ in range(4 * nv)])
+        if not cnf.is_sat:
+            return cnf
+
+
+@pytest.mark.parametrize("problem_cls", [MCS, MUS])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("processes, depth", [(1, 3), (2, None)])
+def test_parallel_enumeration_matches_serial(problem_cls, seed, processes, depth):
+    cnf = _random_unsat_cnf(seed)
+    expected = sorted(problem_cls(cnf).solution_enumerate())
+
+    answers = list(parallel_enumerate(problem_cls(cnf), processes=processes, depth=depth))
+    assert len(answers) == len(set(answers))
+    assert sorted(answers) == expected
+
+
+def test_parallel_enumeration_rejects_other_problem_types():
+    with pytest.raises(ValueError):
+        list(parallel_enumerate(SATSP(CNF(clauses=[[1]]))))
@@ -0,0 +1,35 @@
+import os
+import time
+
+import pytest
+
+from satquest.portfolio import race
+
+
+def _sleep_then_return(seconds: float, value: str | None) -> str:
+    time.sleep(seconds)
+    if value is None:
+        raise ValueError("no value")
+    return value
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def test_race_returns_first_finisher():
+    index, result = race(_sleep_then_return, [(5.0, "slow"), (0.0, "fast")])
+    assert (index, result) == (1, "fast")
+
+
+def test_race_ignores_failed_workers():
+    index, result = race(_sleep_then_return, [(0.0, None), (0.2, "ok")])
+    assert (index, result) == (1, "ok")
+
+    with pytest.raises(ValueError, match="no value"):
+        race(_sleep_then_return, [(0.0, None), (0.0, None)])
+
+
+def test_race_reports_crashed_workers():
+    with pytest.raises(RuntimeError):
+        race(_crash, [(), ()])
@@ -1,8 +1,15 @@
+import itertools
+import pickle
+import random
+
 import pytest
 
+from satquest import metrics
+from satquest import problem as problem_module
+from satquest.budget import Budget
 from satquest.cnf import CNF
 from satquest.constants import SAT_SOLVER_NAME
-from satquest.problem import MCS, MUS, SATDP, SATSP, MaxSAT, create_problem
+from satquest.problem import MCS, MUS, SATDP, SATSP, MaxSAT, Problem, create_problem, set_solver_name
 from satquest.question import Question
 
 
@@ -173,3 +180,170 @@ def test_solver_metadata_reports_solver_names(problem_factory, expected):
     _ = problem.solution
     assert problem.solver_metadata is not None
     assert problem.solver_metadata["solvers"] == expected
+
+
+@pytest.mark.parametrize("solver_name", ["cd19", "mcb", "m22"])
+def test_solver_name_selects_backend(solver_name):
+    problem = create_problem("mus", CNF(clauses=[[1], [-1], [2]]), solver_name=solver_name)
+
+    assert problem.solution == "110"
+    assert problem.solver_metadata["solvers"] == (solver_name, "MUSX")
+    assert problem.check("110", solver_name="g4") is True
+    assert sorted(problem.solution_enumerate(solver_name="cd19")) == ["110"]
+
+
+def test_set_solver_name_changes_problem_type_default():
+    set_solver_name("satsp", "cd19")
+    try:
+        problem = SATSP(CNF(clauses=[[1, -2], [2]]))
+        _ = problem.solution
+        assert problem.solver_metadata["solvers"] == ("cd19",)
+        assert SATDP(CNF(clauses=[[1]])).solver_name == SAT_SOLVER_NAME
+    finally:
+        set_solver_name("satsp", SAT_SOLVER_NAME)
+
+
+def test_portfolio_races_backends_and_keeps_answers():
+    problem = MaxSAT(CNF(clauses=[[1], [-1], [2], [-2, 1]]), solver_name=("g4", "cd19"))
+
+    assert problem.solution == "11"
+    assert problem.solver_metadata["solvers"][0] in ("g4", "cd19")
+    assert problem.solver_metadata["portfolio"] == ("g4", "cd19")
+    assert problem.check("11") is True
+    assert problem.check("00", solver_name="portfolio") is False
+
+
+def test_portfolio_failing_backend_does_not_win():
+    # "nope" fails at once; swallowed into a False check or a None solution it used to beat the working backend.
+    rng = random.Random(0)
+    cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 41), 3)] for _ in range(200)])
+    assert not cnf.is_sat
+    mus = MUS(cnf).solution
+    problem = MUS(cnf, solver_name=("nope", "g4"))
+    assert problem.check(mus) is True
+    assert problem.solution is not None and problem.solver_metadata["solvers"][0] == "g4"
+    # With every backend failing, the result is the one a single failing backend gives.
+    assert SATSP(CNF(clauses=[[1], [2]]), solver_name=("nope", "nope2")).solution is None
+
+
+@pytest.mark.parametrize("config", [{}, {"stratified": True}, {"exhaust": True}, {"stratified": True, "exhaust": True}])
+def test_maxsat_engine_is_reused_across_solution_enumerate_and_check(config):
+    problem = create_problem("maxsat", CNF(clauses=[[1], [-1], [2], [-2], [1, 2]]), **config)
+    engine = problem.engine()
+
+    assert problem.solution in ("10", "01", "11")
+    assert sorted(problem.solution_enumerate()) == ["01", "10", "11"]
+    assert problem.engine() is engine
+    assert engine.cost == 2 and engine.optima[0] == problem.solution
+    assert problem.check("01") is True
+    assert problem.check("00") is False
+    assert problem.cost("00") == 3
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mus_enumeration_finds_every_mus(seed):
+    rng = random.Random(seed)
+    while True:
+        cnf = CNF(clauses=[[rng.choice([-1, 1]) * v for v in rng.sample(range(1, 5), rng.randint(1, 2))] for _ in range(9)])
+        if not cnf.is_sat:
+            break
+    problem = MUS(cnf)
+    expected = sorted(
+        "".join(bits) for bits in itertools.product("01", repeat=cnf.mc) if problem.format_check("".join(bits)) and problem.check("".join(bits))
+    )
+
+    answers = list(problem.solution_enumerate())
+    assert sorted(answers) == expected
+    assert answers[0] in expected
+    cursor = problem.cursor()
+    cursor.take(1)
+    cursor._live = None  # resumes with the known MUS blocked in the hitting set solver
+    assert sorted(cursor.take(len(expected) + 1)) == expected
+
+
+@pytest.mark.parametrize("p_type", ["SATDP_UNSAT", "SATSP", "MaxSAT", "MCS", "MUS"])
+@pytest.mark.parametrize("truth_table_max_variables", [0, None])
+def test_check_batch_matches_check(p_type, truth_table_max_variables):
+    rng = random.Random(3)
+    while True:
+        cnf = CNF(clauses=[[rng.choice([-1, 1]) * v for v in rng.sample(range(1, 5), rng.randint(1, 2))] for _ in range(8)])
+        if cnf.nv == 4 and not cnf.is_sat:
+            break
+    if p_type == "SATSP":
+        cnf = CNF(clauses=cnf.clauses[:3])
+    problem = create_problem(p_type, cnf, truth_table_max_variables=truth_table_max_variables)
+    reference = create_problem(p_type, cnf, truth_table_max_variables=0)
+    answers = ["".join(bits) for bits in itertools.product("01", repeat=problem.answer_length)]
+    answers = answers + answers[::3] + [None, "2" * problem.answer_length, "0"]
+
+    is_correct, is_format_correct = problem.check_batch(answers)
+    assert is_format_correct == [reference.format_check(a) for a in answers]
+    assert is_correct == [reference.check(a) for a in answers]
+    assert all(type(ok) is bool for ok in is_correct)
+
+
+def test_check_batch_checks_each_answer_once_on_one_solver():
+    problem = MUS(CNF(clauses=[[1], [-1], [2], [-2], [1, 2]]), truth_table_max_variables=0)
+    metrics.reset()
+    metrics.enable()
+    try:
+        assert problem.check_batch(["11000", "11000", "10100", None]) == ([True, True, False, False], [True, True, True, False])
+        assert problem.check_batch(["11000", "00110"]) == ([True, True], [True, True])
+        snap = metrics.snapshot()
+    finally:
+        metrics.disable()
+        metrics.reset()
+    constructs = [h["count"] for h in snap["histograms"] if h["name"] == "solver_construct_seconds"]
+    assert constructs == [2]  # one shared solver per batch with something left to check
+
+
+def test_check_batch_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(problem_module, "CHECKED_CACHE_SIZE", 4)
+    problem = SATSP(CNF(clauses=[[1, 2], [-1, 3]]))
+    answers = ["".join(bits) for bits in itertools.product("01", repeat=3)]
+    assert problem.check_batch(answers)[0] == [problem.check(a) for a in answers]  # correct past the cap too
+    assert list(problem._checked) == answers[4:]
+    problem.check_batch([answers[4], answers[0]])  # a hit becomes most recent, the oldest entry goes
+    assert list(problem._checked) == answers[6:] + [answers[4], answers[0]]
+
+
+@pytest.mark.parametrize("p_type, answers", [("SATDP_UNSAT", ["0", "1"]), ("MaxSAT", ["01", "00"]), ("MCS", ["10101", "11000"]), ("MUS", ["11000", "10100"])])
+def test_to_bytes_and_pickle_keep_cached_results(p_type, answers):
+    problem = create_problem(p_type, CNF(clauses=[[1], [-1], [2], [-2], [1, 2]]), solver_name="cd19", budget=Budget(conflicts=10**6))
+    _ = problem.solution
+    problem.count()
+    problem.check_batch(answers)
+    problem.cursor().take(2)
+
+    for clone in (Problem.from_bytes(problem.to_bytes()), pickle.loads(pickle.dumps(problem))):
+        assert type(clone) is type(problem) and clone.cnf.clauses == problem.cnf.clauses
+        assert (clone.solver_name, clone.budget) == ("cd19", Budget(conflicts=10**6))
+        assert clone._solved and clone.solution == problem.solution
+        assert clone.solver_metadata == problem.solver_metadata
+        assert clone._answer_count == problem._answer_count and clone._checked == problem._checked
+        assert clone.cursor().answers == problem.cursor().answers
+        assert sorted(clone.cursor().take(100)) == sorted(problem.solution_enumerate())
+
+
+@pytest.mark.parametrize("p_type", ["SATDP_UNSAT", "SATSP", "MaxSAT", "MCS", "MUS"])
+def test_shuffled_maps_cached_results_without_solving(p_type, monkeypatch):
+    cnf = CNF(clauses=[[1, 2], [-1, 2], [1, -2], [-1, -2], [3], [-3, 1]])
+    if p_type == "SATSP":
+        cnf = CNF(clauses=cnf.clauses[:3] + cnf.clauses[4:])
+    problem = create_problem(p_type, cnf, truth_table_max_variables=0)
+    _ = problem.solution
+    problem.count()
+    everything = sorted(problem.cursor().take(100))
+    answers = ["".join(bits) for bits in itertools.product("01", repeat=problem.answer_length)]
+    problem.check_batch(answers)
+
+    for relabel in (False, True):
+        with monkeypatch.context() as m:
+            m.setattr(Problem, "_make_solver", lambda *args, **kwargs: pytest.fail("solver constructed"))
+            clone = problem.shuffled(seed=11, relabel=relabel)
+            solution, enumerated, checked = clone.solution, sorted(clone.solution_enumerate()), clone.check_batch(answers)
+            assert clone.count() == problem.count() and len(clone.cursor().take(100)) == len(everything)
+        reference = create_problem(p_type, clone.cnf, truth_table_max_variables=0)
+        assert reference.check(solution) and enumerated == sorted(reference.solution_enumerate())
+        assert checked == reference.check_batch(answers)
+        assert clone.cnf._is_sat == cnf._is_sat
@@ -1,9 +1,12 @@
+import random
 import re
 
 import pytest
 
 from satquest.cnf import CNF
 from satquest.constants import CHEF_NAME, COOKIE_NAMES
+from satquest.problem import create_problem
+from satquest.prompt_length import TokenCounter
 from satquest.question import (
     QuestionDIMACS,
     QuestionDualStory,
@@ -103,3 +106,36 @@ def test_question_repr_and_factory_helper():
     assert isinstance(create_question("StOrY"), QuestionStory)
     with pytest.raises(ValueError):
         create_question("unknown")
+
+
+_WORDS = re.compile(r" ?\w+| ?[^\w\s]+|\s+")
+
+
+@pytest.mark.parametrize("q_type", ["dimacs", "math", "story", "dualstory"])
+@pytest.mark.parametrize("p_type", ["SATDP", "SATSP", "MaxSAT", "MCS", "MUS"])
+def test_prompt_length_matches_rendered_prompt(p_type, q_type):
+    rng = random.Random(0)
+    counter = TokenCounter(lambda text: len(_WORDS.findall(text)))
+    for _ in range(20):
+        nv = rng.randint(2, 15)
+        cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, nv + 1), rng.randint(1, min(4, nv)))] for _ in range(rng.randint(1, 30))])
+        problem, question = create_problem(p_type, cnf), create_question(q_type)
+        text = problem.accept(question)
+        length = problem.prompt_length(question, counter)
+        assert length.chars == len(text)
+        # fragments split where a word-level tokenizer does, except at the two seams around the formula and
+        # "(" before "\neg" in math
+        assert abs(length.tokens - counter(text)) <= 2 + (cnf.mc if q_type == "math" else 0)
+
+
+def test_token_counter_uses_tokenizer_encode_and_caches():
+    class Tokenizer:
+        calls = 0
+
+        def encode(self, text, add_special_tokens=True):
+            Tokenizer.calls += 1
+            return text.split() + ([0] if add_special_tokens else [])
+
+    counter = TokenCounter(Tokenizer())
+    assert counter("crunchy Almond") == counter("crunchy Almond") == 2 and Tokenizer.calls == 1
+    assert TokenCounter()("x" * 9) == 3
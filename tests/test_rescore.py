@@ -0,0 +1,140 @@
+import json
+import random
+
+import pytest
+
+from satquest import rescore as rescore_module
+from satquest.budget import Budget, set_default_budget
+from satquest.cnf import CNF
+from satquest.problem import create_problem
+from satquest.rescore import checker_fingerprint, rescore
+
+
+def _records(n: int) -> list[dict]:
+    rng = random.Random(0)
+    records = []
+    for i in range(n):
+        p_type = ["SATSP", "MaxSAT", "MCS", "MUS", "SATDP_UNSAT"][i % 5]
+        cnf = None
+        while cnf is None or cnf.is_sat != (p_type == "SATSP"):
+            cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 5), 2)] for _ in range(rng.randint(6, 12))])
+        length = create_problem(p_type, cnf).answer_length
+        for r in range(3):
+            answer = "".join(rng.choice("01") for _ in range(length))
+            content = rng.choice([f"Thinking...\nAnswer: {answer}", f"answer: 2\nAnswer:\n{answer} done", "no answer"])
+            records.append(
+                {
+                    "cnf_id": i, "problem_type": p_type, "question_type": "math", "repeat_i": r, "model": "m",
+                    "dimacs": cnf.dimacs, "content_output": content, "final_answer": None, "is_correct": False,
+                    "answer": answer if "Answer" in content else None,
+                }
+            )  # fmt: skip
+    return records
+
+
+def _expected(record: dict) -> tuple:
+    problem = create_problem(record["problem_type"], CNF(dimacs=record["dimacs"]))
+    (is_correct,), (is_format_correct,) = problem.check_batch([record["answer"]])
+    return record["answer"], bool(is_correct), is_format_correct
+
+
+@pytest.fixture
+def journal(tmp_path):
+    records = _records(10)
+    path = tmp_path / "journal.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in records) + '{"cnf_id": 1, "probl')
+    return str(path), records
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_rescore_matches_check(journal, processes):
+    path, records = journal
+    result = rescore(path, processes=processes, chunk_size=7)
+    assert len(result) == len(records) and all(result.columns["rescored"])
+    for i, record in enumerate(records):
+        got = tuple(result.columns[name][i] for name in ("final_answer", "is_correct", "is_format_correct"))
+        assert got == _expected(record)
+    assert result.columns["changed"] == result.columns["is_correct"]
+
+
+def test_rescore_skips_current_rows(journal, tmp_path):
+    path, records = journal
+    output = str(tmp_path / "out.jsonl")
+    first = rescore(path, output, processes=1)
+    rows = [json.loads(line) for line in open(output)]
+    assert len(rows) == len(records)
+    assert [r["checker_fingerprint"] for r in rows] == [checker_fingerprint(r["problem_type"]) for r in records]
+    assert [r["is_correct"] for r in rows] == first.columns["is_correct"]
+    assert rows[0]["content_output"] == records[0]["content_output"]
+
+    rows[0]["is_correct"] = "stale"  # a current fingerprint keeps the stored score
+    rows[1]["checker_fingerprint"] = "old"
+    with open(output, "w") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows)
+    again = rescore(output, output, processes=1)
+    assert again.columns["rescored"] == [False, True] + [False] * (len(rows) - 2)
+    assert again.columns["is_correct"][0] == "stale" and again.columns["is_correct"][1:] == first.columns["is_correct"][1:]
+    assert json.loads(open(output).readline())["is_correct"] == "stale"
+    assert all(rescore(output, processes=1, force=True).columns["rescored"])
+
+
+def test_checker_fingerprint(monkeypatch):
+    assert checker_fingerprint("SATDP_SAT") == checker_fingerprint("satdp")
+    assert len({checker_fingerprint(p) for p in ("SATSP", "MaxSAT", "MCS", "MUS", "SATDP")}) == 5
+    # Any change to a checker module, e.g. a helper of TruthTable.is_mus, changes every fingerprint.
+    current, getsource = checker_fingerprint("MUS"), rescore_module.inspect.getsource
+
+    def patched(module):
+        return getsource(module) + ("# edited" if module.__name__ == "satquest.truth_table" else "")
+
+    with monkeypatch.context() as m:
+        m.setattr(rescore_module.inspect, "getsource", patched)
+        rescore_module._checker_source_hash.cache_clear()
+        checker_fingerprint.cache_clear()
+        assert checker_fingerprint("MUS") != current
+    rescore_module._checker_source_hash.cache_clear()
+    checker_fingerprint.cache_clear()
+    assert checker_fingerprint("MUS") == current
+
+
+def test_unknown_rows_are_retried(tmp_path):
+    rng = random.Random(3)
+    cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 31), 3)] for _ in range(240)])
+    record = {"problem_type": "MUS", "dimacs": cnf.dimacs, "content_output": "Answer: " + "1" * cnf.mc}
+    path = str(tmp_path / "journal.jsonl")
+    with open(path, "w") as f:
+        f.write(json.dumps(record) + "\n")
+    set_default_budget(Budget(propagations=1))
+    try:
+        first = rescore(path, path, processes=1)
+    finally:
+        set_default_budget(None)
+    assert first.columns["is_correct"] == [False] and first.columns["checker_fingerprint"] == [None]
+    again = rescore(path, path, processes=1)
+    assert again.columns["rescored"] == [True] and again.columns["checker_fingerprint"] == [checker_fingerprint("MUS")]
+
+
+def test_aggregate(journal):
+    path, records = journal
+    result = rescore(path, processes=1)
+    groups = {g["problem_type"]: g for g in result.aggregate()}
+    assert set(groups) == {"SATSP", "MaxSAT", "MCS", "MUS", "SATDP_UNSAT"}
+    for p_type, group in groups.items():
+        rows = [i for i, r in enumerate(records) if r["problem_type"] == p_type]
+        assert group["examples"] == len(rows) == group["rescored"]
+        assert group["accuracy"] == sum(result.columns["is_correct"][i] for i in rows) / len(rows)
+    assert [g["examples"] for g in result.aggregate(by=("model",))] == [len(records)]
+
+
+def test_parquet(journal, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path, records = journal
+    parquet = str(tmp_path / "journal.parquet")
+    pq.write_table(pa.Table.from_pylist(records), parquet, row_group_size=4)
+    result = rescore(parquet, parquet, processes=1, chunk_size=5)
+    assert result.columns == rescore(path, processes=1).columns
+    table = pq.read_table(parquet)
+    assert table.column("is_correct").to_pylist() == result.columns["is_correct"]
+    assert table.column("content_output").to_pylist() == [r["content_output"] for r in records]
+    assert not any(rescore(parquet, processes=1).columns["rescored"])
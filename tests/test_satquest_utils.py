@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from satquest.satquest_utils import (
+    ANSWER_PATTERN,
+    complete_answer,
+    extract_final_answer,
+    extract_final_answers,
+    match_last_binary,
+    re_matcher,
+)
+
+
+@pytest.mark.parametrize(
+    "content_output, answer_length, expected",
+    [
+        ("Reasoning...\nAnswer: 101", 3, "101"),
+        ("Answer: 000\nWait, let me fix that.\nAnswer: 110\n", 3, "110"),
+        ("answer:\n\n  0110 is my final answer", 4, "0110"),
+        ("Answer: 10101", 3, "101"),
+        ("Answer: 12", 2, None),
+        ("no final line 0101", 4, None),
+        ("", 1, None),
+        (None, 1, None),
+    ],
+)
+def test_extract_final_answer_examples(content_output, answer_length, expected):
+    assert extract_final_answer(content_output, answer_length) == expected
+
+
+def test_extract_final_answer_matches_two_stage_re_matcher():
+    rng = random.Random(0)
+    pieces = ["Answer:", "answer: ", "ANSWER:\n", "0", "1", "0110", "\n", "\n\n", " ", "x"]
+    for _ in range(20000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+        n = rng.randint(1, 4)
+        pattern = r"(?=([01]{%d}))" % n
+        assert match_last_binary(text, n) == re_matcher(text, pattern)
+        assert extract_final_answer(text, n) == re_matcher(re_matcher(text, ANSWER_PATTERN), pattern)
+
+
+def test_extract_final_answers_handles_batches():
+    outputs = ["Answer: 01", "Answer: 2", None, "Answer: 11\nAnswer: 10"]
+    assert extract_final_answers(outputs, 2) == ["01", None, None, "10"]
+
+
+@pytest.mark.parametrize(
+    "stream, answer_length, stop_after",
+    [
+        ("Let me think.\nThe answer: we need x1 true\nSo x2 is false.\nAnswer: 0101\nDone.", 4, "Answer: 0101\n"),
+        ("Checking clauses.\n**Answer:**\n\n0101\n\nAnswer: 0110\n", 4, "Answer: 0110\n"),
+        ("Answer:\n\n 011 final\n", 3, "011 final\n"),
+        ("answer: 01\nanswer: 0101 tail", 4, None),
+    ],
+)
+def test_complete_answer_skips_lines_without_an_answer(stream, answer_length, stop_after):
+    # The first prefix at which a streaming caller would stop.
+    stops = [i for i in range(len(stream) + 1) if complete_answer(stream[:i], answer_length) is not None]
+    if stop_after is None:
+        assert not stops
+    else:
+        assert stream[: stops[0]].endswith(stop_after)
+        assert complete_answer(stream, answer_length) == extract_final_answer(stream[: stops[0]], answer_length)
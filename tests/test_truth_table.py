@@ -0,0 +1,92 @@
+import itertools
+import random
+
+import pytest
+
+from satquest import metrics
+from satquest.cnf import CNF
+from satquest.problem import MCS, MUS, SATSP, MaxSAT
+from satquest.truth_table import TruthTable
+
+np = pytest.importorskip("numpy")
+
+UNSAT_CNF = CNF(clauses=[[1, 2], [-1, 2], [1, -2], [-1, -2], [3, -1], [-3]])
+SAT_CNF = CNF(clauses=[[1, 2, -3], [-1, 3], [2, 4], [-2, -4, 1]])
+
+
+def _random_unsat(rng: random.Random, nv: int, mc: int) -> CNF:
+    while True:
+        clauses = [[v * rng.choice([-1, 1]) for v in rng.sample(range(1, nv + 1), rng.randint(1, 2))] for _ in range(mc)]
+        cnf = CNF(clauses=clauses)
+        if cnf.nv == nv and not cnf.is_sat:
+            return cnf
+
+
+def test_truth_table_matches_sat_and_maxsat_solvers():
+    table = TruthTable(SAT_CNF)
+    assert table.is_sat and table.num_models == len(table.models())
+    assert sorted(table.models()) == sorted(SATSP(SAT_CNF, truth_table_max_variables=0).solution_enumerate())
+    assert table.row(table.answer(5)) == 5
+
+    table = TruthTable(UNSAT_CNF)
+    maxsat = MaxSAT(UNSAT_CNF, truth_table_max_variables=0)
+    assert not table.is_sat and table.num_models == 0
+    assert table.min_falsified == maxsat.cost(maxsat.solution)
+    assert sorted(table.optimal_models()) == sorted(maxsat.solution_enumerate())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_truth_table_mcs_and_mus_match_solver_checks(seed):
+    cnf = _random_unsat(random.Random(seed), 3, 7)
+    table = TruthTable(cnf)
+    mcs, mus = MCS(cnf, truth_table_max_variables=0), MUS(cnf, truth_table_max_variables=0)
+    for bits in itertools.product("01", repeat=cnf.mc):
+        answer = "".join(bits)
+        assert table.is_mcs(answer) == mcs.check(answer), answer
+        assert table.is_mus(answer) == mus.check(answer), answer
+
+
+def test_mus_check_without_bitwise_count(monkeypatch):
+    # NumPy 1.x has no np.bitwise_count; counting falls back to a lookup table.
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    cnf = _random_unsat(random.Random(7), 3, 10)
+    table, mus = TruthTable(cnf), MUS(cnf, truth_table_max_variables=0)
+    answers = ["".join(bits) for bits in itertools.product("01", repeat=cnf.mc)]
+    assert [table.is_mus(answer) for answer in answers] == [mus.check(answer) for answer in answers]
+    assert any(table.is_mus(answer) for answer in answers)
+
+
+@pytest.mark.parametrize("cls, cnf", [(SATSP, SAT_CNF), (MaxSAT, UNSAT_CNF), (MCS, UNSAT_CNF), (MUS, UNSAT_CNF)])
+def test_problems_use_truth_table_without_solvers(cls, cnf):
+    problem = cls(cnf)
+    reference = cls(cnf, truth_table_max_variables=0)
+    answers = sorted(reference.solution_enumerate())
+    metrics.reset()
+    metrics.enable()
+    try:
+        assert all(problem.check(answer) for answer in answers)
+        assert not problem.check("0" * problem.answer_length) or "0" * problem.answer_length in answers
+        if cls in (SATSP, MaxSAT):
+            assert sorted(problem.solution_enumerate()) == answers
+        snap = metrics.snapshot()
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert not [h for h in snap["histograms"] if h["name"] == "solver_construct_seconds"]
+    assert [h["count"] for h in snap["histograms"] if h["name"] == "truth_table_build_seconds"] == [1]
+
+
+def test_truth_table_respects_variable_limit():
+    assert SATSP(SAT_CNF, truth_table_max_variables=3).truth_table is None
+    assert SATSP(SAT_CNF).truth_table is not None
+
+
+def test_enumeration_builds_large_tables_only_on_request():
+    rng = random.Random(1)
+    cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 17), 3)] for _ in range(40)])
+    assert cnf.nv == 16 and cnf.is_sat
+    problem = SATSP(cnf)
+    first = list(itertools.islice(problem.solution_enumerate(), 3))
+    assert problem._truth_table is None and all(problem.check(answer) for answer in first)
+    assert problem.truth_table is not None  # built on request, then enumeration reads it
+    assert sorted(problem.solution_enumerate()) == sorted(problem.truth_table.models())
@@ -0,0 +1,94 @@
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from satquest.budget import Budget, set_default_budget
+from satquest.cnf import CNF
+from satquest.problem import create_problem
+from satquest.verification import VerificationClient, VerificationConfig, VerificationServer
+
+
+def _requests(n: int) -> list[tuple[str, str, list]]:
+    rng = random.Random(0)
+    requests = []
+    for i in range(n):
+        cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 7), 3)] for _ in range(rng.randint(8, 14))])
+        p_type = ["SATSP", "MaxSAT", "MCS", "MUS"][i % 4]
+        length = cnf.nv if p_type in ("SATSP", "MaxSAT") else cnf.mc
+        answers = ["".join(rng.choice("01") for _ in range(length)) for _ in range(6)]
+        requests.append((p_type, cnf.dimacs, answers + answers[:2] + [None, "01"]))
+    return requests
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = VerificationServer(VerificationConfig(port=0, processes=2, max_wait=0.001))
+    server.start_in_thread()
+    return server
+
+
+def test_scores_match_check_batch(server):
+    requests = _requests(12)
+    expected = [create_problem(p, CNF(dimacs=d)).check_batch(a) for p, d, a in requests]
+    client = VerificationClient(server.url)
+    assert client.score(requests) == [(list(map(bool, c)), f) for c, f in expected]
+    hits = client.stats()["cache_hits"]
+    assert client.score(requests[:3]) == [(list(map(bool, c)), f) for c, f in expected[:3]]
+    assert client.stats()["cache_hits"] == hits + sum(len(a) for _, _, a in requests[:3])
+
+
+def test_unix_socket(tmp_path):
+    server = VerificationServer(VerificationConfig(unix_socket=str(tmp_path / "verify.sock"), processes=1))
+    server.start_in_thread()
+    (p_type, dimacs, answers), = _requests(1)
+    assert VerificationClient(server.url).score([(p_type, dimacs, answers)]) == [
+        tuple(map(list, create_problem(p_type, CNF(dimacs=dimacs)).check_batch(answers)))
+    ]
+
+
+def test_full_queue_is_rejected():
+    server = VerificationServer(VerificationConfig(port=0, processes=1, max_pending=1))
+    server.start_in_thread()
+    (p_type, dimacs, answers), = _requests(1)
+    client = VerificationClient(server.url, retries=0)
+    with pytest.raises(RuntimeError, match="503"):
+        client.score([(p_type, dimacs, answers)])
+    assert client.stats()["rejected"] == 1
+    assert client.score([(p_type, dimacs, answers[:1])])[0][1] == [True]
+
+
+def test_bad_request_fails_alone(server):
+    (p_type, dimacs, answers), = _requests(1)
+    client = VerificationClient(server.url)
+    with ThreadPoolExecutor(2) as pool:
+        bad = pool.submit(client.score, [("MUS", "p cnf 2 1\n1 x 0\n", ["1"])])
+        good = pool.submit(client.score, [(p_type, dimacs, answers)])
+        assert good.result() == [tuple(map(list, create_problem(p_type, CNF(dimacs=dimacs)).check_batch(answers)))]
+        with pytest.raises(RuntimeError, match="400"):
+            bad.result()
+    with pytest.raises(RuntimeError, match="400.*Invalid problem type"):
+        client.score([("NOPE", dimacs, answers)])
+    assert "NOPE" not in client.stats()["pending"]
+
+
+def test_unknown_results_are_not_cached():
+    rng = random.Random(3)
+    cnf = CNF(clauses=[[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 31), 3)] for _ in range(240)])
+    request = {"p_type": "MUS", "dimacs": cnf.dimacs, "answers": ["1" * cnf.mc]}
+    server = VerificationServer(VerificationConfig(max_wait=0))
+
+    async def main():
+        server._pool = ThreadPoolExecutor(1)  # shares the default budget with this process
+        set_default_budget(Budget(propagations=1))
+        try:
+            assert await server.score([request]) == [{"is_correct": [None], "is_format_correct": [True]}]
+            assert not server._cache
+        finally:
+            set_default_budget(None)
+        assert await server.score([request]) == [{"is_correct": [False], "is_format_correct": [True]}]
+        assert len(server._cache) == 1
+        await server.close()
+
+    asyncio.run(main())
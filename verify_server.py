@@ -0,0 +1,19 @@
+import asyncio
+
+import tyro
+
+from satquest.verification import VerificationConfig, VerificationServer
+
+
+async def main(config: VerificationConfig) -> None:
+    server = VerificationServer(config)
+    await server.start()
+    print(f"Verification server listening on {server.url}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(tyro.cli(VerificationConfig)))
+    except KeyboardInterrupt:
+        pass